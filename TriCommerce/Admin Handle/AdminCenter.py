@@ -1,30 +1,31 @@
-import pyodbc
+import os
 import sys
-from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QTableWidgetItem
-from PyQt6.uic import loadUi
-
-
-def get_database_connection():
-    """Establish and return a database connection."""
-    try:
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        print("Connected to the database successfully.")
-        return connection
-    except pyodbc.Error as e:
-        print(f"Database connection error: {e}")
-        return None
+from datetime import date
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QAbstractItemView, QApplication, QInputDialog, QMainWindow, QMessageBox
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.forms import load_form
+from shared.navigation import get_navigator
+from shared.pool import get_pool
+from shared.dao import OrderRepository, ProductRepository, SellerRepository
+from shared.diagnostics import (ACTION_COLUMNS, STATEMENT_COLUMNS, action_rows, exported_processes,
+                                load_report, start_metrics_export, statement_rows, summary)
+from shared.export_dialog import ExportRunner
+from shared.instrumentation import SLOW_QUERY_LOG
+from shared.payouts import settle_month
+from shared.refdata import get_reference_data
+from shared.tablemodel import attach_model, selected_row, selected_rows
+from shared.workers import QueryRunner
+
+FORMS = os.path.dirname(os.path.abspath(__file__))
 
 
 class AdminDashboardWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        loadUi('AdminDashboard.ui', self)  
+        load_form(self, FORMS, 'AdminDashboard.ui')  
+        self.queries = QueryRunner(self)
 
         self.productsButton = self.pushButton 
         self.sellersButton = self.pushButton_2 
@@ -34,66 +35,93 @@ class AdminDashboardWindow(QMainWindow):
         self.sellersButton.clicked.connect(self.manageSellers)
         self.financesButton.clicked.connect(self.manageFinances)
         self.manageOrdersButton.clicked.connect(self.manageOrders)  
+        self.diagnosticsButton.clicked.connect(self.openDiagnostics)
 
     def manageProducts(self):
-        self.hide()
-        self.productsWindow = ManageProductsWindow()
-        self.productsWindow.show()
+        get_navigator().show(ManageProductsWindow)
 
     def manageSellers(self):
-        self.hide()
-        self.sellersWindow = ManageSellersWindow()
-        self.sellersWindow.show()
+        get_navigator().show(ManageSellersWindow)
     
     def manageOrders(self):
-        self.hide()
-        self.sellersWindow = ManageOrdersWindow()
-        self.sellersWindow.show()
+        get_navigator().show(ManageOrdersWindow)
 
     def manageFinances(self):
-        QMessageBox.information(self, "Manage Finances", "Finance management functionality is under development.")
+        # The last twelve months that are over, most recent first
+        today = date.today()
+        months = [f"{(today.year * 12 + today.month - 1 - back) // 12}-{(today.month - 1 - back) % 12 + 1:02d}"
+                  for back in range(1, 13)]
+        month, ok = QInputDialog.getItem(self, "Manage Finances", "Pay sellers for the month:", months, 0, False)
+        if not ok:
+            return
+        self.financesButton.setEnabled(False)
+        self.queries.submit(settle_month, month, on_result=self.paymentsDone, on_error=self.paymentsFailed)
+
+    def paymentsDone(self, result):
+        self.financesButton.setEnabled(True)
+        text = f"{result.summary()}."
+        if result.open_orders:
+            text += f"\n\n{result.open_orders:,} orders of {result.month} were not delivered yet and were not paid."
+        QMessageBox.information(self, "Manage Finances", text)
+
+    def paymentsFailed(self, error):
+        self.financesButton.setEnabled(True)
+        QMessageBox.critical(self, "Manage Finances", f"Paying sellers failed: {error}")
+
+    def openDiagnostics(self):
+        get_navigator().show(DiagnosticsWindow)
 
 
 class ManageProductsWindow(QMainWindow):
+    COLUMNS = ["Product SKU", "Seller", "Product Name", "Stock", "Price"]
+
     def __init__(self):
         super().__init__()
-        loadUi('Products.ui', self)  
+        load_form(self, FORMS, 'Products.ui')  
+        self.queries = QueryRunner(self)
+        # Product rows carry their Status after the shown columns; keyed by ProductSKU
+        self.productsModel = attach_model(self.productsTable, self.COLUMNS, key_column=0)
+        self.currentStatus = None
 
         self.statusCombo.currentIndexChanged.connect(self.filterProducts)
         self.activeButton.clicked.connect(self.toggleProductStatus)
         self.approveButton.clicked.connect(self.approveProduct)
         self.approveAllButton.clicked.connect(self.approveAllProducts)
         self.homeButton.clicked.connect(self.openDashboard)
+        self.exports = ExportRunner(self, self.queries)
+        self.exportButton.clicked.connect(self.exportProducts)
 
-        self.connection = get_database_connection()
-        if self.connection:
-            self.loadProducts("Active")  
+        self.loadProducts("Active")
+
+    def reopen(self):
+        self.loadProducts(self.currentStatus)
 
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = AdminDashboardWindow()
-        self.addProductsWindow.show()
+        get_navigator().show(AdminDashboardWindow)
     
     def loadProducts(self, status):
-        self.productsTable.clearContents()
-        self.productsTable.setRowCount(0)
+        self.currentStatus = status
+        self.updateActiveButtonText(status)
 
-        if not self.connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
+        # Pages are fetched as the table scrolls; changing the filter before a
+        # page returns makes the older request stale.
+        def request(cursor, limit, deliver, fail):
+            def failed(e):
+                fail(e)
+                QMessageBox.critical(self, "Database Error", f"Failed to load products: {e}")
 
-        cursor = self.connection.cursor()
-        query = "SELECT ProductSKU, SellerID, ProductName, StockQuantity, Price FROM Products WHERE Status = ?"
-        cursor.execute(query, (status,))
-        rows = cursor.fetchall()
+            self.queries.submit(
+                ProductRepository().page_by_status, status, limit, cursor,
+                on_result=deliver,
+                on_error=failed,
+                channel="products",
+            )
 
-        for row in rows:
-            row_position = self.productsTable.rowCount()
-            self.productsTable.insertRow(row_position)
-            for col, value in enumerate(row):
-                self.productsTable.setItem(row_position, col, QTableWidgetItem(str(value)))
+        self.productsModel.set_pages(request)
 
-        self.updateActiveButtonText(status)
+    def exportProducts(self):
+        # Every product, not only the listed status
+        self.exports.start("products", "products", button=self.exportButton)
 
     def filterProducts(self):
         status = self.statusCombo.currentText()
@@ -106,57 +134,80 @@ class ManageProductsWindow(QMainWindow):
             self.activeButton.setText("Deactivate")
 
     def toggleProductStatus(self):
-        selected_items = self.productsTable.selectedItems()
-        if not selected_items:
+        selected = selected_row(self.productsTable)
+        if selected < 0:
             QMessageBox.warning(self, "No Selection", "Please select a product to toggle status.")
             return
 
-        product_sku = selected_items[0].text()
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT Status FROM Products WHERE ProductSKU = ?", (product_sku,))
-        current_status = cursor.fetchone()[0]
+        product_sku = self.productsModel.row(selected)[0]
 
-        if current_status == "Inactive":
-            new_status = "Active"
-        else:
-            new_status = "Inactive"
+        def toggled(changed):
+            self.activeButton.setEnabled(True)
+            if not changed:
+                QMessageBox.warning(self, "Not Found", f"Product {product_sku} no longer exists.")
+                return
+            self.applyProductChanges(changed)
+            QMessageBox.information(self, "Status Updated",
+                                    f"Product {product_sku} status updated to {changed[0][5]}.")
 
-        cursor.execute("UPDATE Products SET Status = ? WHERE ProductSKU = ?", (new_status, product_sku))
-        self.connection.commit()
-        QMessageBox.information(self, "Status Updated", f"Product {product_sku} status updated to {new_status}.")
+        def failed(e):
+            self.activeButton.setEnabled(True)
+            QMessageBox.critical(self, "Database Error", f"Failed to update product status: {e}")
 
-        self.filterProducts()
+        # Inactive products are activated, the others deactivated, in one statement
+        self.activeButton.setEnabled(False)
+        self.queries.submit(ProductRepository().toggle_status, product_sku, "Active",
+                            on_result=toggled, on_error=failed)
 
     def approveProduct(self):
-        selected_items = self.productsTable.selectedItems()
-        if not selected_items:
+        selected = selected_row(self.productsTable)
+        if selected < 0:
             QMessageBox.warning(self, "No Selection", "Please select a product to approve.")
             return
 
-        product_sku = selected_items[0].text()
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE Products SET Status = 'Active' WHERE ProductSKU = ?", (product_sku,))
-        self.connection.commit()
-        QMessageBox.information(self, "Approval", f"Product {product_sku} approved!")
-        self.filterProducts()
+        product_sku = self.productsModel.row(selected)[0]
+
+        def approved(changed):
+            self.approveButton.setEnabled(True)
+            self.applyProductChanges(changed)
+            QMessageBox.information(self, "Approval", f"Product {product_sku} approved!")
+
+        def failed(e):
+            self.approveButton.setEnabled(True)
+            QMessageBox.critical(self, "Database Error", f"Failed to approve product: {e}")
+
+        self.approveButton.setEnabled(False)
+        self.queries.submit(ProductRepository().set_status, product_sku, "Active",
+                            on_result=approved, on_error=failed)
+
+    def applyProductChanges(self, rows):
+        # Patch only the changed rows; products whose new status no longer
+        # matches the filter drop out of the grid.
+        self.productsModel.apply(rows, keep=lambda row: row[5] == self.currentStatus)
 
     def approveAllProducts(self):
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE Products SET Status = 'Active' WHERE Status = 'Pending'")
-        self.connection.commit()
-        QMessageBox.information(self, "Approval", "All pending products approved!")
-        self.filterProducts()
+        def approved(_):
+            self.approveAllButton.setEnabled(True)
+            QMessageBox.information(self, "Approval", "All pending products approved!")
+            self.filterProducts()
 
-    def closeEvent(self, event):
-        if self.connection:
-            self.connection.close()
-        event.accept()
+        def failed(e):
+            self.approveAllButton.setEnabled(True)
+            QMessageBox.critical(self, "Database Error", f"Failed to approve products: {e}")
+
+        self.approveAllButton.setEnabled(False)
+        self.queries.submit(ProductRepository().approve_all_pending, on_result=approved, on_error=failed)
 
 
 class ManageSellersWindow(QMainWindow):
+    COLUMNS = ["Seller Name", "CNIC", "Email", "Address", "Status"]
+
     def __init__(self):
         super().__init__()
-        loadUi('SellerApproval.ui', self)  
+        load_form(self, FORMS, 'SellerApproval.ui')  
+        self.queries = QueryRunner(self)
+        # Seller rows end with a hidden SellerID, which keys the grid
+        self.sellersModel = attach_model(self.tableWidget, self.COLUMNS, key_column=5)
 
         self.activateButton = self.pushButton
         self.deactivateButton = self.pushButton_2
@@ -165,64 +216,74 @@ class ManageSellersWindow(QMainWindow):
         self.deactivateButton.clicked.connect(self.deactivateSeller)
         self.homeButton.clicked.connect(self.openDashboard)
 
-        self.connection = get_database_connection()
-        if self.connection:
-            self.loadSellers()
+        self.loadSellers()
+
+    def reopen(self):
+        self.loadSellers()
         
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = AdminDashboardWindow()
-        self.addProductsWindow.show()
+        get_navigator().show(AdminDashboardWindow)
 
     def loadSellers(self):
-        if not self.connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
-        cursor = self.connection.cursor()
-        query = "SELECT StoreName, CNIC, EmailID, BusinessAddress, AccountStatus FROM Sellers"
-        cursor.execute(query)
+        self.queries.submit(
+            SellerRepository().all_sellers,
+            on_result=self.populateSellers,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to load sellers: {e}"),
+            channel="sellers",
+        )
 
-        self.tableWidget.setRowCount(0)
-        for row in cursor.fetchall():
-            row_position = self.tableWidget.rowCount()
-            self.tableWidget.insertRow(row_position)
-            for col, value in enumerate(row):
-                self.tableWidget.setItem(row_position, col, QTableWidgetItem(str(value)))
+    def populateSellers(self, rows):
+        self.sellersModel.set_rows(rows)
 
     def activateSeller(self):
-        selected_items = self.tableWidget.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "No Selection", "Please select a seller to activate.")
-            return
-
-        seller_name = selected_items[0].text()
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE Sellers SET AccountStatus = 'Active' WHERE StoreName = ?", (seller_name,))
-        self.connection.commit()
-        QMessageBox.information(self, "Activation", f"Seller {seller_name} activated!")
-        self.loadSellers()
+        self.setSellerStatus("Active", "activate", "Activation")
 
     def deactivateSeller(self):
-        selected_items = self.tableWidget.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "No Selection", "Please select a seller to deactivate.")
+        self.setSellerStatus("Deactivated", "deactivate", "Deactivation")
+
+    def setSellerStatus(self, status, verb, title):
+        selected = selected_row(self.tableWidget)
+        if selected < 0:
+            QMessageBox.warning(self, "No Selection", f"Please select a seller to {verb}.")
             return
 
-        seller_name = selected_items[0].text()
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE Sellers SET AccountStatus = 'Deactivated' WHERE StoreName = ?", (seller_name,))
-        self.connection.commit()
-        QMessageBox.information(self, "Deactivation", f"Seller {seller_name} deactivated!")
-        self.loadSellers()
+        seller = self.sellersModel.row(selected)
+        seller_name = seller[0]
+        buttons = (self.activateButton, self.deactivateButton)
+
+        def changed(rows):
+            for button in buttons:
+                button.setEnabled(True)
+            self.sellersModel.update_rows(rows)
+            QMessageBox.information(self, title, f"Seller {seller_name} {verb}d!")
+
+        def failed(e):
+            for button in buttons:
+                button.setEnabled(True)
+            QMessageBox.critical(self, "Database Error", f"Failed to {verb} seller: {e}")
+
+        for button in buttons:
+            button.setEnabled(False)
+        self.queries.submit(SellerRepository().set_account_status, seller[5], status,
+                            on_result=changed, on_error=failed)
 
 
 class ManageOrdersWindow(QMainWindow):
+    COLUMNS = ["Order ID #", "Items", "Units", "Total Amount", "Customer ID", "Customer Name", "Order Date"]
+    LINE_COLUMNS = ["Product SKU", "Product", "Quantity", "Unit Price", "Line Total"]
+
+    # What "Process" moves the orders of each listing to.
+    NEXT_STATUS = {"Pending": "Shipped", "Shipped": "Delivered"}
+
     def __init__(self):
         super().__init__()
 
-        loadUi('Manage Orders.ui', self)
-
+        load_form(self, FORMS, 'Manage Orders.ui')
+        self.queries = QueryRunner(self)
+        self.ordersModel = attach_model(self.ordersTable, self.COLUMNS, key_column=0)
+        self.ordersTable.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.linesModel = attach_model(self.linesTable, self.LINE_COLUMNS)
+        self.ordersTable.selectionModel().currentRowChanged.connect(self.showLines)
 
         self.pendingButton.clicked.connect(self.showPendingOrders)
         self.shippedButton.clicked.connect(self.showShippedOrders)
@@ -231,175 +292,181 @@ class ManageOrdersWindow(QMainWindow):
 
         self.cancelButton.clicked.connect(self.cancelOrder)  
         self.processButton.clicked.connect(self.processOrder)  
+        self.exports = ExportRunner(self, self.queries)
+        self.exportButton.clicked.connect(self.exportOrders)
 
+        self.currentStatus = None
+        self.busy = False
         self.showPendingOrders()
-    
-    def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = AdminDashboardWindow()
-        self.addProductsWindow.show()
 
+    def reopen(self):
+        self.fetchOrders(self.currentStatus)
+    
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = AdminDashboardWindow()
-        self.addProductsWindow.show()
+        get_navigator().show(AdminDashboardWindow)
 
     def fetchOrders(self, status):
-        query = """
-        SELECT 
-            o.OrderID, 
-            oi.ProductSKU, 
-            oi.Quantity, 
-            (oi.Quantity * oi.UnitPrice) AS TotalAmount, 
-            o.CustomerID, 
-            CONCAT(c.FirstName, ' ', c.LastName) AS CustomerName, 
-            o.OrderDate
-        FROM Orders o
-        INNER JOIN OrderItems oi ON o.OrderID = oi.OrderID
-        INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
-        INNER JOIN Customers c ON o.CustomerID = c.CustomerID
-        INNER JOIN Status st ON o.StatusID = st.StatusID
-        WHERE st.StatusTitle = ?;
-        """
-
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
+        self.currentStatus = status
+        self.updateButtons()
+        self.queries.cancel("lines")
+        self.linesModel.clear()
+
+        def request(cursor, limit, deliver, fail):
+            def failed(e):
+                fail(e)
+                QMessageBox.critical(self, "Database Error", f"Failed to load orders: {e}")
+
+            self.queries.submit(
+                OrderRepository().page_summaries, status, limit, cursor,
+                on_result=deliver,
+                on_error=failed,
+                channel="orders",
+            )
+
+        self.ordersModel.set_pages(request)
+
+    def showLines(self, current, previous):
+        """Load the lines of the order under the cursor; the listing itself has one row per order."""
+        if not current.isValid():
+            self.queries.cancel("lines")
+            self.linesModel.clear()
+            return
+        order_id = self.ordersModel.row(current.row())[0]
+        self.queries.submit(
+            OrderRepository().items, order_id,
+            on_result=self.linesModel.set_rows,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to load the order lines: {e}"),
+            channel="lines",
         )
 
-        cursor = connection.cursor()
-        cursor.execute(query, (status))
-        orders = cursor.fetchall()
-        connection.close()
-        return orders
-
-    def populateTable(self, orders):
-        self.ordersTable.setRowCount(0)
-        self.ordersTable.setColumnCount(7)
-
-        for row_number, order in enumerate(orders):
-            self.ordersTable.insertRow(row_number)
-            for column_number, data in enumerate(order):
-                self.ordersTable.setItem(row_number, column_number, QTableWidgetItem(str(data)))
-
     def showPendingOrders(self):
-        orders = self.fetchOrders('Pending')
-        self.populateTable(orders)
+        self.fetchOrders('Pending')
 
     def showShippedOrders(self):
-        orders = self.fetchOrders('Shipped')
-        self.populateTable(orders)
+        self.fetchOrders('Shipped')
 
     def showDeliveredOrders(self):
-        orders = self.fetchOrders('Delivered')
-        self.populateTable(orders)
-
-    def cancelOrder(self):
-        selected_row = self.ordersTable.currentRow()
-
-        if selected_row != -1:  
-            order_id = self.ordersTable.item(selected_row, 0).text()  
-
-            status = self.ordersTable.item(selected_row, 6).text() 
-            if status != "Pending":
-                QMessageBox.warning(self, "Invalid Status", "Only pending orders can be canceled.")
-                return
-
-            try:
-                
-                connection = pyodbc.connect(
-                    "DRIVER={ODBC Driver 17 for SQL Server};"
-                    "SERVER=ZAIN_PC\MYSQL1;"
-                    "DATABASE=StoreDatabase;"
-                    "Trusted_Connection=yes;"
-                    "TrustServerCertificate=yes;"
-                )
+        self.fetchOrders('Delivered')
 
-                cursor = connection.cursor()
-                delete_query = "DELETE FROM Orders WHERE OrderID = ?"
-                cursor.execute(delete_query, (order_id,))
-                connection.commit()
-                connection.close()
+    def exportOrders(self):
+        # Every line of every order in the listed status
+        self.exports.start("orders", f"orders-{self.currentStatus.lower()}", status=self.currentStatus,
+                           button=self.exportButton)
 
-                # Remove the order from the table widget
-                self.ordersTable.removeRow(selected_row)
+    def updateButtons(self):
+        self.processButton.setEnabled(not self.busy and self.currentStatus in self.NEXT_STATUS)
+        self.cancelButton.setEnabled(not self.busy and self.currentStatus == "Pending")
 
-                QMessageBox.information(self, "Success", "Order canceled successfully.")
+    def selectedOrderIds(self):
+        """OrderIDs of the selected rows, in grid order."""
+        return [self.ordersModel.row(position)[0] for position in selected_rows(self.ordersTable)]
 
-            except Exception as e:
-                QMessageBox.critical(self, "Database Error", f"Failed to cancel the order: {e}")
+    def cancelOrder(self):
+        if self.currentStatus != "Pending":
+            QMessageBox.warning(self, "Invalid Status", "Only pending orders can be canceled.")
+            return
+        self.transitionSelected("Cancelled", "cancel")
 
     def processOrder(self):
+        if self.currentStatus not in self.NEXT_STATUS:
+            QMessageBox.warning(self, "Invalid Status", "Delivered orders cannot be processed further.")
+            return
+        self.transitionSelected(self.NEXT_STATUS[self.currentStatus], "process")
 
-        selected_row = self.ordersTable.currentRow()
-
-        if selected_row != -1:  
-            order_id = self.ordersTable.item(selected_row, 0).text()  
-
-            try:
-                connection = pyodbc.connect(
-                    "DRIVER={ODBC Driver 17 for SQL Server};"
-                    "SERVER=ZAIN_PC\MYSQL1;"
-                    "DATABASE=StoreDatabase;"
-                    "Trusted_Connection=yes;"
-                    "TrustServerCertificate=yes;"
-                )
-                cursor = connection.cursor()
-
-                cursor.execute("""
-                    SELECT st.StatusTitle 
-                    FROM Orders o
-                    INNER JOIN Status st ON o.StatusID = st.StatusID
-                    WHERE o.OrderID = ?
-                """, (order_id,))
-                current_status = cursor.fetchone()
-
-                connection.close()
-
-                if current_status is None:
-                    QMessageBox.warning(self, "Invalid Order", "The selected order does not exist.")
-                    return
-
-                status_title = current_status[0]
+    def transitionSelected(self, to_status, verb):
+        """Move every selected order to ``to_status`` in one bulk update."""
+        order_ids = self.selectedOrderIds()
+        if not order_ids:
+            return
+        listing = self.currentStatus
+
+        def done(result):
+            self.busy = False
+            self.updateButtons()
+            if self.currentStatus == listing:
+                # Changed orders leave this listing; rejected ones stay as they are
+                self.ordersModel.remove_keys(result.changed)
+            else:
+                # Another listing was opened meanwhile and may predate the change
+                self.fetchOrders(self.currentStatus)
+            if result.rejected:
+                QMessageBox.warning(self, "Some Orders Unchanged", result.summary())
+            else:
+                QMessageBox.information(self, "Success", f"{result.summary()} Marked as {to_status}.")
+
+        def failed(e):
+            self.busy = False
+            self.updateButtons()
+            QMessageBox.critical(self, "Database Error", f"Failed to {verb} the orders: {e}")
+
+        self.busy = True
+        self.updateButtons()
+        self.queries.submit(OrderRepository().transition_many, tuple(order_ids), to_status,
+                            on_result=done, on_error=failed)
+
+
+class DiagnosticsWindow(QMainWindow):
+    """Statement latencies and per-action costs of this center, live, and of the
+    seller and customer centers as of their last metrics export."""
+
+    THIS_PROCESS = "Admin Center (live)"
+    REFRESH_MS = 2000
 
-                if status_title != "Pending":
-                    QMessageBox.warning(self, "Invalid Status", "Only pending orders can be processed.")
-                    return
+    def __init__(self):
+        super().__init__()
+        load_form(self, FORMS, 'Diagnostics.ui')
+        self.statementsModel = attach_model(self.statementsTable, STATEMENT_COLUMNS)
+        self.actionsModel = attach_model(self.actionsTable, ACTION_COLUMNS)
+        self.slowLabel.setText(f"Slow queries are logged to {SLOW_QUERY_LOG}")
 
-                connection = pyodbc.connect(
-                    "DRIVER={ODBC Driver 17 for SQL Server};"
-                    "SERVER=ZAIN_PC\MYSQL1;"
-                    "DATABASE=StoreDatabase;"
-                    "Trusted_Connection=yes;"
-                    "TrustServerCertificate=yes;"
-                )
-                cursor = connection.cursor()
+        self.processCombo.activated.connect(self.loadMetrics)
+        self.refreshButton.clicked.connect(self.loadMetrics)
+        self.homeButton.clicked.connect(self.openDashboard)
 
-                update_query = """
-                UPDATE Orders 
-                SET StatusID = (SELECT StatusID FROM Status WHERE StatusTitle = 'Shipped') 
-                WHERE OrderID = ?
-                """
-                cursor.execute(update_query, (order_id,))
-                connection.commit()
-                connection.close()
+        # Only this process changes while the window is open; the exported
+        # files are rewritten every few seconds, so refresh them too.
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.loadMetrics)
+        self.reopen()
 
-                self.showPendingOrders()
+    def reopen(self):
+        current = self.processCombo.currentText()
+        self.processCombo.clear()
+        self.processCombo.addItems([self.THIS_PROCESS, *exported_processes(exclude="admin")])
+        self.processCombo.setCurrentIndex(max(self.processCombo.findText(current), 0))
+        self.loadMetrics()
+        self.timer.start(self.REFRESH_MS)
 
-                QMessageBox.information(self, "Success", "Order processed and marked as Shipped.")
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
 
-            except Exception as e:
-                QMessageBox.critical(self, "Database Error", f"Failed to process the order: {e}")
+    def openDashboard(self):
+        get_navigator().show(AdminDashboardWindow)
+
+    def loadMetrics(self):
+        process = self.processCombo.currentText()
+        try:
+            report = load_report(None if process == self.THIS_PROCESS else process)
+        except OSError as e:
+            self.summaryLabel.setText(f"Could not read the metrics of {process}: {e}")
+            return
+        self.summaryLabel.setText(summary(report))
+        self.statementsModel.set_rows(statement_rows(report))
+        self.actionsModel.set_rows(action_rows(report))
 
 
-        
 def main():
     app = QApplication(sys.argv)
-    dashboard_window = AdminDashboardWindow()
-    dashboard_window.show()
+    app.aboutToQuit.connect(get_pool().close)
+    start_metrics_export(app, "admin")
+    get_navigator().show(AdminDashboardWindow)
+    # Load the reference data behind the first window instead of before it.
+    QueryRunner(app).submit(
+        get_reference_data().refresh,
+        on_result=lambda _: None,
+        on_error=lambda e: print(f"Could not preload reference data: {e}"),
+    )
     sys.exit(app.exec())
 
 
@@ -1,35 +1,112 @@
-import pyodbc
+import os
 import sys
-from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QTableWidgetItem
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.uic import loadUi
+from PyQt6.QtWidgets import QApplication, QCompleter, QMainWindow, QMessageBox, QTableWidgetItem
+from PyQt6.QtCore import QObject, Qt, QSize, QStringListModel, QTimer
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.forms import load_form
+from shared.navigation import get_navigator
+from shared.pool import get_pool
+from shared.dao import CustomerRepository, EmptyCartError, OrderRepository, OutOfStockError, ProductRepository
+from shared.diagnostics import start_metrics_export
+from shared.refdata import get_reference_data
+from shared.cart import CartBuffer
+from shared.search import notify_products_changed, search_products, suggest_products
+from shared.session import CustomerSession
+from shared.thumbnails import cache_pixmap, cached_pixmap, configure_pixmap_cache, load_thumbnail
+from shared.workers import QueryRunner
+
+FORMS = os.path.dirname(os.path.abspath(__file__))
+
+
+class CartWriter(QObject):
+    """Flushes a session's cart buffer once the customer stops editing for DEBOUNCE_MS.
+
+    A failed write is retried with doubling delays up to MAX_RETRIES times;
+    then the customer is told the cart is not being saved, and the next edit
+    (or checkout) tries again.
+    """
+
+    DEBOUNCE_MS = 800
+    MAX_RETRIES = 5
+    MAX_BACKOFF_MS = 30_000
+
+    def __init__(self, cart, parent=None):
+        super().__init__(parent)
+        self.cart = cart
+        self.queries = QueryRunner(self)
+        self.failures = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self):
+        """Restart the countdown; call after every edit."""
+        self.failures = 0
+        self.timer.start(self.DEBOUNCE_MS)
+
+    def flush(self):
+        """Write pending edits in the background."""
+        self.timer.stop()
+        if self.cart.dirty():
+            self.queries.submit(CartBuffer.flush, self.cart, on_result=self.flushed, on_error=self.failed)
+
+    def flush_now(self):
+        """Write pending edits before returning, e.g. before checkout or on exit.
+
+        Also waits for a background flush that is still writing.
+        """
+        self.timer.stop()
+        self.cart.flush()
+
+    def flushed(self, _):
+        self.failures = 0
+        # Edits made while the batch was being written go out with the next one.
+        if self.cart.dirty():
+            self.schedule()
+
+    def failed(self, error):
+        self.failures += 1
+        print(f"Could not save the cart (attempt {self.failures}): {error}")
+        if self.failures <= self.MAX_RETRIES:
+            self.timer.start(min(self.DEBOUNCE_MS * 2 ** self.failures, self.MAX_BACKOFF_MS))
+            return
+        QMessageBox.warning(QApplication.activeWindow(), "Cart Not Saved",
+                            f"Your cart could not be saved: {error}\n\n"
+                            "Your changes are kept here and will be saved with your next change or at checkout.")
 
 
-# Database Connection
-def get_database_connection():
-    """Establish and return a database connection."""
-    try:
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        print("Connected to the database successfully.")
-        return connection
-    except pyodbc.Error as e:
-        print(f"Database connection error: {e}")
-        return None
+_cart_writers = {}  # CustomerSession -> CartWriter
+
+
+def cart_writer(session):
+    """Return the CartWriter of ``session``, creating it on first use."""
+    writer = _cart_writers.get(session)
+    if writer is None:
+        writer = _cart_writers[session] = CartWriter(session.cart, QApplication.instance())
+    return writer
+
+
+def place_order(session, shipping_address, order_date):
+    """Write the cart's pending edits, then turn the cart into an order; run off the GUI thread."""
+    # The order is built from the cart in the database, so the edits must be there first.
+    session.cart.flush()
+    return OrderRepository().place_order(session.customer_id, shipping_address, order_date)
+
+
+def flush_carts():
+    for writer in _cart_writers.values():
+        try:
+            writer.flush_now()
+        except Exception as e:
+            print(f"Could not save the cart: {e}")
 
 
 class LoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        loadUi('login.ui', self)
+        load_form(self, FORMS, 'login.ui')
 
         # Connect signals
         self.loginButton.clicked.connect(self.handle_login)
@@ -42,73 +119,53 @@ class LoginWindow(QMainWindow):
 
     def handle_login(self):
         """Handle user login."""
-        self.email = self.emailInput.text()
+        email = self.emailInput.text()
         password = self.passwordInput.text()
 
-        if not self.email or not password:
+        if not email or not password:
             self.show_error_message("Please fill in both email and password.")
             return
 
-        # Verify credentials in the database
-        connection = get_database_connection()
-        if not connection:
-            self.show_error_message("Database connection error.")
-            return
-
+        # Verify credentials and load the customer's ID and profile in one query
         try:
-            query = "SELECT EmailID, Password FROM Customers WHERE EmailID = ? AND Password = ?"
-            cursor = connection.cursor()
-            cursor.execute(query, (self.email, password))
-            result = cursor.fetchone()
-
-            if result:
-                QMessageBox.information(self, "Login Successful", "Welcome to the system!")
-                self.open_dashboard()
-            else:
-                self.show_error_message("Invalid email or password.")
-        except pyodbc.Error as e:
+            self.session = CustomerSession.sign_in(email, password)
+        except Exception as e:
             self.show_error_message(f"Database query error: {e}")
-        finally:
-            connection.close()
+            return
+
+        if self.session:
+            QMessageBox.information(self, "Login Successful", "Welcome to the system!")
+            self.open_dashboard()
+        else:
+            self.show_error_message("Invalid email or password.")
 
     def create_account(self):
-        self.hide()
-        self.register_window = RegistrationWindow()
-        self.register_window.show()
+        get_navigator().show(RegistrationWindow)
 
     def reset_password(self):
         QMessageBox.information(self, "Reset Password", "Password reset functionality is under development.")
 
     def open_dashboard(self):
-        self.hide()
-        self.dashboard = MainDashboard(self.email)
-        self.dashboard.show()
+        get_navigator().show(MainDashboard, self.session)
 
 
 class RegistrationWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        loadUi("registration.ui", self)
+        load_form(self, FORMS, "registration.ui")
         self.pushButton.clicked.connect(self.register_account)
         self.populate_city_combo_box()
 
     def populate_city_combo_box(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT CityName FROM Cities")
-            self.comboBox.clear()
-            self.comboBox.addItem("City")
-            for row in cursor.fetchall():
-                self.comboBox.addItem(row[0])
+            cities = get_reference_data().city_names()
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load cities: {e}")
-        finally:
-            connection.close()
+            return
+
+        self.comboBox.clear()
+        self.comboBox.addItem("City")
+        self.comboBox.addItems(cities)
 
     def register_account(self):
         first_name = self.lineEdit.text().strip()
@@ -135,88 +192,64 @@ class RegistrationWindow(QMainWindow):
             self.show_error_message("Please select a valid city.")
             return
 
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
         try:
-            query = """
-            INSERT INTO Customers (FirstName, LastName, EmailID, Password, ContactNumber, City, DeliveryAddress)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (first_name, last_name, email, password, contact_number, city, delivery_address))
-            connection.commit()
-            QMessageBox.information(self, "Success", "Account registered successfully!")
-            self.loginWindow = LoginWindow()
-            self.loginWindow.show()
-            self.close()
-        except pyodbc.Error as e:
+            CustomerRepository().register(first_name, last_name, email, password, contact_number, city, delivery_address)
+        except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to register account: {e}")
-        finally:
-            connection.close()
+            return
+
+        QMessageBox.information(self, "Success", "Account registered successfully!")
+        get_navigator().show(LoginWindow)
 
     def show_error_message(self, message):
         QMessageBox.critical(self, "Registration Error", message)
 
 
 class AccountWindow(QMainWindow):
-    def __init__(self, email):
+    def __init__(self, session):
         super().__init__()
-        loadUi("account.ui", self)
+        load_form(self, FORMS, "account.ui")
         
-        self.email = email
+        self.session = session
+        self.queries = QueryRunner(self)
         
         self.pushButton_5.clicked.connect(self.update_account_info)
         self.populate_account_info()
         self.populate_city_combo_box()
 
+    def reopen(self):
+        self.populate_account_info()
+
     def populate_account_info(self):
-        """Load customer account info."""
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
+        """Load customer account info in the background."""
+        self.queries.submit(
+            CustomerRepository().profile, self.session.customer_id,
+            on_result=self.display_account_info,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to fetch account info: {e}"),
+        )
 
-        try:
-            query = "SELECT FirstName, LastName, EmailID, ContactNumber, Password, City, DeliveryAddress FROM Customers WHERE EmailID = ?"
-            cursor = connection.cursor()
-            cursor.execute(query, (self.email,))
-            result = cursor.fetchone()
-
-            if result:
-                self.lineEdit_5.setText(str(result[0]))  # Name
-                self.lastNameInput.setText(str(result[1]))
-                self.lineEdit.setText(str(result[2]))  # Email
-                self.lineEdit_2.setText(str(result[3]))  # Phone
-                self.lineEdit_3.setText(str(result[4]))  # Password
-                self.comboBox.setCurrentText(str(result[5]))  # City
-                self.lineEdit_4.setText(str(result[6]))  # Address
-            else:
-                QMessageBox.warning(self, "Error", "Customer information not found.")
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to fetch account info: {e}")
-        finally:
-            connection.close()
+    def display_account_info(self, result):
+        if result:
+            self.lineEdit_5.setText(str(result[0]))  # Name
+            self.lastNameInput.setText(str(result[1]))
+            self.lineEdit.setText(str(result[2]))  # Email
+            self.lineEdit_2.setText(str(result[3]))  # Phone
+            self.lineEdit_3.setText(str(result[4]))  # Password
+            self.comboBox.setCurrentText(str(result[5]))  # City
+            self.lineEdit_4.setText(str(result[6]))  # Address
+        else:
+            QMessageBox.warning(self, "Error", "Customer information not found.")
 
     def populate_city_combo_box(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT CityName FROM Cities")
-            self.comboBox.clear()
-            self.comboBox.addItem("Select City")
-            for row in cursor.fetchall():
-                self.comboBox.addItem(row[0])
+            cities = get_reference_data().city_names()
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load cities: {e}")
-        finally:
-            connection.close()
+            return
+
+        self.comboBox.clear()
+        self.comboBox.addItem("Select City")
+        self.comboBox.addItems(cities)
 
     def update_account_info(self):
         name = self.lineEdit_5.text()
@@ -231,33 +264,22 @@ class AccountWindow(QMainWindow):
             QMessageBox.warning(self, "Validation Error", "All fields must be filled in.")
             return
 
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
         try:
-            query = """
-            UPDATE Customers
-            SET FirstName = ?, LastName = ?, ContactNumber = ?, Password = ?, City = ?, DeliveryAddress = ?
-            WHERE EmailID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (name, lastName, phone, password, city, address, email))
-            connection.commit()
-            QMessageBox.information(self, "Success", "Account information updated successfully!")
+            CustomerRepository().update_profile(self.session.customer_id, name, lastName, email, phone, password, city, address)
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to update account info: {e}")
-        finally:
-            connection.close()
+            return
+        # The cached name and address are stale now; windows reread them on next use.
+        self.session.invalidate()
+        QMessageBox.information(self, "Success", "Account information updated successfully!")
 
 
 class MainDashboard(QMainWindow):
-    def __init__(self, email):
+    def __init__(self, session):
         super().__init__()
-        loadUi("maindashboard.ui", self)
+        load_form(self, FORMS, "maindashboard.ui")
         
-        self.email = email
+        self.session = session
 
         # Connect signals
         self.pushButton.clicked.connect(self.open_search_products)
@@ -266,14 +288,10 @@ class MainDashboard(QMainWindow):
         self.pushButton_5.clicked.connect(self.open_account)
 
     def open_search_products(self):
-        self.hide()
-        self.search_product_window = SearchProduct(self.email)
-        self.search_product_window.show()
+        get_navigator().show(SearchProduct, self.session)
 
     def open_cart(self):
-        self.hide()
-        self.cart_window = CartWindow(self.email)
-        self.cart_window.show()
+        get_navigator().show(CartWindow, self.session)
 
     # def open_checkout(self):
     #     self.hide()
@@ -281,82 +299,99 @@ class MainDashboard(QMainWindow):
     #     self.checkout_window.show()
 
     def open_account(self):
-        self.hide()
-        self.account_window = AccountWindow(self.email)
-        self.account_window.show()
+        get_navigator().show(AccountWindow, self.session)
 
 
 class SearchProduct(QMainWindow):
-    def __init__(self, email):
+    def __init__(self, session):
         super().__init__()
-        loadUi("searchproduct.ui", self)
+        load_form(self, FORMS, "searchproduct.ui")
+        self.queries = QueryRunner(self)
         self.comboBox.setEnabled(True)
         self.populate_categories()
         self.comboBox.currentIndexChanged.connect(self.show_details)
         self.homeButton.clicked.connect(self.openDashboard)
-        self.email = email
+        self.session = session
+
+        # Typeahead: suggestions come from the search index as the user types.
+        self.suggestions = QStringListModel(self)
+        completer = QCompleter(self.suggestions, self)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.activated.connect(self.show_details)
+        self.searchEdit.setCompleter(completer)
+        self.searchEdit.textEdited.connect(self.suggest)
+        self.searchEdit.returnPressed.connect(self.show_details)
+        self.minPrice.editingFinished.connect(self.show_details)
+        self.maxPrice.editingFinished.connect(self.show_details)
+        self.inStockCheck.toggled.connect(self.show_details)
 
         # Connect the details button to open the product page
         self.detailsButton.clicked.connect(self.open_product_page_from_button)
 
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = MainDashboard(self.email)
-        self.addProductsWindow.show()
+        self.queries.cancel("products")
+        get_navigator().show(MainDashboard, self.session)
     
     def populate_categories(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT CategoryName FROM Categories")
-            self.comboBox.clear()
-            self.comboBox.addItem("Select Category")
-            for row in cursor.fetchall():
-                self.comboBox.addItem(row[0])
+            categories = get_reference_data().category_names()
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load categories: {e}")
-        finally:
-            connection.close()
+            return
+
+        self.comboBox.clear()
+        self.comboBox.addItem("Select Category")
+        self.comboBox.addItems(categories)
+
+    def suggest(self, text):
+        self.queries.submit(
+            suggest_products, text,
+            on_result=self.suggestions.setStringList,
+            channel="suggest",
+        )
 
     def show_details(self):
+        query = self.searchEdit.text().strip()
         selected_category = self.comboBox.currentText()
-        if selected_category == "Select Category":
-            QMessageBox.warning(self, "Warning", "Please select a valid category.")
-            return
-
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
+        if selected_category == "Select Category" and not query:
+            # A search still loading must not refill the cleared grid.
+            self.queries.cancel("products")
+            self.tableWidget.setRowCount(0)
             return
 
         try:
-            query = """
-            SELECT ProductName, Price 
-            FROM Products 
-            WHERE CategoryID = (SELECT CategoryID FROM Categories WHERE CategoryName = ?)
-            and status = 'Active'
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (selected_category,))
-            products = cursor.fetchall()
-
-            if not products:
-                QMessageBox.warning(self, "No Products", "No products found for the selected category.")
-                return
-
-            self.tableWidget.setRowCount(len(products))
-            for row_number, product in enumerate(products):
-                self.tableWidget.setItem(row_number, 0, QTableWidgetItem(product[0]))  # Product Name (Index 0)
-                self.tableWidget.setItem(row_number, 1, QTableWidgetItem(str(product[1])))  # Price (Index 1)
-
+            category_id = None
+            if selected_category != "Select Category":
+                category_id = get_reference_data().category_id(selected_category)
         except Exception as e:
+            self.queries.cancel("products")
             QMessageBox.critical(self, "Database Error", f"Error fetching products: {e}")
-        finally:
-            connection.close()
+            return
+
+        # A price box at its minimum shows "any" and means no bound.
+        min_price = self.minPrice.value() or None
+        max_price = self.maxPrice.value() or None
+
+        # Typing or picking another filter before this one loads makes this request stale.
+        self.queries.submit(
+            search_products, query, category_id, min_price, max_price, self.inStockCheck.isChecked(),
+            on_result=self.display_products,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Error fetching products: {e}"),
+            channel="products",
+        )
+
+    def display_products(self, products):
+        self.tableWidget.setRowCount(len(products))
+        if not products:
+            QMessageBox.warning(self, "No Products", "No products match the search.")
+            return
+
+        for row_number, (product_sku, name, price, _, _) in enumerate(products):
+            name_item = QTableWidgetItem(name)
+            name_item.setData(Qt.ItemDataRole.UserRole, product_sku)
+            self.tableWidget.setItem(row_number, 0, name_item)
+            self.tableWidget.setItem(row_number, 1, QTableWidgetItem(str(price)))
 
     def open_product_page_from_button(self):
         # Get the selected row from the table
@@ -367,99 +402,97 @@ class SearchProduct(QMainWindow):
             return
 
         # Get the product details from the selected row
-        selected_product_name = self.tableWidget.item(selected_row, 0).text()
+        name_item = self.tableWidget.item(selected_row, 0)
         selected_product_price = self.tableWidget.item(selected_row, 1).text()
 
+        # The customer moved on; a search still loading must not replace the listing
+        self.queries.cancel("products")
+
         # Open the ProductPage with the selected product details
-        self.product_page_window = ProductPage(selected_product_name, selected_product_price, self.email)
+        self.product_page_window = ProductPage(name_item.data(Qt.ItemDataRole.UserRole), name_item.text(),
+                                               selected_product_price, self.session)
         self.product_page_window.show()
 
 
 class ProductPage(QMainWindow):
-    def __init__(self, product_name, product_price, customer_id):
+    def __init__(self, product_sku, product_name, product_price, session):
         super().__init__()
-        loadUi("ProductPage.ui", self)
+        load_form(self, FORMS, "ProductPage.ui")
+        self.queries = QueryRunner(self)
+        self.product_id = None
 
         self.titleLabel.setText(product_name)
         self.priceLabel.setText(product_price)
-        self.customer_id = customer_id  # Store the customer ID for cart operations
-        self.populate_product_details(product_name)
+        self.session = session
+        self.populate_product_details(product_sku)
 
         # Connect the cart button to the add_to_cart method
         self.cartButton.clicked.connect(self.add_to_cart)
     
-    def populate_product_details(self, product_name):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
+    def populate_product_details(self, product_sku):
+        self.queries.submit(
+            ProductRepository().details, product_sku,
+            on_result=self.display_product_details,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to fetch product details: {e}"),
+        )
 
-        try:
-            query = """
-            SELECT ProductSKU, Description, StockQuantity, ProductImage 
-            FROM Products 
-            WHERE ProductName = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (product_name,))
-            product_details = cursor.fetchone()
-
-            if product_details:
-                self.product_id = product_details[0]  
-                self.descriptionLabel.setText(product_details[1])  
-                self.load_product_image(product_details[3]) 
-            else:
-                QMessageBox.warning(self, "Error", "Product details not found.")
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to fetch product details: {e}")
-        finally:
-            connection.close()
+    def display_product_details(self, product_details):
+        if product_details:
+            self.product_id = product_details[0]  
+            self.descriptionLabel.setText(product_details[1])  
+            self.load_product_image(product_details[3]) 
+            self.product_name, self.product_price = product_details[4], product_details[5]
+        else:
+            QMessageBox.warning(self, "Error", "Product details not found.")
 
     def load_product_image(self, image_path):
-        if image_path:
-            pixmap = QPixmap(image_path)
-            self.imageLabel.setPixmap(
-                pixmap.scaled(self.imageLabel.size(), Qt.AspectRatioMode.KeepAspectRatio)
-            )
-
-    def add_to_cart(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
+        if not image_path:
+            return
+        size_name = "page@2x" if self.devicePixelRatioF() > 1 else "page"
+        pixmap = cached_pixmap(image_path, size_name)
+        if pixmap is not None:
+            self.show_product_image(pixmap)
             return
 
-        try:
-            query_customer_id = "SELECT CustomerID FROM Customers WHERE EmailID = ?"
-            cursor = connection.cursor()
-            cursor.execute(query_customer_id, (self.customer_id,))  # self.customer_id holds the email
+        # Reading and decoding the file happens on the thread pool.
+        self.queries.submit(
+            load_thumbnail, image_path, size_name,
+            on_result=lambda image: self.show_product_image(cache_pixmap(image_path, size_name, image)),
+            on_error=lambda e: print(f"Could not load product image: {e}"),
+            channel="image",
+        )
 
-            customer_id = cursor.fetchone()
+    def show_product_image(self, pixmap):
+        pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        self.imageLabel.setPixmap(pixmap)
 
-            if not customer_id:
-                QMessageBox.warning(self, "Error", "Customer not found.")
-                return
+    def add_to_cart(self):
+        if self.product_id is None:
+            QMessageBox.warning(self, "Please Wait", "Product details are still loading.")
+            return
 
-            customer_id = customer_id[0]  
+        cart = self.session.cart
+        if not cart.loaded:
+            # Adding counts on top of what is already in the cart, so read it once first.
+            self.queries.submit(
+                CartBuffer.load, cart,
+                on_result=lambda _: self.add_to_cart(),
+                on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to add product to cart: {e}"),
+                channel="cart",
+            )
+            return
 
-            query_insert = """
-            INSERT INTO ShoppingCart (CustomerID, ProductID, Quantity)
-            VALUES (?, ?, ?)
-            """
-            cursor.execute(query_insert, (customer_id, int(self.product_id), 1)) 
-            connection.commit()
-
-            QMessageBox.information(self, "Success", "Product added to cart successfully.")
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to add product to cart: {e}")
-        finally:
-            connection.close()
+        cart.add(int(self.product_id), self.product_name, self.product_price)
+        cart_writer(self.session).schedule()
+        QMessageBox.information(self, "Success", "Product added to cart successfully.")
 
 
 class CartWindow(QMainWindow):
-    def __init__(self, customer_email):
+    def __init__(self, session):
         super().__init__()
-        loadUi("cart.ui", self)
-        self.customer_email = customer_email
+        load_form(self, FORMS, "cart.ui")
+        self.session = session
+        self.queries = QueryRunner(self)
 
         self.addButton.clicked.connect(self.increase_quantity)
         self.subButton.clicked.connect(self.decrease_quantity)
@@ -469,47 +502,47 @@ class CartWindow(QMainWindow):
 
         self.load_cart_data()
 
+    def reopen(self):
+        self.load_cart_data()
+
+    def hideEvent(self, event):
+        # Leaving the cart (or closing it) writes the edits without waiting for the timer.
+        cart_writer(self.session).flush()
+        super().hideEvent(event)
+
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = MainDashboard(self.customer_email)
-        self.addProductsWindow.show()
+        get_navigator().show(MainDashboard, self.session)
     
     def load_cart_data(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
+        cart = self.session.cart
+        if cart.loaded:
+            self.display_cart(cart.lines())
             return
+        self.queries.submit(
+            CartBuffer.load, cart,
+            on_result=self.display_cart,
+            on_error=lambda e: QMessageBox.critical(self, "Database Error", f"Failed to load cart data: {e}"),
+            channel="cart",
+        )
 
-        try:
-            query = """
-            SELECT p.ProductName, c.Quantity, p.Price 
-            FROM ShoppingCart c
-            JOIN Products p ON c.ProductID = p.ProductSKU
-            JOIN Customers cu ON c.CustomerID = cu.CustomerID
-            WHERE cu.EmailID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (self.customer_email,))
-            cart_items = cursor.fetchall()
-
-            self.cartProducts.setRowCount(len(cart_items))
-            total_amount = 0
-
-            for row_number, (product_name, quantity, price) in enumerate(cart_items):
-                total = quantity * price
-                total_amount += total
-
-                self.cartProducts.setItem(row_number, 0, QTableWidgetItem(product_name))
-                self.cartProducts.setItem(row_number, 1, QTableWidgetItem(str(quantity)))
-                self.cartProducts.setItem(row_number, 2, QTableWidgetItem(f"{price:.2f}"))
-                self.cartProducts.setItem(row_number, 3, QTableWidgetItem(f"{total:.2f}"))
-
-            self.totalAmount.setText(f"{total_amount:.2f}")
+    def display_cart(self, cart_lines):
+        self.cartProducts.setRowCount(len(cart_lines))
+        for row_number, line in enumerate(cart_lines):
+            self.set_cart_row(row_number, line)
+        self.show_cart_total()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to load cart data: {e}")
-        finally:
-            connection.close()
+    def set_cart_row(self, row_number, line):
+        product_sku, product_name, quantity, price = line
+        name_item = QTableWidgetItem(product_name)
+        name_item.setData(Qt.ItemDataRole.UserRole, product_sku)
+
+        self.cartProducts.setItem(row_number, 0, name_item)
+        self.cartProducts.setItem(row_number, 1, QTableWidgetItem(str(quantity)))
+        self.cartProducts.setItem(row_number, 2, QTableWidgetItem(f"{price:.2f}"))
+        self.cartProducts.setItem(row_number, 3, QTableWidgetItem(f"{quantity * price:.2f}"))
+
+    def show_cart_total(self):
+        self.totalAmount.setText(f"{self.session.cart.total():.2f}")
 
     def update_cart_quantity(self, change):
         selected_row = self.cartProducts.currentRow()
@@ -517,36 +550,17 @@ class CartWindow(QMainWindow):
             QMessageBox.warning(self, "Selection Error", "Please select a product.")
             return
 
-        product_name = self.cartProducts.item(selected_row, 0).text()
+        product_sku = self.cartProducts.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
         current_quantity = int(self.cartProducts.item(selected_row, 1).text()) + change
 
         if current_quantity < 1:
             QMessageBox.warning(self, "Quantity Error", "Quantity cannot be less than 1.")
             return
 
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
-        try:
-            query = """
-            UPDATE ShoppingCart
-            SET Quantity = ?
-            WHERE ProductID = (SELECT ProductSKU FROM Products WHERE ProductName = ?)
-            AND CustomerID = (SELECT CustomerID FROM Customers WHERE EmailID = ?)
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (current_quantity, product_name, self.customer_email))
-            connection.commit()
-
-            # Refresh the cart view
-            self.load_cart_data()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to update quantity: {e}")
-        finally:
-            connection.close()
+        # Update just this line and the total; the database follows after the debounce.
+        self.set_cart_row(selected_row, self.session.cart.set_quantity(product_sku, current_quantity))
+        self.show_cart_total()
+        cart_writer(self.session).schedule()
 
     def increase_quantity(self):
         self.update_cart_quantity(1)
@@ -560,211 +574,104 @@ class CartWindow(QMainWindow):
             QMessageBox.warning(self, "Selection Error", "Please select a product.")
             return
 
-        product_name = self.cartProducts.item(selected_row, 0).text()
-
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
-        try:
-            query = """
-            DELETE FROM ShoppingCart
-            WHERE ProductID = (SELECT ProductSKU FROM Products WHERE ProductName = ?)
-            AND CustomerID = (SELECT CustomerID FROM Customers WHERE EmailID = ?)
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (product_name, self.customer_email))
-            connection.commit()
-
-            # Refresh the cart view
-            self.load_cart_data()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to remove product: {e}")
-        finally:
-            connection.close()
+        product_sku = self.cartProducts.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
+        self.session.cart.remove(product_sku)
+        self.cartProducts.removeRow(selected_row)
+        self.show_cart_total()
+        cart_writer(self.session).schedule()
     
     def open_checkout_window(self):
-        # Create and show the checkout window
-        self.checkout_window = CheckOutWindow(self.customer_email)
-        self.checkout_window.show()
+        get_navigator().show(CheckOutWindow, self.session)
 
 
 class CheckOutWindow(QMainWindow):
-    def __init__(self, customer_email):
+    def __init__(self, session):
         super().__init__()
-        loadUi("checkout.ui", self)
-        self.customer_email = customer_email
+        load_form(self, FORMS, "checkout.ui")
+        self.session = session
+        self.queries = QueryRunner(self)
 
         self.load_checkout_data()
         self.homeButton.clicked.connect(self.openDashboard)
         self.confirmButton.clicked.connect(self.confirm_checkout)
 
+    def reopen(self):
+        self.load_checkout_data()
+
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = MainDashboard(self.customer_email)
-        self.addProductsWindow.show()
+        get_navigator().show(MainDashboard, self.session)
         
     def load_checkout_data(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
-        try:
-            query = """
-            SELECT p.ProductName, c.Quantity, p.Price 
-            FROM ShoppingCart c
-            JOIN Products p ON c.ProductID = p.ProductSKU
-            JOIN Customers cu ON c.CustomerID = cu.CustomerID
-            WHERE cu.EmailID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query, (self.customer_email))
-            cart_items = cursor.fetchall()
-
-            self.checkOutProducts.setRowCount(len(cart_items))
-            total_amount = 0
-
-            for row_number, (product_name, quantity, price) in enumerate(cart_items):
-                total = quantity * price
-                total_amount += total
-
-                self.checkOutProducts.setItem(row_number, 0, QTableWidgetItem(product_name))
-                self.checkOutProducts.setItem(row_number, 1, QTableWidgetItem(str(quantity)))
-                self.checkOutProducts.setItem(row_number, 2, QTableWidgetItem(f"{price:.2f}"))
-                self.checkOutProducts.setItem(row_number, 3, QTableWidgetItem(f"{total:.2f}"))
-
-            self.totalAmount.setText(f"{total_amount:.2f}")
-
-            query_address = """
-            SELECT DeliveryAddress 
-            FROM Customers 
-            WHERE EmailID = ?
-            """
-            cursor.execute(query_address, (self.customer_email,))
-            address = cursor.fetchone()
-
-            if address:
-                self.addressInput.setText(address[0])
-            else:
-                self.addressInput.setText("No address found.")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to load checkout data: {e}")
-        finally:
-            connection.close()
+        show_error = lambda e: QMessageBox.critical(self, "Database Error", f"Failed to load checkout data: {e}")
+        cart = self.session.cart
+        if cart.loaded:
+            self.display_checkout_items(cart.lines())
+        else:
+            self.queries.submit(CartBuffer.load, cart, on_result=self.display_checkout_items, on_error=show_error,
+                                channel="cart")
+        # The address comes from the session and is only read again after the account was edited.
+        self.queries.submit(CustomerSession.profile, self.session,
+                            on_result=self.display_address, on_error=show_error)
+
+    def display_checkout_items(self, cart_items):
+        self.checkOutProducts.setRowCount(len(cart_items))
+        total_amount = 0
+
+        for row_number, (_, product_name, quantity, price) in enumerate(cart_items):
+            total = quantity * price
+            total_amount += total
+
+            self.checkOutProducts.setItem(row_number, 0, QTableWidgetItem(product_name))
+            self.checkOutProducts.setItem(row_number, 1, QTableWidgetItem(str(quantity)))
+            self.checkOutProducts.setItem(row_number, 2, QTableWidgetItem(f"{price:.2f}"))
+            self.checkOutProducts.setItem(row_number, 3, QTableWidgetItem(f"{total:.2f}"))
+
+        self.totalAmount.setText(f"{total_amount:.2f}")
+
+    def display_address(self, profile):
+        address = profile[4]
+        self.addressInput.setText(address if address else "No address found.")
 
     def confirm_checkout(self):
-        connection = get_database_connection()
-        if not connection:
-            QMessageBox.critical(self, "Database Error", "Unable to connect to the database.")
-            return
-
-        try:
-            query_customer = """
-            SELECT CustomerID, DeliveryAddress 
-            FROM Customers 
-            WHERE EmailID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query_customer, (self.customer_email,))
-            customer = cursor.fetchone()
-
-            if not customer:
-                QMessageBox.critical(self, "Customer Error", "Customer details not found.")
-                return
-
-            customer_id = customer[0]
-            shipping_address = self.addressInput.text()
-
-            order_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            query_insert_order = """
-            INSERT INTO Orders (CustomerID, StatusID, ShippingAddress, OrderDate)
-            VALUES (?, 1, ?, ?)
-            """
-            cursor.execute(query_insert_order, (customer_id, shipping_address, order_date))
-            connection.commit()
-
-            query_order_id = "SELECT @@IDENTITY"
-            cursor.execute(query_order_id)
-            order_id = cursor.fetchone()[0]
-
-            self.insert_order_details(connection, order_id, customer_id)
-
-            self.remove_cart_items(connection, customer_id)
-
-            self.update_product_stock(connection, order_id)  
-
-            QMessageBox.information(self, "Success", "Order placed successfully!")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to place the order: {e}")
-        finally:
-            connection.close()
-
-    def insert_order_details(self, connection, order_id, customer_id):
-        try:
-            query_cart = """
-            SELECT ProductID, Quantity 
-            FROM ShoppingCart
-            WHERE CustomerID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query_cart, (customer_id))
-            cart_items = cursor.fetchall()
-
-            if cart_items:
-                for product in cart_items:
-                    product_id = product[0]
-                    quantity = product[1]
-
-                    query_insert_order_details = """
-                    INSERT INTO OrderItems (OrderID, ProductSKU, Quantity)
-                    VALUES (?, ?, ?)
-                    """
-                    cursor.execute(query_insert_order_details, (order_id, product_id, quantity))
-                
-                connection.commit()
-            else:
-                QMessageBox.warning(self, "Cart Empty", "Your cart is empty. Please add products before proceeding.")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to insert order details: {e}")
-
-    def remove_cart_items(self, connection, customer_id):
-        try:
-            query_remove_cart_items = """
-            DELETE FROM ShoppingCart
-            WHERE CustomerID = ?
-            """
-            cursor = connection.cursor()
-            cursor.execute(query_remove_cart_items, (customer_id,))
-            connection.commit()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to remove items from cart: {e}")
-
-    def update_product_stock(self, connection, order_id):
-        try:
-            query_update_stock = """
-            UPDATE Products
-            SET StockQuantity = StockQuantity - (SELECT Quantity FROM OrderItems WHERE ProductSKU = Products.ProductSKU AND OrderID = ?)
-            WHERE ProductSKU IN (SELECT ProductSKU FROM Orders WHERE OrderID = ?)
-            """
-            cursor = connection.cursor()
-            cursor.execute(query_update_stock, (order_id, order_id))  
-            connection.commit()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to update product stock: {e}")
+        # place_order writes the pending edits itself; no debounced flush should race it.
+        cart_writer(self.session).timer.stop()
+        shipping_address = self.addressInput.text()
+        order_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.confirmButton.setEnabled(False)
+        self.queries.submit(place_order, self.session, shipping_address, order_date,
+                            on_result=self.order_placed, on_error=self.order_failed)
+
+    def order_placed(self, _):
+        self.confirmButton.setEnabled(True)
+        self.session.cart.clear()
+        # Stock changed, so the in-stock search filter must not wait for the next sync.
+        notify_products_changed()
+        QMessageBox.information(self, "Success", "Order placed successfully!")
+
+    def order_failed(self, error):
+        self.confirmButton.setEnabled(True)
+        if isinstance(error, EmptyCartError):
+            QMessageBox.warning(self, "Cart Empty", str(error))
+        elif isinstance(error, OutOfStockError):
+            QMessageBox.warning(self, "Out of Stock", str(error))
+        else:
+            QMessageBox.critical(self, "Database Error", f"Failed to place the order: {error}")
     
 
 def main():
     app = QApplication(sys.argv)
-    login_window = LoginWindow()
-    login_window.show()
+    # Slots run in connection order: save the carts while the pool is still open.
+    app.aboutToQuit.connect(flush_carts)
+    app.aboutToQuit.connect(get_pool().close)
+    start_metrics_export(app, "customer")
+    configure_pixmap_cache()
+    get_navigator().show(LoginWindow)
+    # Load the reference data behind the first window instead of before it.
+    QueryRunner(app).submit(
+        get_reference_data().refresh,
+        on_result=lambda _: None,
+        on_error=lambda e: print(f"Could not preload reference data: {e}"),
+    )
     sys.exit(app.exec())
 
 
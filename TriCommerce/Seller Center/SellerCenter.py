@@ -1,15 +1,44 @@
-import pyodbc
+import os
 import sys
-from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QTableWidgetItem, QFileDialog
+import threading
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QFileDialog, QProgressDialog
 from PyQt6.QtGui import QIntValidator
-from PyQt6.uic import loadUi
 from datetime import date
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.forms import load_form
+from shared.navigation import get_navigator
+from shared.pool import get_pool
+from shared.dao import OrderRepository, ProductRepository, SellerRepository
+from shared.diagnostics import start_metrics_export
+from shared.export_dialog import ExportRunner
+from shared.product_import import BATCH_SIZE, import_products
+from shared.refdata import get_reference_data
+from shared.tablemodel import attach_model, selected_row
+from shared.thumbnails import generate_thumbnails
+from shared.workers import QueryRunner
+
+FORMS = os.path.dirname(os.path.abspath(__file__))
+
+
+def register_seller(storeName, emailAddress, cnicNumber, bankName, accountNumber, city, address, contactNumber,
+                    password):
+    """Register a seller unless the store name or email is taken; return whether it was registered."""
+    sellers = SellerRepository()
+    if sellers.store_or_email_taken(storeName, emailAddress):
+        return False
+    sellers.register(storeName, emailAddress, cnicNumber, bankName, accountNumber, city, address, contactNumber,
+                     password)
+    return True
+
+
 class LoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         
-        loadUi('Login.ui', self)  
+        load_form(self, FORMS, 'Login.ui')  
+        self.queries = QueryRunner(self)
         
         self.loginButton.clicked.connect(self.onLogin)
         self.newAccountButton.clicked.connect(self.onNewAccount)
@@ -29,38 +58,33 @@ class LoginWindow(QMainWindow):
         email = self.emailInput.text()
         password = self.passwordInput.text()
         
-        query = "select SellerID, EmailID, Password from Sellers where EmailId = ? and Password = ?"
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        cursor = connection.cursor()
-        cursor.execute(query, (email, password))
-        result = cursor.fetchone()
-        if not result:
+        self.loginButton.setEnabled(False)
+        self.queries.submit(SellerRepository().authenticate, email, password,
+                            on_result=self.onAuthenticated, on_error=self.onLoginFailed)
+
+    def onAuthenticated(self, sellerID):
+        self.loginButton.setEnabled(True)
+        if sellerID is None:
             self.showErrorMessage("Email or Password are incorrect.")
         else:
-            self.sellerID = result[0]
-            self.hide()
-            self.dashboard = DashboardWindow(self.sellerID)
-            self.dashboard.show()
-        connection.close()
+            self.sellerID = sellerID
+            get_navigator().show(DashboardWindow, self.sellerID)
+
+    def onLoginFailed(self, error):
+        self.loginButton.setEnabled(True)
+        self.showErrorMessage(f"Could not sign in: {error}")
         
                 
     def onNewAccount(self):
-        self.hide()
-        self.register = RegisterWindow()
-        self.register.show()
+        get_navigator().show(RegisterWindow)
 
 
 class RegisterWindow(QMainWindow):
     def __init__(self):
         super().__init__()
     
-        loadUi('Register.ui', self)  
+        load_form(self, FORMS, 'Register.ui')  
+        self.queries = QueryRunner(self)
         
         self.populateBanks()
         self.populateCities()
@@ -69,36 +93,13 @@ class RegisterWindow(QMainWindow):
         
     
     def populateBanks(self):
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        cursor = connection.cursor()
-        cursor.execute("select BankName from Banks")
         self.bankNameInput.clear() 
-        for row in cursor.fetchall():
-            self.bankNameInput.addItem(row[0])
-        connection.close()
+        self.bankNameInput.addItems(get_reference_data().bank_names())
         
     
     def populateCities(self):
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-
-        cursor = connection.cursor()
-        cursor.execute("select CityName from Cities")
         self.cityInput.clear() 
-        for row in cursor.fetchall():
-            self.cityInput.addItem(row[0])
-        connection.close()
+        self.cityInput.addItems(get_reference_data().city_names())
         
     
     def showErrorMessage(self, s):
@@ -129,89 +130,67 @@ class RegisterWindow(QMainWindow):
         elif not contactNumber.isdigit() or len(contactNumber) != 11:
             self.showErrorMessage("Contact number should be of 11 digits and only contain numeric characters.")
         else:
-            
-            searchQuery = "SELECT StoreName, EmailID FROM Sellers WHERE StoreName = ? OR EmailID = ?"
-            connection = pyodbc.connect(
-                "DRIVER={ODBC Driver 17 for SQL Server};"
-                "SERVER=ZAIN_PC\MYSQL1;"
-                "DATABASE=StoreDatabase;"
-                "Trusted_Connection=yes;"
-                "TrustServerCertificate=yes;"
-            )
-            cursor = connection.cursor()
-            # Assuming emailAddress corresponds to the email and storeName corresponds to the store
-            cursor.execute(searchQuery, (storeName, emailAddress))
-            result = cursor.fetchone()
-            if result:
-                self.showErrorMessage("Email or Store Name already exists!")
-                connection.close()
-            else:
-                query = """INSERT INTO Sellers (StoreName, EmailID, CNIC, BankName, BankAccount, City, BusinessAddress, ContactNumber, Password, AccountStatus) 
-                            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""         
-                connection = pyodbc.connect(
-                    "DRIVER={ODBC Driver 17 for SQL Server};"
-                    "SERVER=ZAIN_PC\MYSQL1;"
-                    "DATABASE=StoreDatabase;"
-                    "Trusted_Connection=yes;"
-                    "TrustServerCertificate=yes;"
-                )
-                cursor = connection.cursor()
-                cursor.execute(query, (storeName, emailAddress, cnicNumber, bankName, accountNumber, city, address, contactNumber, password, "PendingApproval"))
-                connection.commit()
-                connection.close()
-                self.hide()
-                self.loginWindow = LoginWindow()
-                self.loginWindow.show()
+            self.registerButton.setEnabled(False)
+            self.queries.submit(register_seller, storeName, emailAddress, cnicNumber, bankName, accountNumber,
+                                city, address, contactNumber, password,
+                                on_result=self.onRegistered, on_error=self.onRegisterFailed)
+
+    def onRegistered(self, registered):
+        self.registerButton.setEnabled(True)
+        if registered:
+            get_navigator().show(LoginWindow)
+        else:
+            self.showErrorMessage("Email or Store Name already exists!")
+
+    def onRegisterFailed(self, error):
+        self.registerButton.setEnabled(True)
+        self.showErrorMessage(f"Could not register: {error}")
                            
     
 class DashboardWindow(QMainWindow):
     def __init__(self, sellerID):
         super().__init__()
         self.sellerID = sellerID
-        loadUi('SellerDashboard.ui', self)  
+        load_form(self, FORMS, 'SellerDashboard.ui')  
+        self.queries = QueryRunner(self)
     
         self.manageOrdersButton.clicked.connect(self.onManageOrders)
         self.manageProductsButton.clicked.connect(self.onManageProducts)
         self.numOrdersControl()
+
+    def reopen(self):
+        self.numOrdersControl()
         
     def numOrdersControl(self):
-        
-        query = """SELECT COUNT(o.OrderID) AS PendingOrders 
-                        FROM Products p INNER JOIN OrderItems oi ON p.ProductSKU = oi.ProductSKU
-                        INNER JOIN Orders o ON oi.OrderID = o.OrderID
-                        INNER JOIN Status st ON o.StatusID = st.StatusID
-                        WHERE p.SellerID = ? AND st.StatusTitle = 'Pending';"""
-                        
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        cursor = connection.cursor()
-        cursor.execute(query, (self.sellerID))
-        result = cursor.fetchone()
-        self.numOrders.display(result[0])
-        connection.close()
+        # One primary-key lookup in the trigger-maintained SellerDashboard table.
+        self.queries.submit(SellerRepository().dashboard, self.sellerID,
+                            on_result=self.showDashboard)
+
+    def showDashboard(self, counters):
+        pending, shipped, delivered, revenue, low_stock = counters
+        self.numOrders.display(pending)
+        self.summaryLabel.setText(f"Shipped: {shipped}    Delivered: {delivered}    "
+                                  f"Revenue: {revenue:,.2f}    Low stock: {low_stock}")
     
     def onManageOrders(self):
-        self.hide()
-        self.manageOrders = ManageOrdersWindow(self.sellerID)
-        self.manageOrders.show()
+        get_navigator().show(ManageOrdersWindow, self.sellerID)
     
     def onManageProducts(self):
-        self.hide()
-        self.manageProducts = ManageProductsWindow(self.sellerID)
-        self.manageProducts.show()
+        get_navigator().show(ManageProductsWindow, self.sellerID)
 
 
 class ManageProductsWindow(QMainWindow):
+    COLUMNS = ["Product SKU", "Product Name", "Stock", "Price"]
+
     def __init__(self, sellerID):
         super().__init__()
         self.sellerID = sellerID
 
-        loadUi('Manage Products.ui', self)
+        load_form(self, FORMS, 'Manage Products.ui')
+        self.queries = QueryRunner(self)
+        # Product rows are (ProductSKU, SellerID, ProductName, StockQuantity, Price, Status)
+        self.productsModel = attach_model(self.productsTable, self.COLUMNS, key_column=0, columns=[0, 2, 3, 4])
+        self.currentStatus = None
 
         self.addProductButton.clicked.connect(self.onAddProduct)
         self.activeButton.clicked.connect(self.show_active_products)
@@ -219,43 +198,39 @@ class ManageProductsWindow(QMainWindow):
         self.inactiveButton.clicked.connect(self.show_inactive_products)
         self.activateButton.clicked.connect(self.toggle_product_status)
         self.homeButton.clicked.connect(self.openDashboard)
-        
-        self.connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        self.cursor = self.connection.cursor()
+        self.exports = ExportRunner(self, self.queries)
+        self.exportButton.clicked.connect(self.export_products)
 
         self.load_products("Active")  
+
+    def reopen(self):
+        self.load_products(self.currentStatus)
     
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = DashboardWindow(self.sellerID)
-        self.addProductsWindow.show()
+        get_navigator().show(DashboardWindow, self.sellerID)
     
     def onAddProduct(self):
-        self.hide()
-        self.addProductsWindow = AddProductsWindow(self.sellerID)
-        self.addProductsWindow.show()
+        get_navigator().show(AddProductsWindow, self.sellerID)
+
+    def export_products(self):
+        # All of the seller's products, whatever their status
+        self.exports.start("products", "my-products", seller_id=self.sellerID, button=self.exportButton)
         
 
     def load_products(self, status):
-        # Clear the current table contents
-        self.productsTable.setRowCount(0)
-        
-        query = f"SELECT ProductSKU, ProductName, StockQuantity, Price, Status FROM Products WHERE Status = ? and sellerID = ?"
-        self.cursor.execute(query, (status, self.sellerID))
-        rows = self.cursor.fetchall()
+        self.currentStatus = status
 
-        # Populate the table with products from the query result
-        for row in rows:
-            row_position = self.productsTable.rowCount()
-            self.productsTable.insertRow(row_position)
-            for column, value in enumerate(row):
-                self.productsTable.setItem(row_position, column, QTableWidgetItem(str(value)))
+        # Pages are fetched as the table scrolls; switching tabs before a page
+        # returns makes the older request stale
+        def request(cursor, limit, deliver, fail):
+            def failed(e):
+                fail(e)
+                QMessageBox.critical(self, "Database Error", f"Failed to load products: {e}")
+
+            self.queries.submit(ProductRepository().page_seller_products, self.sellerID, status, limit, cursor,
+                                on_result=deliver, on_error=failed, channel="products")
+
+        self.productsModel.set_pages(request)
 
     def show_active_products(self):
         self.load_products("Active")
@@ -267,45 +242,49 @@ class ManageProductsWindow(QMainWindow):
         self.load_products("Inactive")
 
     def toggle_product_status(self):
-        # Get selected rows
-        selected_items = self.productsTable.selectedItems()
-        if not selected_items:
+        # Get the selected row
+        selected = selected_row(self.productsTable)
+        if selected < 0:
             return  # No row is selected
 
         # Get the SKU of the selected product
-        product_sku = selected_items[0].text()
-
-        # Get the current status of the selected product
-        self.cursor.execute("SELECT Status FROM Products WHERE ProductSKU = ?", (product_sku,))
-        current_status = self.cursor.fetchone()[0]
+        product_sku = self.productsModel.row(selected)[0]
 
-        # Toggle the product status
-        new_status = "Pending" if current_status == "Inactive" else "Inactive"
+        # Inactive products go back to review, the others are deactivated;
+        # the statement returns the changed row with its new status
+        self.activateButton.setEnabled(False)
+        self.queries.submit(ProductRepository().toggle_status, product_sku, "Pending",
+                            on_result=self.product_toggled, on_error=self.toggle_failed)
 
-        # Update the product's status in the database
-        self.cursor.execute("UPDATE Products SET Status = ? WHERE ProductSKU = ?", (new_status, product_sku))
-        self.connection.commit()
+    def product_toggled(self, changed):
+        self.activateButton.setEnabled(True)
+        if not changed:
+            return  # The product no longer exists
 
-        # Reload products (based on current active/inactive status)
-        if current_status == "Inactive":
-            self.load_products("Inactive")
-        else:
-            self.load_products("Active")
+        # Patch only the changed row; it leaves the grid if it no longer
+        # matches the status being shown
+        self.productsModel.apply(changed, keep=lambda row: row[5] == self.currentStatus)
 
         # Update the button text
-        self.activateButton.setText("Deactivate" if new_status == "Active" else "Activate")
+        self.activateButton.setText("Deactivate" if changed[0][5] == "Active" else "Activate")
 
-    def closeEvent(self, event):
-        # Close the database connection when the window is closed
-        self.connection.close()
-        event.accept()  
+    def toggle_failed(self, error):
+        self.activateButton.setEnabled(True)
+        QMessageBox.critical(self, "Database Error", f"Failed to update product status: {error}")
 
 
 class ManageOrdersWindow(QMainWindow):
+    COLUMNS = ["Order ID #", "Items", "Units", "Total Amount", "Customer ID", "Customer Name", "Order Date"]
+    LINE_COLUMNS = ["Product SKU", "Product", "Quantity", "Unit Price", "Line Total"]
+
     def __init__(self, sellerID):
         super().__init__()
     
-        loadUi('Manage Orders.ui', self)
+        load_form(self, FORMS, 'Manage Orders.ui')
+        self.queries = QueryRunner(self)
+        self.ordersModel = attach_model(self.ordersTable, self.COLUMNS, key_column=0)
+        self.linesModel = attach_model(self.linesTable, self.LINE_COLUMNS)
+        self.ordersTable.selectionModel().currentRowChanged.connect(self.showLines)
         
         self.sellerID = sellerID
 
@@ -313,88 +292,87 @@ class ManageOrdersWindow(QMainWindow):
         self.shippedButton.clicked.connect(self.showShippedOrders)
         self.deliveredButton.clicked.connect(self.showDeliveredOrders)
         self.homeButton.clicked.connect(self.openDashboard)
+        self.exports = ExportRunner(self, self.queries)
+        self.exportButton.clicked.connect(self.exportOrders)
 
+        self.currentStatus = None
         self.showPendingOrders()
+
+    def reopen(self):
+        self.fetchOrders(self.currentStatus)
     
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = DashboardWindow(self.sellerID)
-        self.addProductsWindow.show()
+        get_navigator().show(DashboardWindow, self.sellerID)
 
     def fetchOrders(self, status):
         """
-        Fetch orders for the given seller and status from the database.
+        Show the seller's orders with the given status, newest first,
+        fetching them a page at a time as the table scrolls.
         """
-        query = """
-        SELECT 
-            o.OrderID, 
-            oi.ProductSKU, 
-            oi.Quantity, 
-            (oi.Quantity * oi.UnitPrice) AS TotalAmount, 
-            o.CustomerID, 
-            CONCAT(c.FirstName, ' ', c.LastName) AS CustomerName, 
-            o.OrderDate
-        FROM Orders o
-        INNER JOIN OrderItems oi ON o.OrderID = oi.OrderID
-        INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
-        INNER JOIN Customers c ON o.CustomerID = c.CustomerID
-        INNER JOIN Status st ON o.StatusID = st.StatusID
-        WHERE p.SellerID = ? AND st.StatusTitle = ?;
-        """
-        
-        connection = pyodbc.connect(
-            "DRIVER={ODBC Driver 17 for SQL Server};"
-            "SERVER=ZAIN_PC\MYSQL1;"
-            "DATABASE=StoreDatabase;"
-            "Trusted_Connection=yes;"
-            "TrustServerCertificate=yes;"
-        )
-        
-        cursor = connection.cursor()
-        cursor.execute(query, (self.sellerID, status))
-        orders = cursor.fetchall()
-        connection.close()
-        return orders
+        self.currentStatus = status
+        self.queries.cancel("lines")
+        self.linesModel.clear()
+
+        def request(cursor, limit, deliver, fail):
+            def failed(e):
+                fail(e)
+                QMessageBox.critical(self, "Database Error", f"Failed to load orders: {e}")
+
+            self.queries.submit(OrderRepository().page_seller_summaries, self.sellerID, status, limit, cursor,
+                                on_result=deliver, on_error=failed, channel="orders")
+
+        self.ordersModel.set_pages(request)
 
-    def populateTable(self, orders):
+    def exportOrders(self):
         """
-        Populate the table widget with the given orders.
+        Export the seller's lines of every order in the listed status.
         """
-        self.ordersTable.setRowCount(0)  
-        self.ordersTable.setColumnCount(7) 
+        self.exports.start("orders", f"my-orders-{self.currentStatus.lower()}", seller_id=self.sellerID,
+                           status=self.currentStatus, button=self.exportButton)
 
-        for row_number, order in enumerate(orders):
-            self.ordersTable.insertRow(row_number)
-            for column_number, data in enumerate(order):
-                self.ordersTable.setItem(row_number, column_number, QTableWidgetItem(str(data)))
+    def showLines(self, current, previous):
+        """
+        Show the seller's lines of the order under the cursor, reading
+        them only now rather than with the order listing.
+        """
+        if not current.isValid():
+            self.queries.cancel("lines")
+            self.linesModel.clear()
+            return
+        order_id = self.ordersModel.row(current.row())[0]
+        self.queries.submit(OrderRepository().seller_items, self.sellerID, order_id,
+                            on_result=self.linesModel.set_rows, channel="lines")
 
     def showPendingOrders(self):
         """
         Show pending orders in the table.
         """
-        orders = self.fetchOrders('Pending')
-        self.populateTable(orders)
+        self.fetchOrders('Pending')
 
     def showShippedOrders(self):
         """
         Show shipped orders in the table.
         """
-        orders = self.fetchOrders('Shipped')
-        self.populateTable(orders)
+        self.fetchOrders('Shipped')
 
     def showDeliveredOrders(self):
         """
         Show delivered orders in the table.
         """
-        orders = self.fetchOrders('Delivered')
-        self.populateTable(orders)
+        self.fetchOrders('Delivered')
+
+
+class ImportSignals(QObject):
+    """Carries import progress (fraction done, summary) from the worker thread to the window."""
+    progress = pyqtSignal(float, str)
 
 
 class AddProductsWindow(QMainWindow):
     def __init__(self, sellerID):
         super().__init__()
         self.sellerID = sellerID
-        loadUi('Add Product.ui', self)
+        load_form(self, FORMS, 'Add Product.ui')
+        self.queries = QueryRunner(self)
     
         self.titleInput.setMaxLength(255)
         
@@ -407,11 +385,24 @@ class AddProductsWindow(QMainWindow):
         # Connect buttons to their respective functions
         self.imageButton.clicked.connect(self.add_image)
         self.submitButton.clicked.connect(self.submit_to_database)
+        self.importButton.clicked.connect(self.import_file)
         
         self.homeButton.clicked.connect(self.openDashboard)
+
+        self.importSignals = ImportSignals(self)
+        self.importSignals.progress.connect(self.show_import_progress)
+        self.importDialog = None
         
         # Initialize image path variable
         self.image_path = None
+
+    def reopen(self):
+        # Start every visit with an empty form
+        self.titleInput.clear()
+        self.descriptionInput.clear()
+        self.priceInput.clear()
+        self.stockInput.clear()
+        self.image_path = None
     
     def add_image(self):
         # Open a file dialog to select an image
@@ -467,70 +458,103 @@ class AddProductsWindow(QMainWindow):
         
         # Insert into the database
         try:
-            connection = pyodbc.connect(
-                "DRIVER={ODBC Driver 17 for SQL Server};"
-                "SERVER=ZAIN_PC\MYSQL1;"
-                "DATABASE=StoreDatabase;"
-                "Trusted_Connection=yes;"
-                "TrustServerCertificate=yes;"
-            )
-            cursor = connection.cursor()
-            query = """
-                INSERT INTO Products (SellerID, ProductName, CategoryID, Description, Price, StockQuantity, ProductImage, Status, PublishDate)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            category_id = self.get_category_id(cursor, category)
-            cursor.execute(query, (self.sellerID, title, category_id, description, price, stock, image_path, "Pending", date.today()))
-            connection.commit()
+            category_id = self.get_category_id(category)
+            ProductRepository().add(self.sellerID, title, category_id, description, price, stock, image_path, "Pending", date.today())
             QMessageBox.information(self, "Success", "Product added successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Database Error", str(e))
-        finally:
-            connection.close()
+            return
+
+        # Thumbnails are made once here so product pages never decode the full image.
+        self.queries.submit(
+            generate_thumbnails, image_path,
+            on_result=lambda digest: None,
+            on_error=lambda e: print(f"Could not create thumbnails for {image_path}: {e}"),
+        )
     
-    def get_category_id(self, cursor, category_name):
-        # Fetch the category ID based on category name
-        query = "SELECT CategoryID FROM Categories WHERE CategoryName = ?"
-        cursor.execute(query, (category_name,))
-        result = cursor.fetchone()
-        return result[0] if result else None
+    def import_file(self):
+        # A whole catalog at once: streamed, validated and inserted in batches off the GUI thread
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Products", "", "Product files (*.csv *.json *.jsonl *.ndjson)"
+        )
+        if not path:
+            return
+
+        stop = threading.Event()
+        self.importDialog = QProgressDialog("Importing products...", "Stop", 0, 100, self)
+        self.importDialog.setWindowTitle("Import Products")
+        self.importDialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.importDialog.setAutoClose(False)
+        self.importDialog.setAutoReset(False)
+        self.importDialog.setMinimumDuration(0)
+        self.importDialog.canceled.connect(stop.set)
+        self.importButton.setEnabled(False)
+
+        signals = self.importSignals
+        self.queries.submit(
+            import_products, path, self.sellerID, BATCH_SIZE,
+            lambda progress: signals.progress.emit(progress.fraction(), progress.summary()), None, stop,
+            on_result=self.import_finished,
+            on_error=self.import_failed,
+        )
+
+    def show_import_progress(self, fraction, summary):
+        if self.importDialog is not None:
+            self.importDialog.setValue(int(fraction * 100))
+            self.importDialog.setLabelText(summary)
+
+    def close_import_dialog(self):
+        if self.importDialog is not None:
+            self.importDialog.close()
+            self.importDialog = None
+        self.importButton.setEnabled(True)
+
+    def import_finished(self, result):
+        self.close_import_dialog()
+        if not result.rejected:
+            QMessageBox.information(self, "Import Complete", f"{result.summary()}.")
+            return
+        details = "\n".join(f"Row {row}: {message}" for row, message in result.errors[:10])
+        if result.rejected > 10:
+            details += f"\n... and {result.rejected - 10:,} more"
+        QMessageBox.warning(self, "Import Complete", f"{result.summary()}.\n\n{details}")
+
+    def import_failed(self, error):
+        self.close_import_dialog()
+        QMessageBox.critical(self, "Import Failed", f"The import stopped: {error}")
+
+    def get_category_id(self, category_name):
+        # Resolved from the cached reference data, no query needed
+        return get_reference_data().category_id(category_name)
 
     def populate_categories(self):
         try:
-            connection = pyodbc.connect(
-                "DRIVER={ODBC Driver 17 for SQL Server};"
-                "SERVER=ZAIN_PC\MYSQL1;"
-                "DATABASE=StoreDatabase;"
-                "Trusted_Connection=yes;"
-                "TrustServerCertificate=yes;"
-            )
-            cursor = connection.cursor()
-            query = "SELECT CategoryName FROM Categories"
-            cursor.execute(query)
-            categories = cursor.fetchall()
+            categories = get_reference_data().category_names()
             
             # Clear existing items in the combo box
             self.categoryInput.clear()
             
             # Add categories to the combo box
-            for category in categories:
-                self.categoryInput.addItem(category[0])  # category[0] contains the CategoryName
+            self.categoryInput.addItems(categories)
             
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load categories: {str(e)}")
-        finally:
-            connection.close()
     
     def openDashboard(self):
-        self.hide()
-        self.addProductsWindow = DashboardWindow(self.sellerID)
-        self.addProductsWindow.show()
+        get_navigator().show(DashboardWindow, self.sellerID)
 
        
 def main():
     app = QApplication(sys.argv)
-    window = LoginWindow()
-    window.show()
+    app.aboutToQuit.connect(get_pool().close)
+    start_metrics_export(app, "seller")
+    get_navigator().show(LoginWindow)
+    # Load the reference data behind the first window instead of before it.
+    QueryRunner(app).submit(
+        get_reference_data().refresh,
+        on_result=lambda _: None,
+        on_error=lambda e: print(f"Could not preload reference data: {e}"),
+    )
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+-- 001: indexes and unique constraints for the lookups the three centers run on every click.
+-- Apply with `python tools/migrate.py` or run in SSMS after ProjDatabase.sql.
+
+USE StoreDatabase
+GO
+
+IF OBJECT_ID('SchemaVersions') IS NULL
+    CREATE TABLE SchemaVersions (
+        Version INT PRIMARY KEY,
+        Description VARCHAR(200) NOT NULL,
+        AppliedAt DATETIME NOT NULL DEFAULT GETDATE()
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 1)
+BEGIN
+    -- Logins: Customers/Sellers are looked up by email (and password) on every sign-in.
+    -- Unique filters skip NULLs so old rows without an email don't collide.
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Customers_EmailID
+        ON Customers (EmailID) INCLUDE (Password, FirstName, LastName)
+        WHERE EmailID IS NOT NULL;
+
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Sellers_EmailID
+        ON Sellers (EmailID) INCLUDE (Password, AccountStatus)
+        WHERE EmailID IS NOT NULL;
+
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Sellers_StoreName
+        ON Sellers (StoreName)
+        WHERE StoreName IS NOT NULL;
+
+    -- Reference lookups by name.
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Status_StatusTitle ON Status (StatusTitle);
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Categories_CategoryName ON Categories (CategoryName);
+
+    -- Customer category browse only ever asks for active products.
+    CREATE NONCLUSTERED INDEX IX_Products_Active_Category
+        ON Products (CategoryID) INCLUDE (ProductName, Price)
+        WHERE Status = 'Active';
+
+    -- Admin product list by status, seller product list by seller and status.
+    CREATE NONCLUSTERED INDEX IX_Products_Status
+        ON Products (Status) INCLUDE (SellerID, ProductName, StockQuantity, Price);
+
+    CREATE NONCLUSTERED INDEX IX_Products_Seller_Status
+        ON Products (SellerID, Status) INCLUDE (ProductName, StockQuantity, Price);
+
+    -- Product page looks products up by name.
+    CREATE NONCLUSTERED INDEX IX_Products_ProductName
+        ON Products (ProductName) INCLUDE (StockQuantity, ProductImage);
+
+    -- Seller order screens go from a seller's products to their order lines.
+    CREATE NONCLUSTERED INDEX IX_OrderItems_ProductSKU
+        ON OrderItems (ProductSKU) INCLUDE (Quantity, UnitPrice);
+
+    -- Order screens filter by status, newest first; CustomerID for the name join.
+    CREATE NONCLUSTERED INDEX IX_Orders_Status_Date
+        ON Orders (StatusID, OrderDate, OrderID) INCLUDE (CustomerID);
+
+    CREATE NONCLUSTERED INDEX IX_Orders_CustomerID ON Orders (CustomerID);
+
+    INSERT INTO SchemaVersions (Version, Description) VALUES (1, 'Hot path indexes');
+END
+GO
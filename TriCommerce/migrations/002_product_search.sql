@@ -0,0 +1,46 @@
+-- 002: change tracking and full-text search for product search.
+-- RowVer lets the in-process search index pull only products changed since its
+-- last sync. The full-text index is only created where Full-Text Search is installed;
+-- otherwise the centers fall back to the in-process index (shared/search.py).
+
+USE StoreDatabase
+GO
+
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 2)
+   AND COL_LENGTH('Products', 'RowVer') IS NULL
+    ALTER TABLE Products ADD RowVer ROWVERSION;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Products_RowVer')
+    CREATE NONCLUSTERED INDEX IX_Products_RowVer ON Products (RowVer);
+GO
+
+-- Full-text indexes need a named single-column unique key index.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_Products_ProductSKU')
+    CREATE UNIQUE NONCLUSTERED INDEX UX_Products_ProductSKU ON Products (ProductSKU);
+GO
+
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+   AND NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'ProductCatalog')
+    CREATE FULLTEXT CATALOG ProductCatalog;
+GO
+
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+   AND NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Products'))
+    CREATE FULLTEXT INDEX ON Products (ProductName, Description)
+        KEY INDEX UX_Products_ProductSKU ON ProductCatalog
+        WITH CHANGE_TRACKING AUTO;
+GO
+
+-- Category browse now also returns SKU and stock, so the result rows can
+-- open the product page by key and honour the in-stock filter.
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 2)
+    CREATE NONCLUSTERED INDEX IX_Products_Active_Category
+        ON Products (CategoryID) INCLUDE (ProductName, Price, StockQuantity)
+        WHERE Status = 'Active'
+        WITH (DROP_EXISTING = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 2)
+    INSERT INTO SchemaVersions (Version, Description) VALUES (2, 'Product search');
+GO
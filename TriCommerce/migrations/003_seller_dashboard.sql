@@ -0,0 +1,158 @@
+-- 003: per-seller dashboard counters, kept current by triggers.
+-- The seller dashboard used to count pending order lines by joining Products,
+-- OrderItems and Orders on every open. SellerDashboard holds one row per seller
+-- with those counts (order lines by status), delivered revenue and the number of
+-- active products at or below 5 in stock, so opening the dashboard reads one row.
+-- The triggers apply the change of every statement that touches OrderItems,
+-- an order's status or a product's stock, whichever code path runs it.
+
+USE StoreDatabase
+GO
+
+IF OBJECT_ID('SellerDashboard') IS NULL
+    CREATE TABLE SellerDashboard (
+        SellerID BIGINT PRIMARY KEY,
+        PendingOrders INT NOT NULL DEFAULT 0,
+        ShippedOrders INT NOT NULL DEFAULT 0,
+        DeliveredOrders INT NOT NULL DEFAULT 0,
+        Revenue DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        LowStockProducts INT NOT NULL DEFAULT 0,
+        FOREIGN KEY (SellerID) REFERENCES Sellers(SellerID)
+    );
+GO
+
+-- Order lines added, changed or removed: count them under their order's status.
+CREATE OR ALTER TRIGGER TR_OrderItems_SellerDashboard ON OrderItems
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    WITH changes AS (
+        SELECT OrderID, ProductSKU, Quantity * UnitPrice AS Amount, 1 AS Sign FROM inserted
+        UNION ALL
+        SELECT OrderID, ProductSKU, Quantity * UnitPrice, -1 FROM deleted
+    ), deltas AS (
+        SELECT p.SellerID,
+               SUM(CASE WHEN s.StatusTitle = 'Pending' THEN c.Sign ELSE 0 END) AS Pending,
+               SUM(CASE WHEN s.StatusTitle = 'Shipped' THEN c.Sign ELSE 0 END) AS Shipped,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN c.Sign ELSE 0 END) AS Delivered,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN c.Sign * c.Amount ELSE 0 END) AS Revenue
+        FROM changes c
+        INNER JOIN Orders o ON o.OrderID = c.OrderID
+        INNER JOIN Status s ON s.StatusID = o.StatusID
+        INNER JOIN Products p ON p.ProductSKU = c.ProductSKU
+        WHERE p.SellerID IS NOT NULL
+        GROUP BY p.SellerID
+    )
+    MERGE SellerDashboard WITH (HOLDLOCK) AS t
+    USING deltas AS d ON t.SellerID = d.SellerID
+    WHEN MATCHED THEN UPDATE SET
+        PendingOrders = t.PendingOrders + d.Pending,
+        ShippedOrders = t.ShippedOrders + d.Shipped,
+        DeliveredOrders = t.DeliveredOrders + d.Delivered,
+        Revenue = t.Revenue + ISNULL(d.Revenue, 0)
+    WHEN NOT MATCHED THEN
+        INSERT (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+        VALUES (d.SellerID, d.Pending, d.Shipped, d.Delivered, ISNULL(d.Revenue, 0), 0);
+END
+GO
+
+-- An order changed status: move its lines from the old status to the new one.
+CREATE OR ALTER TRIGGER TR_Orders_SellerDashboard ON Orders
+AFTER UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT UPDATE(StatusID)
+        RETURN;
+    WITH moves AS (
+        SELECT i.OrderID, i.StatusID, 1 AS Sign
+        FROM inserted i INNER JOIN deleted d ON d.OrderID = i.OrderID
+        WHERE i.StatusID <> d.StatusID
+        UNION ALL
+        SELECT d.OrderID, d.StatusID, -1
+        FROM inserted i INNER JOIN deleted d ON d.OrderID = i.OrderID
+        WHERE i.StatusID <> d.StatusID
+    ), deltas AS (
+        SELECT p.SellerID,
+               SUM(CASE WHEN s.StatusTitle = 'Pending' THEN m.Sign ELSE 0 END) AS Pending,
+               SUM(CASE WHEN s.StatusTitle = 'Shipped' THEN m.Sign ELSE 0 END) AS Shipped,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN m.Sign ELSE 0 END) AS Delivered,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN m.Sign * oi.Quantity * oi.UnitPrice ELSE 0 END) AS Revenue
+        FROM moves m
+        INNER JOIN Status s ON s.StatusID = m.StatusID
+        INNER JOIN OrderItems oi ON oi.OrderID = m.OrderID
+        INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+        WHERE p.SellerID IS NOT NULL
+        GROUP BY p.SellerID
+    )
+    MERGE SellerDashboard WITH (HOLDLOCK) AS t
+    USING deltas AS d ON t.SellerID = d.SellerID
+    WHEN MATCHED THEN UPDATE SET
+        PendingOrders = t.PendingOrders + d.Pending,
+        ShippedOrders = t.ShippedOrders + d.Shipped,
+        DeliveredOrders = t.DeliveredOrders + d.Delivered,
+        Revenue = t.Revenue + ISNULL(d.Revenue, 0)
+    WHEN NOT MATCHED THEN
+        INSERT (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+        VALUES (d.SellerID, d.Pending, d.Shipped, d.Delivered, ISNULL(d.Revenue, 0), 0);
+END
+GO
+
+-- Products entering or leaving "active with 5 or fewer in stock".
+CREATE OR ALTER TRIGGER TR_Products_SellerDashboard ON Products
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    WITH changes AS (
+        SELECT SellerID, 1 AS Sign FROM inserted WHERE Status = 'Active' AND StockQuantity <= 5
+        UNION ALL
+        SELECT SellerID, -1 FROM deleted WHERE Status = 'Active' AND StockQuantity <= 5
+    ), deltas AS (
+        SELECT SellerID, SUM(Sign) AS LowStock
+        FROM changes
+        WHERE SellerID IS NOT NULL
+        GROUP BY SellerID
+        HAVING SUM(Sign) <> 0
+    )
+    MERGE SellerDashboard WITH (HOLDLOCK) AS t
+    USING deltas AS d ON t.SellerID = d.SellerID
+    WHEN MATCHED THEN UPDATE SET LowStockProducts = t.LowStockProducts + d.LowStock
+    WHEN NOT MATCHED THEN
+        INSERT (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+        VALUES (d.SellerID, 0, 0, 0, 0, d.LowStock);
+END
+GO
+
+-- Backfill from the existing history once.
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 3)
+BEGIN
+    DELETE FROM SellerDashboard;
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT se.SellerID,
+           ISNULL(o.Pending, 0), ISNULL(o.Shipped, 0), ISNULL(o.Delivered, 0), ISNULL(o.Revenue, 0),
+           ISNULL(l.LowStock, 0)
+    FROM Sellers se
+    LEFT JOIN (
+        SELECT p.SellerID,
+               SUM(CASE WHEN s.StatusTitle = 'Pending' THEN 1 ELSE 0 END) AS Pending,
+               SUM(CASE WHEN s.StatusTitle = 'Shipped' THEN 1 ELSE 0 END) AS Shipped,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN 1 ELSE 0 END) AS Delivered,
+               SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN oi.Quantity * oi.UnitPrice ELSE 0 END) AS Revenue
+        FROM OrderItems oi
+        INNER JOIN Orders o ON o.OrderID = oi.OrderID
+        INNER JOIN Status s ON s.StatusID = o.StatusID
+        INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+        GROUP BY p.SellerID
+    ) o ON o.SellerID = se.SellerID
+    LEFT JOIN (
+        SELECT SellerID, COUNT(*) AS LowStock
+        FROM Products
+        WHERE Status = 'Active' AND StockQuantity <= 5
+        GROUP BY SellerID
+    ) l ON l.SellerID = se.SellerID;
+
+    INSERT INTO SchemaVersions (Version, Description) VALUES (3, 'Seller dashboard counters');
+END
+GO
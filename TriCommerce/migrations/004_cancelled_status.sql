@@ -0,0 +1,18 @@
+-- 004: a Cancelled order status.
+-- Cancelling an order used to DELETE it, which the OrderItems foreign key
+-- rejects for every order that has lines. Cancelled orders now keep their
+-- lines and only change status, like shipping and delivering, and their stock
+-- is returned to the products. The SellerDashboard triggers only count
+-- Pending, Shipped and Delivered, so a cancelled order drops out of them.
+
+USE StoreDatabase
+GO
+
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 4)
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM Status WHERE StatusTitle = 'Cancelled')
+        INSERT INTO Status (StatusTitle) VALUES ('Cancelled');
+
+    INSERT INTO SchemaVersions (Version, Description) VALUES (4, 'Cancelled order status');
+END
+GO
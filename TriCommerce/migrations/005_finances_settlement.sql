@@ -0,0 +1,24 @@
+-- 005: one payout per seller and month.
+-- The payout engine (shared/payouts.py) writes a Finances row for every seller
+-- with delivered sales in a month and skips sellers that already have one, so
+-- settling a month again never pays twice. The unique index enforces that
+-- even for concurrent runs and lets the engine seek the month's rows.
+
+USE StoreDatabase
+GO
+
+IF NOT EXISTS (SELECT 1 FROM SchemaVersions WHERE Version = 5)
+BEGIN
+    IF EXISTS (SELECT 1 FROM Finances GROUP BY MonthOfPayment, SellerID HAVING COUNT(*) > 1)
+    BEGIN
+        RAISERROR('Finances has several rows for one seller and month; merge them before applying 005.', 16, 1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_Finances_Month_Seller')
+        CREATE UNIQUE NONCLUSTERED INDEX UX_Finances_Month_Seller
+            ON Finances (MonthOfPayment, SellerID) INCLUDE (Amount);
+
+    INSERT INTO SchemaVersions (Version, Description) VALUES (5, 'One payout per seller and month');
+END
+GO
@@ -0,0 +1,27 @@
+-- 001 for the SQLite backend: the same indexes as ../001_hot_path_indexes.sql.
+-- SQLite has no INCLUDE columns; filtered indexes become partial indexes.
+-- Apply with `python tools/migrate.py` while TRICOMMERCE_BACKEND=sqlite.
+
+CREATE TABLE IF NOT EXISTS SchemaVersions (
+    Version INT PRIMARY KEY,
+    Description VARCHAR(200) NOT NULL,
+    AppliedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Customers_EmailID ON Customers (EmailID) WHERE EmailID IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Sellers_EmailID ON Sellers (EmailID) WHERE EmailID IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Sellers_StoreName ON Sellers (StoreName) WHERE StoreName IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Status_StatusTitle ON Status (StatusTitle);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Categories_CategoryName ON Categories (CategoryName);
+
+CREATE INDEX IF NOT EXISTS IX_Products_Active_Category ON Products (CategoryID) WHERE Status = 'Active';
+CREATE INDEX IF NOT EXISTS IX_Products_Status ON Products (Status);
+CREATE INDEX IF NOT EXISTS IX_Products_Seller_Status ON Products (SellerID, Status);
+CREATE INDEX IF NOT EXISTS IX_Products_ProductName ON Products (ProductName);
+
+CREATE INDEX IF NOT EXISTS IX_OrderItems_ProductSKU ON OrderItems (ProductSKU);
+CREATE INDEX IF NOT EXISTS IX_Orders_Status_Date ON Orders (StatusID, OrderDate, OrderID);
+CREATE INDEX IF NOT EXISTS IX_Orders_CustomerID ON Orders (CustomerID);
+
+INSERT OR IGNORE INTO SchemaVersions (Version, Description) VALUES (1, 'Hot path indexes');
@@ -0,0 +1,20 @@
+-- 002 for the SQLite backend: the RowVer change counter from ../002_product_search.sql.
+-- SQLite has no ROWVERSION, so triggers bump it on insert and on every update of
+-- a searched or filtered column. Search always uses the in-process index here.
+
+ALTER TABLE Products ADD COLUMN RowVer INTEGER NOT NULL DEFAULT 0;
+UPDATE Products SET RowVer = ProductSKU;
+CREATE INDEX IX_Products_RowVer ON Products (RowVer);
+
+CREATE TRIGGER TR_Products_RowVer_Insert AFTER INSERT ON Products
+BEGIN
+    UPDATE Products SET RowVer = (SELECT MAX(RowVer) FROM Products) + 1 WHERE ProductSKU = NEW.ProductSKU;
+END;
+
+CREATE TRIGGER TR_Products_RowVer_Update
+AFTER UPDATE OF ProductName, Description, CategoryID, Price, StockQuantity, Status ON Products
+BEGIN
+    UPDATE Products SET RowVer = (SELECT MAX(RowVer) FROM Products) + 1 WHERE ProductSKU = NEW.ProductSKU;
+END;
+
+INSERT INTO SchemaVersions (Version, Description) VALUES (2, 'Product search');
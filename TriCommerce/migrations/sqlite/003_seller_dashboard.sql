@@ -0,0 +1,152 @@
+-- 003 for the SQLite backend: the SellerDashboard counters from ../003_seller_dashboard.sql.
+-- SQLite triggers run per row, so each one adds or subtracts a single line or product.
+
+CREATE TABLE SellerDashboard (
+    SellerID BIGINT PRIMARY KEY,
+    PendingOrders INT NOT NULL DEFAULT 0,
+    ShippedOrders INT NOT NULL DEFAULT 0,
+    DeliveredOrders INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    LowStockProducts INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (SellerID) REFERENCES Sellers(SellerID)
+);
+
+INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+SELECT se.SellerID,
+       IFNULL(o.Pending, 0), IFNULL(o.Shipped, 0), IFNULL(o.Delivered, 0), IFNULL(o.Revenue, 0),
+       IFNULL(l.LowStock, 0)
+FROM Sellers se
+LEFT JOIN (
+    SELECT p.SellerID,
+           SUM(s.StatusTitle = 'Pending') AS Pending,
+           SUM(s.StatusTitle = 'Shipped') AS Shipped,
+           SUM(s.StatusTitle = 'Delivered') AS Delivered,
+           SUM(CASE WHEN s.StatusTitle = 'Delivered' THEN oi.Quantity * oi.UnitPrice ELSE 0 END) AS Revenue
+    FROM OrderItems oi
+    JOIN Orders o ON o.OrderID = oi.OrderID
+    JOIN Status s ON s.StatusID = o.StatusID
+    JOIN Products p ON p.ProductSKU = oi.ProductSKU
+    GROUP BY p.SellerID
+) o ON o.SellerID = se.SellerID
+LEFT JOIN (
+    SELECT SellerID, COUNT(*) AS LowStock
+    FROM Products
+    WHERE Status = 'Active' AND StockQuantity <= 5
+    GROUP BY SellerID
+) l ON l.SellerID = se.SellerID;
+
+CREATE TRIGGER TR_OrderItems_Insert_SellerDashboard AFTER INSERT ON OrderItems
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT p.SellerID, (s.StatusTitle = 'Pending'), (s.StatusTitle = 'Shipped'),
+           (s.StatusTitle = 'Delivered'),
+           CASE WHEN s.StatusTitle = 'Delivered' THEN NEW.Quantity * NEW.UnitPrice ELSE 0 END, 0
+    FROM Orders o
+    JOIN Status s ON s.StatusID = o.StatusID
+    JOIN Products p ON p.ProductSKU = NEW.ProductSKU
+    WHERE o.OrderID = NEW.OrderID AND p.SellerID IS NOT NULL
+    ON CONFLICT (SellerID) DO UPDATE SET
+        PendingOrders = PendingOrders + excluded.PendingOrders,
+        ShippedOrders = ShippedOrders + excluded.ShippedOrders,
+        DeliveredOrders = DeliveredOrders + excluded.DeliveredOrders,
+        Revenue = Revenue + excluded.Revenue;
+END;
+
+CREATE TRIGGER TR_OrderItems_Delete_SellerDashboard AFTER DELETE ON OrderItems
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT p.SellerID, -(s.StatusTitle = 'Pending'), -(s.StatusTitle = 'Shipped'),
+           -(s.StatusTitle = 'Delivered'),
+           CASE WHEN s.StatusTitle = 'Delivered' THEN -OLD.Quantity * OLD.UnitPrice ELSE 0 END, 0
+    FROM Orders o
+    JOIN Status s ON s.StatusID = o.StatusID
+    JOIN Products p ON p.ProductSKU = OLD.ProductSKU
+    WHERE o.OrderID = OLD.OrderID AND p.SellerID IS NOT NULL
+    ON CONFLICT (SellerID) DO UPDATE SET
+        PendingOrders = PendingOrders + excluded.PendingOrders,
+        ShippedOrders = ShippedOrders + excluded.ShippedOrders,
+        DeliveredOrders = DeliveredOrders + excluded.DeliveredOrders,
+        Revenue = Revenue + excluded.Revenue;
+END;
+
+CREATE TRIGGER TR_OrderItems_Update_SellerDashboard AFTER UPDATE ON OrderItems
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT p.SellerID, -(s.StatusTitle = 'Pending'), -(s.StatusTitle = 'Shipped'),
+           -(s.StatusTitle = 'Delivered'),
+           CASE WHEN s.StatusTitle = 'Delivered' THEN -OLD.Quantity * OLD.UnitPrice ELSE 0 END, 0
+    FROM Orders o
+    JOIN Status s ON s.StatusID = o.StatusID
+    JOIN Products p ON p.ProductSKU = OLD.ProductSKU
+    WHERE o.OrderID = OLD.OrderID AND p.SellerID IS NOT NULL
+    ON CONFLICT (SellerID) DO UPDATE SET
+        PendingOrders = PendingOrders + excluded.PendingOrders,
+        ShippedOrders = ShippedOrders + excluded.ShippedOrders,
+        DeliveredOrders = DeliveredOrders + excluded.DeliveredOrders,
+        Revenue = Revenue + excluded.Revenue;
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT p.SellerID, (s.StatusTitle = 'Pending'), (s.StatusTitle = 'Shipped'),
+           (s.StatusTitle = 'Delivered'),
+           CASE WHEN s.StatusTitle = 'Delivered' THEN NEW.Quantity * NEW.UnitPrice ELSE 0 END, 0
+    FROM Orders o
+    JOIN Status s ON s.StatusID = o.StatusID
+    JOIN Products p ON p.ProductSKU = NEW.ProductSKU
+    WHERE o.OrderID = NEW.OrderID AND p.SellerID IS NOT NULL
+    ON CONFLICT (SellerID) DO UPDATE SET
+        PendingOrders = PendingOrders + excluded.PendingOrders,
+        ShippedOrders = ShippedOrders + excluded.ShippedOrders,
+        DeliveredOrders = DeliveredOrders + excluded.DeliveredOrders,
+        Revenue = Revenue + excluded.Revenue;
+END;
+
+CREATE TRIGGER TR_Orders_SellerDashboard AFTER UPDATE OF StatusID ON Orders
+WHEN OLD.StatusID IS NOT NEW.StatusID
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT p.SellerID,
+           SUM((ns.StatusTitle = 'Pending') - (os.StatusTitle = 'Pending')),
+           SUM((ns.StatusTitle = 'Shipped') - (os.StatusTitle = 'Shipped')),
+           SUM((ns.StatusTitle = 'Delivered') - (os.StatusTitle = 'Delivered')),
+           SUM(((ns.StatusTitle = 'Delivered') - (os.StatusTitle = 'Delivered')) * oi.Quantity * oi.UnitPrice), 0
+    FROM OrderItems oi
+    JOIN Products p ON p.ProductSKU = oi.ProductSKU
+    JOIN Status ns ON ns.StatusID = NEW.StatusID
+    JOIN Status os ON os.StatusID = OLD.StatusID
+    WHERE oi.OrderID = NEW.OrderID AND p.SellerID IS NOT NULL
+    GROUP BY p.SellerID
+    ON CONFLICT (SellerID) DO UPDATE SET
+        PendingOrders = PendingOrders + excluded.PendingOrders,
+        ShippedOrders = ShippedOrders + excluded.ShippedOrders,
+        DeliveredOrders = DeliveredOrders + excluded.DeliveredOrders,
+        Revenue = Revenue + excluded.Revenue;
+END;
+
+CREATE TRIGGER TR_Products_Insert_SellerDashboard AFTER INSERT ON Products
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT NEW.SellerID, 0, 0, 0, 0, 1
+    WHERE NEW.SellerID IS NOT NULL AND NEW.Status = 'Active' AND NEW.StockQuantity <= 5
+    ON CONFLICT (SellerID) DO UPDATE SET LowStockProducts = LowStockProducts + excluded.LowStockProducts;
+END;
+
+CREATE TRIGGER TR_Products_Delete_SellerDashboard AFTER DELETE ON Products
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT OLD.SellerID, 0, 0, 0, 0, -1
+    WHERE OLD.SellerID IS NOT NULL AND OLD.Status = 'Active' AND OLD.StockQuantity <= 5
+    ON CONFLICT (SellerID) DO UPDATE SET LowStockProducts = LowStockProducts + excluded.LowStockProducts;
+END;
+
+CREATE TRIGGER TR_Products_Update_SellerDashboard AFTER UPDATE OF SellerID, Status, StockQuantity ON Products
+BEGIN
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT OLD.SellerID, 0, 0, 0, 0, -1
+    WHERE OLD.SellerID IS NOT NULL AND OLD.Status = 'Active' AND OLD.StockQuantity <= 5
+    ON CONFLICT (SellerID) DO UPDATE SET LowStockProducts = LowStockProducts + excluded.LowStockProducts;
+    INSERT INTO SellerDashboard (SellerID, PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts)
+    SELECT NEW.SellerID, 0, 0, 0, 0, 1
+    WHERE NEW.SellerID IS NOT NULL AND NEW.Status = 'Active' AND NEW.StockQuantity <= 5
+    ON CONFLICT (SellerID) DO UPDATE SET LowStockProducts = LowStockProducts + excluded.LowStockProducts;
+END;
+
+INSERT INTO SchemaVersions (Version, Description) VALUES (3, 'Seller dashboard counters');
@@ -0,0 +1,7 @@
+-- 004 for the SQLite backend: the Cancelled order status from ../004_cancelled_status.sql.
+
+INSERT INTO Status (StatusTitle)
+SELECT 'Cancelled'
+WHERE NOT EXISTS (SELECT 1 FROM Status WHERE StatusTitle = 'Cancelled');
+
+INSERT INTO SchemaVersions (Version, Description) VALUES (4, 'Cancelled order status');
@@ -0,0 +1,6 @@
+-- 005 for the SQLite backend: the unique payout index from ../005_finances_settlement.sql.
+-- Fails on a database that already has several rows for one seller and month.
+
+CREATE UNIQUE INDEX UX_Finances_Month_Seller ON Finances (MonthOfPayment, SellerID);
+
+INSERT INTO SchemaVersions (Version, Description) VALUES (5, 'One payout per seller and month');
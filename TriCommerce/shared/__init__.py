@@ -0,0 +1 @@
+"""Code shared by the Admin, Seller and Customer centers."""
@@ -0,0 +1,207 @@
+"""Database backends: SQL Server through pyodbc, or a local SQLite file.
+
+The repositories are written in T-SQL. The SQLite backend rewrites each
+statement once (and caches the result) so the same code runs unchanged:
+
+* ``TOP (n)`` becomes ``LIMIT n``; parameters are numbered (``?1``, ``?2``...)
+  so moving the limit to the end does not reorder them.
+* ``OUTPUT INSERTED.col`` becomes ``RETURNING col``.
+* ``COUNT_BIG`` becomes ``COUNT``, ``@@IDENTITY``/``SCOPE_IDENTITY()``
+  become ``last_insert_rowid()`` and ``OPTION (...)`` hints are dropped.
+* ``CONCAT`` is registered as a SQL function on every connection.
+
+Statements that cannot be rewritten mechanically (T-SQL ``UPDATE alias ...
+FROM`` joins) register a hand-written SQLite version next to the original
+with :func:`variant`. The schema comes from ProjDatabase.sql with
+``IDENTITY`` columns turned into ``INTEGER PRIMARY KEY AUTOINCREMENT``.
+
+The backend is chosen with ``TRICOMMERCE_BACKEND`` (``sqlserver`` or
+``sqlite``, default ``sqlserver``); SQLite reads its file from
+``TRICOMMERCE_SQLITE_PATH``. Code that sets things up itself (benchmarks,
+load tests) can call :func:`set_backend` before the pool is first used.
+"""
+import os
+import re
+import threading
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONNECTION_STRING = os.environ.get(
+    "TRICOMMERCE_CONNECTION_STRING",
+    "DRIVER={ODBC Driver 17 for SQL Server};"
+    "SERVER=ZAIN_PC\\MYSQL1;"
+    "DATABASE=StoreDatabase;"
+    "Trusted_Connection=yes;"
+    "TrustServerCertificate=yes;"
+)
+
+SQLITE_PATH = os.environ.get("TRICOMMERCE_SQLITE_PATH", os.path.join(ROOT, "tricommerce.db"))
+
+# Hand-written statements per backend, keyed by the T-SQL text they replace.
+_variants = {}
+
+
+def variant(sql, **dialects):
+    """Register backend-specific versions of ``sql`` and return ``sql``.
+
+    Used where a statement is declared::
+
+        RESERVE_ORDER = variant(\"\"\"UPDATE p ... FROM ...\"\"\", sqlite=\"\"\"UPDATE Products ...\"\"\")
+    """
+    for name, text in dialects.items():
+        _variants.setdefault(name, {})[sql] = text
+    return sql
+
+
+def _batches(script):
+    """Split a script on SSMS-style GO lines."""
+    return [batch for batch in re.split(r"^\s*GO\s*$", script, flags=re.IGNORECASE | re.MULTILINE)
+            if batch.strip()]
+
+
+class SqlServerBackend:
+    name = "sqlserver"
+    health_query = "SELECT 1"
+    migrations_dir = os.path.join(ROOT, "migrations")
+
+    def __init__(self, connection_string=CONNECTION_STRING):
+        self.connection_string = connection_string
+
+    def connect(self):
+        import pyodbc
+        # Single statements commit on their own; multi-statement work opts into a
+        # transaction explicitly (see shared.dao.base.Repository.transaction).
+        return pyodbc.connect(self.connection_string, autocommit=True)
+
+    def translate(self, sql):
+        return sql
+
+    def begin(self, raw):
+        raw.autocommit = False
+
+    def end(self, raw):
+        raw.autocommit = True
+
+    def has_table(self, cursor, name):
+        cursor.execute("SELECT OBJECT_ID(?)", (name,))
+        return cursor.fetchone()[0] is not None
+
+    def run_script(self, cursor, script):
+        for batch in _batches(script):
+            cursor.execute(batch)
+            while cursor.nextset():
+                pass
+
+
+def _concat(*values):
+    # SQL Server's CONCAT treats NULL as an empty string.
+    return "".join("" if value is None else str(value) for value in values)
+
+
+class SqliteBackend:
+    name = "sqlite"
+    health_query = "SELECT 1"
+    migrations_dir = os.path.join(ROOT, "migrations", "sqlite")
+
+    OUTPUT = re.compile(r"\bOUTPUT\s+(.*?)\s*(?=\b(?:VALUES|WHERE|FROM|SELECT|DEFAULT)\b)",
+                        re.IGNORECASE | re.DOTALL)
+    TOP = re.compile(r"\bTOP\s*(?:\(\s*(\?\d*|\d+)\s*\)|(\d+))", re.IGNORECASE)
+    OPTION = re.compile(r"\bOPTION\s*\([^)]*\)", re.IGNORECASE)
+    IDENTITY = re.compile(r"@@IDENTITY|SCOPE_IDENTITY\(\)", re.IGNORECASE)
+
+    def __init__(self, path=SQLITE_PATH, busy_timeout=30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._translated = {}
+        self._lock = threading.Lock()
+
+    def connect(self):
+        import sqlite3
+        sqlite3.register_adapter(Decimal, str)
+        # isolation_level=None is autocommit, matching the pyodbc connections;
+        # the pool hands connections between threads, never shares one.
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                              check_same_thread=False, uri=self.path.startswith("file:"))
+        raw.create_function("CONCAT", -1, _concat, deterministic=True)
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.execute("PRAGMA journal_mode = WAL")
+        return raw
+
+    def translate(self, sql):
+        translated = self._translated.get(sql)
+        if translated is None:
+            translated = _variants.get(self.name, {}).get(sql) or self._rewrite(sql)
+            with self._lock:
+                self._translated[sql] = translated
+        return translated
+
+    def _rewrite(self, sql):
+        counter = iter(range(1, sql.count("?") + 1))
+        sql = re.sub(r"\?", lambda _: f"?{next(counter)}", sql)
+
+        suffix = []
+        top = self.TOP.search(sql)
+        if top:
+            sql = sql[:top.start()] + sql[top.end():]
+            suffix.append(f"LIMIT {top.group(1) or top.group(2)}")
+        output = self.OUTPUT.search(sql)
+        if output:
+            sql = sql[:output.start()] + sql[output.end():]
+            columns = re.sub(r"\bINSERTED\.", "", output.group(1), flags=re.IGNORECASE)
+            suffix.append(f"RETURNING {columns}")
+
+        sql = self.OPTION.sub("", sql)
+        sql = re.sub(r"\bCOUNT_BIG\s*\(", "COUNT(", sql, flags=re.IGNORECASE)
+        sql = self.IDENTITY.sub("last_insert_rowid()", sql)
+        return " ".join([sql.rstrip().rstrip(";")] + suffix)
+
+    def begin(self, raw):
+        # Take the write lock up front so two writers never deadlock upgrading.
+        raw.execute("BEGIN IMMEDIATE")
+
+    def end(self, raw):
+        pass
+
+    def has_table(self, cursor, name):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        return cursor.fetchone() is not None
+
+    def run_script(self, cursor, script):
+        cursor.executescript(script)
+
+    def create_schema(self, cursor, script_path=os.path.join(ROOT, "ProjDatabase.sql")):
+        """Create the ProjDatabase.sql tables and reference rows in SQLite."""
+        with open(script_path, encoding="utf-8") as f:
+            script = f.read()
+        statements = []
+        for table in re.findall(r"CREATE TABLE .*?\n\);", script, flags=re.DOTALL):
+            statements.append(re.sub(r"\b(?:BIG)?INT IDENTITY\(1,\s*1\) PRIMARY KEY",
+                                     "INTEGER PRIMARY KEY AUTOINCREMENT", table, flags=re.IGNORECASE))
+        statements.extend(re.findall(r"INSERT INTO .*?;", script, flags=re.DOTALL))
+        cursor.executescript("\n".join(statements))
+
+
+BACKENDS = {"sqlserver": SqlServerBackend, "sqlite": SqliteBackend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def set_backend(backend):
+    """Use ``backend`` for every pool created from now on."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def get_backend():
+    """Return the configured backend, choosing it from the environment on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("TRICOMMERCE_BACKEND", "sqlserver").lower()
+            if name not in BACKENDS:
+                raise ValueError(f"unknown TRICOMMERCE_BACKEND {name!r}; use one of {', '.join(BACKENDS)}")
+            _backend = BACKENDS[name]()
+        return _backend
@@ -0,0 +1,119 @@
+"""The signed-in customer's shopping cart, kept in memory and written back in batches.
+
+Cart edits change the in-memory lines at once, so the cart window can
+redraw without waiting for the database. Each edit only remembers the
+line's new quantity; flush() later writes every line that changed since
+the previous flush as one batch (see CartRepository.apply), so clicking
+"+" five times costs one write instead of five updates and five reloads.
+The Customer Center flushes shortly after the last edit, when the cart
+window closes, before checkout and on exit.
+"""
+import threading
+
+from shared.dao.cart import CartRepository
+
+
+class CartBuffer:
+    def __init__(self, customer_id, repository=None):
+        self.customer_id = customer_id
+        self._repository = repository
+        self._lock = threading.Lock()
+        # Held for a whole flush, so writes reach the database one at a time and in order.
+        self._write_lock = threading.Lock()
+        self._lines = None  # ProductSKU -> [ProductName, Quantity, Price]; None until loaded
+        self._dirty = {}  # ProductSKU -> quantity to write, 0 to delete the line
+
+    @property
+    def loaded(self):
+        with self._lock:
+            return self._lines is not None
+
+    def load(self):
+        """Read the cart from the database, keeping edits that are not flushed yet; return lines()."""
+        rows = (self._repository or CartRepository()).items(self.customer_id)
+        with self._lock:
+            lines = {sku: [name, quantity, price] for sku, name, quantity, price in rows}
+            for sku, quantity in self._dirty.items():
+                if quantity <= 0:
+                    lines.pop(sku, None)
+                elif sku in lines:
+                    lines[sku][1] = quantity
+                elif self._lines is not None and sku in self._lines:
+                    lines[sku] = list(self._lines[sku])
+            self._lines = lines
+        return self.lines()
+
+    def lines(self):
+        """Return (ProductSKU, ProductName, Quantity, Price) for every line."""
+        with self._lock:
+            return [(sku, name, quantity, price) for sku, (name, quantity, price) in (self._lines or {}).items()]
+
+    def line(self, sku):
+        with self._lock:
+            line = (self._lines or {}).get(sku)
+            return (sku, *line) if line else None
+
+    def total(self):
+        with self._lock:
+            return sum(quantity * price for _, quantity, price in (self._lines or {}).values())
+
+    def add(self, sku, name, price, quantity=1):
+        """Add ``quantity`` of a product, as a new line or on top of the existing one."""
+        with self._lock:
+            self._require_loaded()
+            line = self._lines.setdefault(sku, [name, 0, price])
+            line[1] += quantity
+            self._dirty[sku] = line[1]
+            return (sku, *line)
+
+    def set_quantity(self, sku, quantity):
+        """Change a line's quantity (0 removes it); return the line, or None once removed."""
+        if quantity <= 0:
+            self.remove(sku)
+            return None
+        with self._lock:
+            self._require_loaded()
+            line = self._lines[sku]
+            line[1] = quantity
+            self._dirty[sku] = quantity
+            return (sku, *line)
+
+    def remove(self, sku):
+        with self._lock:
+            self._require_loaded()
+            if self._lines.pop(sku, None) is not None:
+                self._dirty[sku] = 0
+
+    def clear(self):
+        """Forget every line without writing, e.g. after an order emptied the cart in the database."""
+        with self._lock:
+            self._lines = {}
+            self._dirty = {}
+
+    def dirty(self):
+        with self._lock:
+            return bool(self._dirty)
+
+    def flush(self):
+        """Write the lines changed since the last flush; return how many were written.
+
+        Waits for a flush already running on another thread, so when this
+        returns every edit made before the call is in the database.
+        """
+        with self._write_lock:
+            with self._lock:
+                changes, self._dirty = self._dirty, {}
+            if not changes:
+                return 0
+            try:
+                (self._repository or CartRepository()).apply(self.customer_id, list(changes.items()))
+            except Exception:
+                with self._lock:
+                    # Edits made while writing are newer than the ones that failed.
+                    self._dirty = {**changes, **self._dirty}
+                raise
+            return len(changes)
+
+    def _require_loaded(self):
+        if self._lines is None:
+            raise RuntimeError("the cart must be loaded before it is edited")
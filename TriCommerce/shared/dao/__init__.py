@@ -0,0 +1,34 @@
+"""Repositories owning every SQL statement the three centers run."""
+from shared.dao.base import Repository, StatementCache
+from shared.dao.cart import CartRepository
+from shared.dao.customers import CustomerRepository
+from shared.dao.exports import ExportRepository
+from shared.dao.finances import FinanceRepository
+from shared.dao.orders import EmptyCartError, OrderRepository
+from shared.dao.paging import Keyset, Page
+from shared.dao.products import ProductRepository
+from shared.dao.reference import ReferenceRepository
+from shared.dao.sellers import SellerRepository
+from shared.dao.stock import OutOfStockError, StockRepository, reservation_stats
+from shared.instrumentation import QueryStats, query_stats
+
+__all__ = [
+    "CartRepository",
+    "CustomerRepository",
+    "EmptyCartError",
+    "ExportRepository",
+    "FinanceRepository",
+    "Keyset",
+    "OrderRepository",
+    "OutOfStockError",
+    "Page",
+    "ProductRepository",
+    "QueryStats",
+    "ReferenceRepository",
+    "Repository",
+    "SellerRepository",
+    "StatementCache",
+    "StockRepository",
+    "query_stats",
+    "reservation_stats",
+]
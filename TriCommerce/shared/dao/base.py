@@ -0,0 +1,194 @@
+"""Base class for the repositories that own every SQL statement."""
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from shared.backends import get_backend
+from shared.dao.paging import Page
+from shared.instrumentation import query_stats
+from shared.pool import get_pool
+
+
+class StatementCache:
+    """Cursors of one physical connection, keyed by SQL text.
+
+    pyodbc keeps the statement last prepared on a cursor, so executing the
+    same text on the same cursor again skips the server-side prepare.
+    """
+
+    def __init__(self, raw, capacity=64):
+        self._raw = raw
+        self._cursors = OrderedDict()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+
+    def cursor(self, sql):
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = self._raw.cursor()
+        self._cursors[sql] = cursor
+        if len(self._cursors) > self.capacity:
+            _, oldest = self._cursors.popitem(last=False)
+            oldest.close()
+        return cursor
+
+
+class Repository:
+    """Runs SQL on pooled connections through per-connection cached cursors.
+
+    Every helper takes an optional ``conn`` so several repository calls can
+    share one transaction (see :meth:`transaction`). Statements are written
+    in T-SQL and translated by the pool's backend before they run; each one
+    is timed in shared.instrumentation.query_stats under its T-SQL text.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool if pool is not None else get_pool()
+        self._backend = getattr(self._pool, "backend", None) or get_backend()
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and run everything on it as one transaction."""
+        conn = self._pool.connection()
+        try:
+            # The backend switches the physical connection, not the pool's proxy.
+            self._backend.begin(conn.raw)
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._backend.end(conn.raw)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _using(self, conn):
+        if conn is not None:
+            yield conn
+            return
+        conn = self._pool.connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _cursor(self, conn, sql):
+        """Return (cursor, translated sql) for running ``sql`` on ``conn``."""
+        sql = self._backend.translate(sql)
+        state = conn.state
+        cache = state.get("statements")
+        if cache is None:
+            cache = state["statements"] = StatementCache(conn.raw)
+        return cache.cursor(sql), sql
+
+    def _fetchall(self, sql, params=(), conn=None):
+        with self._using(conn) as conn, query_stats.timed(sql, params) as probe:
+            cursor, translated = self._cursor(conn, sql)
+            cursor.execute(translated, params)
+            rows = cursor.fetchall()
+            probe["rows"] = len(rows)
+            return rows
+
+    def _fetchone(self, sql, params=(), conn=None):
+        with self._using(conn) as conn, query_stats.timed(sql, params) as probe:
+            cursor, translated = self._cursor(conn, sql)
+            cursor.execute(translated, params)
+            row = cursor.fetchone()
+            # Drain the rest so the cached cursor is free for the next call.
+            if row is not None:
+                cursor.fetchall()
+                probe["rows"] = 1
+            return row
+
+    def _scalar(self, sql, params=(), conn=None):
+        row = self._fetchone(sql, params, conn)
+        return row[0] if row else None
+
+    def _stream(self, sql, params=(), batch_size=5000, conn=None):
+        """Yield the result of ``sql`` in lists of up to ``batch_size`` rows, read with fetchmany.
+
+        The connection stays borrowed until the generator is exhausted or
+        closed. The statement is timed over the execute and fetch calls
+        only, not over what the caller does between batches.
+        """
+        with self._using(conn) as conn:
+            # A cursor of its own: the cached ones may be needed while this one is open.
+            cursor = conn.raw.cursor()
+            translated = self._backend.translate(sql)
+            rows = fetches = 0
+            seconds = 0.0
+            error = True
+            try:
+                started = time.perf_counter()
+                cursor.execute(translated, params)
+                seconds += time.perf_counter() - started
+                while True:
+                    started = time.perf_counter()
+                    batch = cursor.fetchmany(batch_size)
+                    seconds += time.perf_counter() - started
+                    fetches += 1
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    yield batch
+                error = False
+            except GeneratorExit:
+                # The caller stopped reading (e.g. a cancelled export), which is not a failure.
+                error = False
+                raise
+            finally:
+                cursor.close()
+                query_stats.record(1, fetches or 1, rows, sql, seconds, params, error=error)
+
+    def _page(self, keyset, params, page_size, cursor=None, backwards=False, with_total=False, conn=None):
+        """Fetch the page after ``cursor`` (or before it when ``backwards``) as a Page."""
+        if cursor is None:
+            sql, args = keyset.first_sql, [page_size + 1, *params]
+            backwards = False
+        else:
+            sql = keyset.before_sql if backwards else keyset.after_sql
+            args = [page_size + 1, *params, *keyset.seek_params(cursor)]
+
+        with self._using(conn) as conn:
+            rows = [tuple(row) for row in self._fetchall(sql, args, conn)]
+            total = self._scalar(keyset.count_sql, params, conn) if with_total else None
+
+        # One extra row tells whether there is anything past this page.
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+        first = keyset.cursor_of(rows[0]) if rows else None
+        last = keyset.cursor_of(rows[-1]) if rows else None
+        if backwards:
+            return Page(rows, next_cursor=last, prev_cursor=first if more else None, total=total)
+        return Page(rows, next_cursor=last if more else None,
+                    prev_cursor=first if cursor is not None else None, total=total)
+
+    def _execute(self, sql, params=(), conn=None):
+        """Run a write and return the number of affected rows."""
+        with self._using(conn) as conn, query_stats.timed(sql, params):
+            cursor, translated = self._cursor(conn, sql)
+            cursor.execute(translated, params)
+            return cursor.rowcount
+
+    def _executemany(self, sql, rows, conn=None):
+        """Send a batch of parameter rows in one round-trip where the driver allows it."""
+        if not rows:
+            return
+        with self._using(conn) as conn:
+            cursor, translated = self._cursor(conn, sql)
+            fast = hasattr(cursor, "fast_executemany")
+            if fast:
+                cursor.fast_executemany = True
+            with query_stats.timed(sql, rows[0], statements=len(rows), round_trips=1 if fast else len(rows)):
+                cursor.executemany(translated, rows)
@@ -0,0 +1,54 @@
+"""Customer shopping carts."""
+from shared.backends import variant
+from shared.dao.base import Repository
+
+
+ITEMS = """
+SELECT c.ProductID, p.ProductName, c.Quantity, p.Price
+FROM ShoppingCart c
+JOIN Products p ON c.ProductID = p.ProductSKU
+WHERE c.CustomerID = ?
+"""
+
+ADD = "INSERT INTO ShoppingCart (CustomerID, ProductID, Quantity) VALUES (?, ?, ?)"
+
+# Sets a line's quantity whether or not the line exists yet.
+UPSERT = variant("""
+MERGE ShoppingCart WITH (HOLDLOCK) AS c
+USING (SELECT ? AS CustomerID, ? AS ProductID, ? AS Quantity) AS s
+ON c.CustomerID = s.CustomerID AND c.ProductID = s.ProductID
+WHEN MATCHED THEN UPDATE SET Quantity = s.Quantity
+WHEN NOT MATCHED THEN INSERT (CustomerID, ProductID, Quantity) VALUES (s.CustomerID, s.ProductID, s.Quantity);
+""", sqlite="""
+INSERT INTO ShoppingCart (CustomerID, ProductID, Quantity) VALUES (?, ?, ?)
+ON CONFLICT (CustomerID, ProductID) DO UPDATE SET Quantity = excluded.Quantity
+""")
+
+REMOVE = "DELETE FROM ShoppingCart WHERE CustomerID = ? AND ProductID = ?"
+
+CLEAR = "DELETE FROM ShoppingCart WHERE CustomerID = ?"
+
+
+class CartRepository(Repository):
+    def items(self, customer_id):
+        """Return (ProductSKU, ProductName, Quantity, Price) rows in the customer's cart."""
+        return [tuple(row) for row in self._fetchall(ITEMS, (customer_id,))]
+
+    def add(self, customer_id, product_id, quantity):
+        self._execute(ADD, (customer_id, product_id, quantity))
+
+    def apply(self, customer_id, lines):
+        """Write (ProductSKU, Quantity) pairs to the cart in one transaction; quantity 0 removes the line.
+
+        The upserts go out as one batch and the removals as another, so a
+        flush costs one round-trip, or two when it both changes and removes
+        lines.
+        """
+        upserts = [(customer_id, sku, quantity) for sku, quantity in lines if quantity > 0]
+        removals = [(customer_id, sku) for sku, quantity in lines if quantity <= 0]
+        with self.transaction() as conn:
+            self._executemany(UPSERT, upserts, conn)
+            self._executemany(REMOVE, removals, conn)
+
+    def clear(self, customer_id):
+        return self._execute(CLEAR, (customer_id,))
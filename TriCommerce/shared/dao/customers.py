@@ -0,0 +1,48 @@
+"""Customer accounts."""
+from shared.dao.base import Repository
+
+
+LOGIN = """
+SELECT CustomerID, EmailID, FirstName, LastName, City, DeliveryAddress
+FROM Customers
+WHERE EmailID = ? AND Password = ?
+"""
+
+SESSION_PROFILE = "SELECT EmailID, FirstName, LastName, City, DeliveryAddress FROM Customers WHERE CustomerID = ?"
+
+REGISTER = """
+INSERT INTO Customers (FirstName, LastName, EmailID, Password, ContactNumber, City, DeliveryAddress)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+PROFILE = """
+SELECT FirstName, LastName, EmailID, ContactNumber, Password, City, DeliveryAddress
+FROM Customers
+WHERE CustomerID = ?
+"""
+
+UPDATE_PROFILE = """
+UPDATE Customers
+SET FirstName = ?, LastName = ?, EmailID = ?, ContactNumber = ?, Password = ?, City = ?, DeliveryAddress = ?
+WHERE CustomerID = ?
+"""
+
+
+class CustomerRepository(Repository):
+    def sign_in(self, email, password):
+        """Return (CustomerID, EmailID, FirstName, LastName, City, DeliveryAddress), or None."""
+        return self._fetchone(LOGIN, (email, password))
+
+    def session_profile(self, customer_id):
+        """Return (EmailID, FirstName, LastName, City, DeliveryAddress), or None."""
+        return self._fetchone(SESSION_PROFILE, (customer_id,))
+
+    def register(self, first_name, last_name, email, password, contact_number, city, delivery_address):
+        self._execute(REGISTER, (first_name, last_name, email, password, contact_number, city, delivery_address))
+
+    def profile(self, customer_id):
+        return self._fetchone(PROFILE, (customer_id,))
+
+    def update_profile(self, customer_id, first_name, last_name, email, contact_number, password, city, delivery_address):
+        return self._execute(UPDATE_PROFILE, (first_name, last_name, email, contact_number, password, city,
+                                              delivery_address, customer_id))
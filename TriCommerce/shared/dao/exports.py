@@ -0,0 +1,87 @@
+"""Full-table reads for exports, streamed in batches instead of fetched whole.
+
+Every listing walks its table in clustered key order, so the server
+streams rows as it reads them instead of sorting the result first. Each
+one has a matching count, which the export runs first to report progress.
+"""
+from shared.dao.base import Repository
+
+
+def _statements(columns, source, filters, order_by):
+    """{filters used: (select, count)} for every combination of the optional ``filters``."""
+    statements = {}
+    for mask in range(2 ** len(filters)):
+        used = tuple(bool(mask & (1 << i)) for i in range(len(filters)))
+        where = " AND ".join(f for f, on in zip(filters, used) if on)
+        where = f"WHERE {where}\n" if where else ""
+        statements[used] = (f"SELECT {columns}{source}{where}ORDER BY {order_by}",
+                            f"SELECT COUNT_BIG(*){source}{where}")
+    return statements
+
+
+ORDER_LINES = _statements(
+    """oi.OrderID, o.OrderDate, o.StatusID, o.CustomerID, oi.ProductSKU, p.SellerID,
+       oi.Quantity, oi.UnitPrice, (oi.Quantity * oi.UnitPrice) AS LineTotal""",
+    """
+FROM OrderItems oi
+INNER JOIN Orders o ON o.OrderID = oi.OrderID
+INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+""",
+    ["p.SellerID = ?", "o.StatusID = ?"],
+    "oi.OrderID, oi.ProductSKU",
+)
+
+PRODUCTS = _statements(
+    """p.ProductSKU, p.SellerID, p.ProductName, c.CategoryName, p.Description, p.Price,
+       p.StockQuantity, p.Status, p.PublishDate""",
+    """
+FROM Products p
+LEFT JOIN Categories c ON c.CategoryID = p.CategoryID
+""",
+    ["p.SellerID = ?"],
+    "p.ProductSKU",
+)
+
+FINANCES = _statements(
+    "TransactionID, MonthOfPayment, SellerID, PaymentDate, Status, Amount",
+    """
+FROM Finances
+""",
+    ["SellerID = ?"],
+    "TransactionID",
+)
+
+
+class ExportRepository(Repository):
+    """``rows`` methods return a generator of row batches (see Repository._stream)."""
+
+    def _filtered(self, statements, values):
+        used = tuple(value is not None for value in values)
+        return statements[used], tuple(value for value in values if value is not None)
+
+    def count_order_lines(self, seller_id=None, status_id=None):
+        (_, count), params = self._filtered(ORDER_LINES, (seller_id, status_id))
+        return self._scalar(count, params)
+
+    def order_lines(self, seller_id=None, status_id=None, batch_size=5000):
+        """(OrderID, OrderDate, StatusID, CustomerID, ProductSKU, SellerID, Quantity, UnitPrice, LineTotal)."""
+        (select, _), params = self._filtered(ORDER_LINES, (seller_id, status_id))
+        return self._stream(select, params, batch_size)
+
+    def count_products(self, seller_id=None):
+        (_, count), params = self._filtered(PRODUCTS, (seller_id,))
+        return self._scalar(count, params)
+
+    def products(self, seller_id=None, batch_size=5000):
+        """(ProductSKU, SellerID, ProductName, CategoryName, Description, Price, StockQuantity, Status, PublishDate)."""
+        (select, _), params = self._filtered(PRODUCTS, (seller_id,))
+        return self._stream(select, params, batch_size)
+
+    def count_finances(self, seller_id=None):
+        (_, count), params = self._filtered(FINANCES, (seller_id,))
+        return self._scalar(count, params)
+
+    def finances(self, seller_id=None, batch_size=5000):
+        """(TransactionID, MonthOfPayment, SellerID, PaymentDate, Status, Amount)."""
+        (select, _), params = self._filtered(FINANCES, (seller_id,))
+        return self._stream(select, params, batch_size)
@@ -0,0 +1,87 @@
+"""Seller payouts: one Finances row per seller and month, computed in the database."""
+from decimal import Decimal
+
+from shared.backends import variant
+from shared.dao.base import Repository
+
+# Gross of the delivered lines of the month's orders less each line's category
+# commission, summed per seller in one pass over IX_Orders_Status_Date: the
+# month is read once, and SQL Server parallelises the scan and aggregate
+# itself. Sellers that already have a row for the month are skipped, which
+# is what makes settling a month twice harmless; the key-range locks hold
+# off a concurrent run between the check and the insert.
+SETTLE = variant("""
+WITH payouts AS (
+    SELECT p.SellerID,
+           SUM(oi.Quantity * oi.UnitPrice * (100 - ISNULL(c.PlatformCommission, 0))) / 100 AS Amount
+    FROM Orders o
+    INNER JOIN OrderItems oi ON oi.OrderID = o.OrderID
+    INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+    LEFT JOIN Categories c ON c.CategoryID = p.CategoryID
+    WHERE o.StatusID = ? AND o.OrderDate >= ? AND o.OrderDate < ?
+      AND p.SellerID IS NOT NULL
+    GROUP BY p.SellerID
+)
+INSERT INTO Finances (MonthOfPayment, SellerID, PaymentDate, Status, Amount)
+OUTPUT INSERTED.Amount
+SELECT ?, d.SellerID, ?, 'Paid', ROUND(d.Amount, 2)
+FROM payouts d
+WHERE NOT EXISTS (
+    SELECT 1 FROM Finances f WITH (UPDLOCK, HOLDLOCK)
+    WHERE f.MonthOfPayment = ? AND f.SellerID = d.SellerID)
+""", sqlite="""
+WITH payouts AS (
+    SELECT p.SellerID,
+           SUM(oi.Quantity * oi.UnitPrice * (100 - IFNULL(c.PlatformCommission, 0))) / 100 AS Amount
+    FROM Orders o
+    INNER JOIN OrderItems oi ON oi.OrderID = o.OrderID
+    INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+    LEFT JOIN Categories c ON c.CategoryID = p.CategoryID
+    WHERE o.StatusID = ?1 AND o.OrderDate >= ?2 AND o.OrderDate < ?3
+      AND p.SellerID IS NOT NULL
+    GROUP BY p.SellerID
+)
+INSERT INTO Finances (MonthOfPayment, SellerID, PaymentDate, Status, Amount)
+SELECT ?4, d.SellerID, ?5, 'Paid', ROUND(d.Amount, 2)
+FROM payouts d
+WHERE NOT EXISTS (
+    SELECT 1 FROM Finances f WHERE f.MonthOfPayment = ?6 AND f.SellerID = d.SellerID)
+RETURNING Amount
+""")
+
+SETTLED = """
+SELECT COUNT_BIG(*), SUM(Amount)
+FROM Finances
+WHERE MonthOfPayment = ?
+"""
+
+OPEN_ORDERS = """
+SELECT COUNT_BIG(*)
+FROM Orders
+WHERE StatusID IN (?, ?) AND OrderDate >= ? AND OrderDate < ?
+"""
+
+
+def _amount(value):
+    # SQLite hands back decimals as floats.
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+class FinanceRepository(Repository):
+    def settle(self, month, start, end, payment_date, delivered_id):
+        """Pay every seller with delivered sales in ``month`` who is not paid for it yet.
+
+        ``start`` and ``end`` bound the month's order dates (end exclusive).
+        Returns the amounts of the rows written.
+        """
+        rows = self._fetchall(SETTLE, (delivered_id, start, end, month, payment_date, month))
+        return [_amount(row[0]) for row in rows]
+
+    def settled(self, month):
+        """(sellers paid, total paid) for ``month``."""
+        count, total = self._fetchone(SETTLED, (month,))
+        return count, _amount(total)
+
+    def open_orders(self, status_ids, start, end):
+        """Orders of the month still in one of two ``status_ids`` (e.g. Pending and Shipped)."""
+        return self._scalar(OPEN_ORDERS, (*status_ids, start, end))
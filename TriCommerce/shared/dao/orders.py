@@ -0,0 +1,326 @@
+"""Orders, their line items and order status changes."""
+import json
+
+from shared.backends import variant
+from shared.dao.base import Repository
+from shared.dao.paging import Keyset
+from shared.dao.stock import StockRepository
+from shared import refdata
+
+
+ORDER_LINES_COLUMNS = """
+    o.OrderID,
+    oi.ProductSKU,
+    oi.Quantity,
+    (oi.Quantity * oi.UnitPrice) AS TotalAmount,
+    o.CustomerID,
+    CONCAT(c.FirstName, ' ', c.LastName) AS CustomerName,
+    o.OrderDate"""
+
+ORDER_LINES_FROM = """
+FROM Orders o
+INNER JOIN OrderItems oi ON o.OrderID = oi.OrderID
+INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
+INNER JOIN Customers c ON o.CustomerID = c.CustomerID
+"""
+
+ORDER_LINES_SELECT = "SELECT" + ORDER_LINES_COLUMNS + ORDER_LINES_FROM
+
+# Status titles are resolved to StatusID from the in-memory reference data,
+# so none of these statements join the Status table.
+BY_STATUS = ORDER_LINES_SELECT + "WHERE o.StatusID = ?"
+
+SELLER_BY_STATUS = ORDER_LINES_SELECT + "WHERE p.SellerID = ? AND o.StatusID = ?"
+
+# Newest orders first; ProductSKU breaks ties between the lines of one order.
+ORDER_LINE_KEYS = [("o.OrderDate", 6, True), ("o.OrderID", 0, True), ("oi.ProductSKU", 1, False)]
+
+BY_STATUS_PAGES = Keyset(ORDER_LINES_COLUMNS, ORDER_LINES_FROM, "o.StatusID = ?", ORDER_LINE_KEYS)
+
+SELLER_BY_STATUS_PAGES = Keyset(ORDER_LINES_COLUMNS, ORDER_LINES_FROM, "p.SellerID = ? AND o.StatusID = ?",
+                                ORDER_LINE_KEYS)
+
+# Order summaries: one row per order instead of one per line, so a 20-line
+# order is one row and one copy of the customer name.
+#
+# The admin listing walks IX_Orders_Status_Date newest first and adds up each
+# order's lines with seeks on the OrderItems key, so a page stops after
+# TOP (n) orders; grouping the join instead would aggregate every order with
+# the status before the first page could be returned. A seller's listing
+# starts from the seller's products, which already narrows it to a few lines,
+# so it groups them and only adds up that seller's lines.
+ORDER_SUMMARY_COLUMNS = """
+    o.OrderID,
+    (SELECT COUNT(*) FROM OrderItems oi WHERE oi.OrderID = o.OrderID) AS Items,
+    (SELECT SUM(oi.Quantity) FROM OrderItems oi WHERE oi.OrderID = o.OrderID) AS Units,
+    (SELECT SUM(oi.Quantity * oi.UnitPrice) FROM OrderItems oi WHERE oi.OrderID = o.OrderID) AS TotalAmount,
+    o.CustomerID,
+    CONCAT(c.FirstName, ' ', c.LastName) AS CustomerName,
+    o.OrderDate"""
+
+ORDER_SUMMARY_FROM = """
+FROM Orders o
+INNER JOIN Customers c ON o.CustomerID = c.CustomerID
+"""
+
+SELLER_ORDER_SUMMARY_COLUMNS = """
+    o.OrderID,
+    COUNT(*) AS Items,
+    SUM(oi.Quantity) AS Units,
+    SUM(oi.Quantity * oi.UnitPrice) AS TotalAmount,
+    o.CustomerID,
+    CONCAT(c.FirstName, ' ', c.LastName) AS CustomerName,
+    o.OrderDate"""
+
+SELLER_ORDER_SUMMARY_FROM = """
+FROM Orders o
+INNER JOIN OrderItems oi ON o.OrderID = oi.OrderID
+INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
+INNER JOIN Customers c ON o.CustomerID = c.CustomerID
+"""
+
+ORDER_KEYS = [("o.OrderDate", 6, True), ("o.OrderID", 0, True)]
+
+SUMMARIES_PAGES = Keyset(ORDER_SUMMARY_COLUMNS, ORDER_SUMMARY_FROM, "o.StatusID = ?", ORDER_KEYS)
+
+SELLER_SUMMARIES_PAGES = Keyset(SELLER_ORDER_SUMMARY_COLUMNS, SELLER_ORDER_SUMMARY_FROM,
+                                "p.SellerID = ? AND o.StatusID = ?", ORDER_KEYS,
+                                group_by="o.OrderID, o.OrderDate, o.CustomerID, c.FirstName, c.LastName")
+
+# The lines of one order, read when the order is opened in a listing.
+ITEMS = """
+SELECT oi.ProductSKU, p.ProductName, oi.Quantity, oi.UnitPrice, (oi.Quantity * oi.UnitPrice) AS LineTotal
+FROM OrderItems oi
+INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
+WHERE oi.OrderID = ?
+ORDER BY oi.ProductSKU
+"""
+
+SELLER_ITEMS = """
+SELECT oi.ProductSKU, p.ProductName, oi.Quantity, oi.UnitPrice, (oi.Quantity * oi.UnitPrice) AS LineTotal
+FROM OrderItems oi
+INNER JOIN Products p ON oi.ProductSKU = p.ProductSKU
+WHERE oi.OrderID = ? AND p.SellerID = ?
+ORDER BY oi.ProductSKU
+"""
+
+STATUS_ID = "SELECT StatusID FROM Orders WHERE OrderID = ?"
+
+SET_STATUS = "UPDATE Orders SET StatusID = ? WHERE OrderID = ?"
+
+# Orders has triggers (migration 003), and SQL Server rejects a bare OUTPUT
+# clause on a table with enabled triggers (error 334), so the changed rows go
+# through a table variable. SET NOCOUNT keeps the SELECT the first result;
+# a parameterized batch runs in its own scope, so the setting ends with it.
+TRANSITION = variant("""
+SET NOCOUNT ON;
+DECLARE @changed TABLE (OrderID BIGINT, StatusID BIGINT);
+UPDATE Orders
+SET StatusID = ?
+OUTPUT INSERTED.OrderID, INSERTED.StatusID INTO @changed
+WHERE OrderID = ? AND StatusID = ?;
+SELECT OrderID, StatusID FROM @changed;
+""", sqlite="""
+UPDATE Orders
+SET StatusID = ?1
+WHERE OrderID = ?2 AND StatusID = ?3
+RETURNING OrderID, StatusID
+""")
+
+# The order state machine: target status -> the only status it may be reached from.
+ORDER_TRANSITIONS = {
+    "Shipped": "Pending",
+    "Delivered": "Shipped",
+    "Cancelled": "Pending",
+}
+
+# Bulk transitions take their OrderIDs as one JSON array parameter, so a batch
+# of any size is a single statement with a fixed parameter count. The status
+# check in the WHERE clause is the validation: OUTPUT lists the orders that
+# actually moved and everything else in the batch was rejected. As in
+# TRANSITION, OUTPUT goes through a table variable because of the triggers.
+TRANSITION_MANY = variant("""
+SET NOCOUNT ON;
+DECLARE @moved TABLE (OrderID BIGINT);
+UPDATE Orders
+SET StatusID = ?
+OUTPUT INSERTED.OrderID INTO @moved
+WHERE StatusID = ? AND OrderID IN (SELECT CAST([value] AS BIGINT) FROM OPENJSON(?));
+SELECT OrderID FROM @moved;
+""", sqlite="""
+UPDATE Orders
+SET StatusID = ?1
+WHERE StatusID = ?2 AND OrderID IN (SELECT value FROM json_each(?3))
+RETURNING OrderID
+""")
+
+STATUS_IDS = variant("""
+SELECT OrderID, StatusID
+FROM Orders
+WHERE OrderID IN (SELECT CAST([value] AS BIGINT) FROM OPENJSON(?))
+""", sqlite="""
+SELECT OrderID, StatusID
+FROM Orders
+WHERE OrderID IN (SELECT value FROM json_each(?1))
+""")
+
+CREATE = variant("""
+SET NOCOUNT ON;
+DECLARE @created TABLE (OrderID BIGINT);
+INSERT INTO Orders (CustomerID, StatusID, ShippingAddress, OrderDate)
+OUTPUT INSERTED.OrderID INTO @created
+VALUES (?, ?, ?, ?);
+SELECT OrderID FROM @created;
+""", sqlite="""
+INSERT INTO Orders (CustomerID, StatusID, ShippingAddress, OrderDate)
+VALUES (?1, ?2, ?3, ?4)
+RETURNING OrderID
+""")
+
+ITEMS_FROM_CART = """
+INSERT INTO OrderItems (OrderID, ProductSKU, Quantity, UnitPrice)
+SELECT ?, c.ProductID, c.Quantity, p.Price
+FROM ShoppingCart c
+INNER JOIN Products p ON c.ProductID = p.ProductSKU
+WHERE c.CustomerID = ?
+"""
+
+CLEAR_CART = "DELETE FROM ShoppingCart WHERE CustomerID = ?"
+
+
+class EmptyCartError(Exception):
+    """Raised when checkout finds nothing in the customer's cart."""
+
+
+class TransitionResult:
+    """Outcome of a bulk status change.
+
+    ``changed`` lists the OrderIDs that moved; ``rejected`` maps every other
+    requested OrderID to its current status title, or None if it does not exist.
+    """
+
+    def __init__(self, changed, rejected):
+        self.changed = changed
+        self.rejected = rejected
+
+    def summary(self):
+        if not self.rejected:
+            return f"{len(self.changed)} order(s) updated."
+        reasons = {}
+        for order_id, status in self.rejected.items():
+            reasons.setdefault(status or "missing", []).append(order_id)
+        details = "; ".join(f"{len(ids)} {status.lower()}" for status, ids in sorted(reasons.items()))
+        return f"{len(self.changed)} order(s) updated, {len(self.rejected)} rejected ({details})."
+
+
+class OrderRepository(Repository):
+    def by_status(self, status):
+        """Return one row per order line for every order with the given status."""
+        return self._fetchall(BY_STATUS, (refdata.get_reference_data().status_id(status),))
+
+    def seller_orders(self, seller_id, status):
+        return self._fetchall(SELLER_BY_STATUS, (seller_id, refdata.get_reference_data().status_id(status)))
+
+    def page_by_status(self, status, page_size=100, cursor=None, backwards=False, with_total=False):
+        """Return one Page of order lines with the given status, newest first."""
+        return self._page(BY_STATUS_PAGES, (refdata.get_reference_data().status_id(status),),
+                          page_size, cursor, backwards, with_total)
+
+    def page_seller_orders(self, seller_id, status, page_size=100, cursor=None, backwards=False, with_total=False):
+        return self._page(SELLER_BY_STATUS_PAGES, (seller_id, refdata.get_reference_data().status_id(status)),
+                          page_size, cursor, backwards, with_total)
+
+    def page_summaries(self, status, page_size=100, cursor=None, backwards=False, with_total=False):
+        """Return one Page of order summaries with the given status, newest first.
+
+        Rows are (OrderID, Items, Units, TotalAmount, CustomerID, CustomerName, OrderDate).
+        """
+        return self._page(SUMMARIES_PAGES, (refdata.get_reference_data().status_id(status),),
+                          page_size, cursor, backwards, with_total)
+
+    def page_seller_summaries(self, seller_id, status, page_size=100, cursor=None, backwards=False,
+                              with_total=False):
+        """Like page_summaries, counting only the lines of the seller's products."""
+        return self._page(SELLER_SUMMARIES_PAGES, (seller_id, refdata.get_reference_data().status_id(status)),
+                          page_size, cursor, backwards, with_total)
+
+    def items(self, order_id):
+        """Return (ProductSKU, ProductName, Quantity, UnitPrice, LineTotal) for every line of an order."""
+        return self._fetchall(ITEMS, (order_id,))
+
+    def seller_items(self, seller_id, order_id):
+        return self._fetchall(SELLER_ITEMS, (order_id, seller_id))
+
+    def status_title(self, order_id, conn=None):
+        status_id = self._scalar(STATUS_ID, (order_id,), conn)
+        return None if status_id is None else refdata.get_reference_data().status_title(status_id)
+
+    def set_status(self, order_id, status_title, conn=None):
+        return self._execute(SET_STATUS, (refdata.get_reference_data().status_id(status_title), order_id), conn)
+
+    def transition(self, order_id, from_title, to_title, conn=None):
+        """Move an order from one status to another in a single statement.
+
+        Returns the changed (OrderID, StatusID) rows, which is empty when the
+        order does not exist or is not in ``from_title``.
+        """
+        statuses = refdata.get_reference_data()
+        rows = self._fetchall(TRANSITION, (statuses.status_id(to_title), order_id, statuses.status_id(from_title)), conn)
+        return [tuple(row) for row in rows]
+
+    def transition_many(self, order_ids, to_title, batch_size=1000):
+        """Move every listed order that is in the status ORDER_TRANSITIONS allows to ``to_title``.
+
+        Each batch of ``batch_size`` orders is one UPDATE in its own
+        transaction; cancelling also returns the cancelled lines to stock in
+        that transaction. Returns a TransitionResult; the current statuses of
+        rejected orders are read in one extra query, only when there are any.
+        """
+        if to_title not in ORDER_TRANSITIONS:
+            raise ValueError(f"orders cannot be moved to {to_title!r}")
+        statuses = refdata.get_reference_data()
+        to_id = statuses.status_id(to_title)
+        from_id = statuses.status_id(ORDER_TRANSITIONS[to_title])
+        if to_id is None:
+            raise LookupError(f"status {to_title!r} is missing; apply the database migrations")
+        stock = StockRepository(self._pool)
+        order_ids = sorted({int(order_id) for order_id in order_ids})
+
+        changed = []
+        for start in range(0, len(order_ids), batch_size):
+            batch = json.dumps(order_ids[start:start + batch_size])
+
+            def work(conn):
+                moved = [row[0] for row in self._fetchall(TRANSITION_MANY, (to_id, from_id, batch), conn)]
+                if moved and to_title == "Cancelled":
+                    stock.release_orders(moved, conn)
+                return moved
+
+            changed.extend(stock.run(work))
+
+        rejected = dict.fromkeys(set(order_ids).difference(changed))
+        if rejected:
+            for order_id, status_id in self._fetchall(STATUS_IDS, (json.dumps(sorted(rejected)),)):
+                rejected[order_id] = statuses.status_title(status_id)
+        return TransitionResult(sorted(changed), rejected)
+
+    def place_order(self, customer_id, shipping_address, order_date):
+        """Turn the customer's cart into a pending order and return its OrderID.
+
+        Runs as one transaction of four set-based statements, so the number of
+        round-trips does not grow with the size of the cart. Stock is reserved
+        conditionally; OutOfStockError rolls the whole order back.
+        """
+        stock = StockRepository(self._pool)
+        pending = refdata.get_reference_data().status_id("Pending")
+
+        def work(conn):
+            order_id = self._scalar(CREATE, (customer_id, pending, shipping_address, order_date), conn)
+            line_count = self._execute(ITEMS_FROM_CART, (order_id, customer_id), conn)
+            if line_count == 0:
+                raise EmptyCartError("Your cart is empty. Please add products before proceeding.")
+            stock.reserve_order(order_id, line_count, conn)
+            self._execute(CLEAR_CART, (customer_id,), conn)
+            return order_id
+
+        return stock.run(work)
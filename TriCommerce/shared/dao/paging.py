@@ -0,0 +1,72 @@
+"""Keyset ("seek") pagination for the order and product listings.
+
+A page is fetched with ``TOP (n)`` and a predicate that starts right after
+(or before) the key of the last row seen, so every page costs one index
+seek no matter how deep into the listing it is, unlike OFFSET paging.
+"""
+
+
+class Keyset:
+    """Builds the page queries of one listing.
+
+    ``keys`` are ``(expression, position in the row, descending)`` and must
+    make the ordering unique; the last key is the tie-breaker. With
+    ``group_by`` each page row is a group; the keys must then be grouped
+    columns, so the seek still filters rows before they are aggregated.
+    """
+
+    def __init__(self, columns, source, where, keys, group_by=None):
+        self.keys = list(keys)
+        top = f"SELECT TOP (?){columns}{source}"
+        group = f"\nGROUP BY {group_by}" if group_by else ""
+        self.first_sql = f"{top}WHERE {where}{group}\nORDER BY {self._order(False)}"
+        self.after_sql = f"{top}WHERE {where} AND {self._seek(False)}{group}\nORDER BY {self._order(False)}"
+        self.before_sql = f"{top}WHERE {where} AND {self._seek(True)}{group}\nORDER BY {self._order(True)}"
+        if group_by:
+            self.count_sql = f"SELECT COUNT_BIG(*) FROM (SELECT 1 AS Found{source}WHERE {where}{group}) g"
+        else:
+            self.count_sql = f"SELECT COUNT_BIG(*){source}WHERE {where}"
+
+    def _order(self, backwards):
+        return ", ".join(f"{expr} {'DESC' if descending != backwards else 'ASC'}"
+                         for expr, _, descending in self.keys)
+
+    def _seek(self, backwards):
+        # (k1 < ?) OR (k1 = ? AND k2 < ?) OR ..., plus a plain range on k1
+        # up front so the optimizer can seek instead of filtering.
+        lead, _, lead_descending = self.keys[0]
+        clauses = []
+        for i, (expr, _, descending) in enumerate(self.keys):
+            op = "<" if descending != backwards else ">"
+            clauses.append(" AND ".join([f"{e} = ?" for e, _, _ in self.keys[:i]] + [f"{expr} {op} ?"]))
+        lead_op = "<=" if lead_descending != backwards else ">="
+        return f"{lead} {lead_op} ? AND (({') OR ('.join(clauses)}))"
+
+    def seek_params(self, cursor):
+        params = [cursor[0]]
+        for i in range(len(self.keys)):
+            params.extend(cursor[:i + 1])
+        return params
+
+    def cursor_of(self, row):
+        return tuple(row[position] for _, position, _ in self.keys)
+
+
+class Page:
+    """One page of rows and the cursors of the pages around it.
+
+    ``next_cursor`` / ``prev_cursor`` are None when there is nothing further
+    in that direction. ``total`` is only filled in when it was asked for.
+    """
+
+    def __init__(self, rows, next_cursor=None, prev_cursor=None, total=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
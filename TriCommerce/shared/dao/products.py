@@ -0,0 +1,174 @@
+"""Product catalogue."""
+from shared.backends import variant
+from shared.dao.base import Repository
+from shared.dao.paging import Keyset
+
+
+ACTIVE_IN_CATEGORY = """
+SELECT ProductSKU, ProductName, Price, StockQuantity
+FROM Products
+WHERE CategoryID = ? AND Status = 'Active'
+"""
+
+DETAILS = """
+SELECT ProductSKU, Description, StockQuantity, ProductImage, ProductName, Price
+FROM Products
+WHERE ProductSKU = ?
+"""
+
+# Every product listing returns rows of this shape, and so do the status
+# updates, so a grid can patch a changed row in place.
+PRODUCT_ROW = " ProductSKU, SellerID, ProductName, StockQuantity, Price, Status"
+
+BY_STATUS = "SELECT" + PRODUCT_ROW + " FROM Products WHERE Status = ?"
+
+SELLER_BY_STATUS = "SELECT" + PRODUCT_ROW + " FROM Products WHERE Status = ? AND SellerID = ?"
+
+BY_STATUS_PAGES = Keyset(PRODUCT_ROW, "\nFROM Products\n", "Status = ?", [("ProductSKU", 0, False)])
+
+SELLER_BY_STATUS_PAGES = Keyset(PRODUCT_ROW, "\nFROM Products\n", "Status = ? AND SellerID = ?",
+                                [("ProductSKU", 0, False)])
+
+STATUS = "SELECT Status FROM Products WHERE ProductSKU = ?"
+
+# Products has triggers (migration 003), which rule out a bare OUTPUT clause
+# on SQL Server (error 334); see orders.TRANSITION.
+SET_STATUS = variant("""
+SET NOCOUNT ON;
+DECLARE @changed TABLE (ProductSKU BIGINT, SellerID BIGINT, ProductName VARCHAR(100),
+                        StockQuantity INT, Price DECIMAL(10, 2), Status VARCHAR(50));
+UPDATE Products
+SET Status = ?
+OUTPUT INSERTED.ProductSKU, INSERTED.SellerID, INSERTED.ProductName,
+       INSERTED.StockQuantity, INSERTED.Price, INSERTED.Status INTO @changed
+WHERE ProductSKU = ?;
+SELECT ProductSKU, SellerID, ProductName, StockQuantity, Price, Status FROM @changed;
+""", sqlite="""
+UPDATE Products
+SET Status = ?1
+WHERE ProductSKU = ?2
+RETURNING ProductSKU, SellerID, ProductName, StockQuantity, Price, Status
+""")
+
+# Inactive products go back to the given status, every other product becomes
+# Inactive: the toggle reads and writes the status in one statement.
+TOGGLE_STATUS = variant("""
+SET NOCOUNT ON;
+DECLARE @changed TABLE (ProductSKU BIGINT, SellerID BIGINT, ProductName VARCHAR(100),
+                        StockQuantity INT, Price DECIMAL(10, 2), Status VARCHAR(50));
+UPDATE Products
+SET Status = CASE WHEN Status = 'Inactive' THEN ? ELSE 'Inactive' END
+OUTPUT INSERTED.ProductSKU, INSERTED.SellerID, INSERTED.ProductName,
+       INSERTED.StockQuantity, INSERTED.Price, INSERTED.Status INTO @changed
+WHERE ProductSKU = ?;
+SELECT ProductSKU, SellerID, ProductName, StockQuantity, Price, Status FROM @changed;
+""", sqlite="""
+UPDATE Products
+SET Status = CASE WHEN Status = 'Inactive' THEN ?1 ELSE 'Inactive' END
+WHERE ProductSKU = ?2
+RETURNING ProductSKU, SellerID, ProductName, StockQuantity, Price, Status
+""")
+
+APPROVE_ALL_PENDING = "UPDATE Products SET Status = 'Active' WHERE Status = 'Pending'"
+
+# Products changed since a RowVer (migration 002), oldest change first.
+CHANGED_SINCE = variant("""
+SELECT TOP (?) ProductSKU, ProductName, Description, CategoryID, Price, StockQuantity, Status,
+       CAST(RowVer AS BIGINT) AS Version
+FROM Products
+WHERE RowVer > CONVERT(BINARY(8), CAST(? AS BIGINT))
+ORDER BY RowVer
+""", sqlite="""
+SELECT ProductSKU, ProductName, Description, CategoryID, Price, StockQuantity, Status, RowVer
+FROM Products
+WHERE RowVer > ?2
+ORDER BY RowVer
+LIMIT ?1
+""")
+
+HAS_FULLTEXT_INDEX = "SELECT OBJECTPROPERTY(OBJECT_ID('Products'), 'TableHasActiveFulltextIndex')"
+
+# ``?`` filters are NULL when not used. The CONTAINS condition is built by
+# shared.search.contains_condition.
+FULLTEXT_SEARCH = """
+SELECT TOP (?) p.ProductSKU, p.ProductName, p.Price, p.StockQuantity, ft.[RANK]
+FROM CONTAINSTABLE(Products, (ProductName, Description), ?) ft
+INNER JOIN Products p ON p.ProductSKU = ft.[KEY]
+WHERE p.Status = 'Active'
+AND (? IS NULL OR p.CategoryID = ?)
+AND (? IS NULL OR p.Price >= ?)
+AND (? IS NULL OR p.Price <= ?)
+AND (? = 0 OR p.StockQuantity > 0)
+ORDER BY ft.[RANK] DESC
+OPTION (RECOMPILE)
+"""
+
+ADD = """
+INSERT INTO Products (SellerID, ProductName, CategoryID, Description, Price, StockQuantity, ProductImage, Status, PublishDate)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ProductRepository(Repository):
+    def active_in_category(self, category_id):
+        """Return (ProductSKU, ProductName, Price, StockQuantity) rows of a category's active products."""
+        return self._fetchall(ACTIVE_IN_CATEGORY, (category_id,))
+
+    def details(self, product_sku):
+        """Return (ProductSKU, Description, StockQuantity, ProductImage, ProductName, Price) or None."""
+        return self._fetchone(DETAILS, (product_sku,))
+
+    def changed_since(self, version, limit=5000):
+        """Return up to ``limit`` products changed after RowVer ``version``, oldest first.
+
+        Rows are (ProductSKU, ProductName, Description, CategoryID, Price,
+        StockQuantity, Status, Version).
+        """
+        return self._fetchall(CHANGED_SINCE, (limit, version))
+
+    def has_fulltext_index(self):
+        return bool(self._scalar(HAS_FULLTEXT_INDEX))
+
+    def fulltext_search(self, condition, category_id=None, min_price=None, max_price=None, in_stock=False,
+                        limit=50):
+        """Return (ProductSKU, ProductName, Price, StockQuantity, rank) rows, best match first."""
+        return self._fetchall(FULLTEXT_SEARCH, (limit, condition, category_id, category_id, min_price, min_price,
+                                                max_price, max_price, 1 if in_stock else 0))
+
+    def by_status(self, status):
+        return self._fetchall(BY_STATUS, (status,))
+
+    def seller_products(self, seller_id, status):
+        return self._fetchall(SELLER_BY_STATUS, (status, seller_id))
+
+    def page_by_status(self, status, page_size=100, cursor=None, backwards=False, with_total=False):
+        """Return one Page of products with the given status in ProductSKU order."""
+        return self._page(BY_STATUS_PAGES, (status,), page_size, cursor, backwards, with_total)
+
+    def page_seller_products(self, seller_id, status, page_size=100, cursor=None, backwards=False, with_total=False):
+        return self._page(SELLER_BY_STATUS_PAGES, (status, seller_id), page_size, cursor, backwards, with_total)
+
+    def status(self, product_sku, conn=None):
+        return self._scalar(STATUS, (product_sku,), conn)
+
+    def set_status(self, product_sku, status, conn=None):
+        """Change a product's status and return the updated product rows."""
+        return [tuple(row) for row in self._fetchall(SET_STATUS, (status, product_sku), conn)]
+
+    def toggle_status(self, product_sku, reactivate_as, conn=None):
+        """Make an Inactive product ``reactivate_as`` and any other product Inactive.
+
+        Returns the updated product rows, which carry the new Status.
+        """
+        return [tuple(row) for row in self._fetchall(TOGGLE_STATUS, (reactivate_as, product_sku), conn)]
+
+    def approve_all_pending(self):
+        return self._execute(APPROVE_ALL_PENDING)
+
+    def add(self, seller_id, name, category_id, description, price, stock, image_path, status, publish_date):
+        self._execute(ADD, (seller_id, name, category_id, description, price, stock, image_path, status, publish_date))
+
+    def add_many(self, rows):
+        """Insert ADD parameter rows as one batch in one transaction."""
+        with self.transaction() as conn:
+            self._executemany(ADD, rows, conn)
@@ -0,0 +1,23 @@
+"""Small, almost static lookup tables: cities, banks, categories and order statuses.
+
+The centers read these through shared.refdata, which keeps them in memory.
+"""
+from shared.dao.base import Repository
+
+
+CITIES = "SELECT CityID, CityName FROM Cities ORDER BY CityID"
+BANKS = "SELECT BankID, BankName FROM Banks ORDER BY BankID"
+CATEGORIES = "SELECT CategoryID, CategoryName, PlatformCommission FROM Categories ORDER BY CategoryID"
+STATUSES = "SELECT StatusID, StatusTitle FROM Status ORDER BY StatusID"
+
+
+class ReferenceRepository(Repository):
+    def load_all(self):
+        """Read every lookup table over one connection."""
+        with self._using(None) as conn:
+            return {
+                "cities": self._fetchall(CITIES, (), conn),
+                "banks": self._fetchall(BANKS, (), conn),
+                "categories": self._fetchall(CATEGORIES, (), conn),
+                "statuses": self._fetchall(STATUSES, (), conn),
+            }
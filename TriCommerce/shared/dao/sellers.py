@@ -0,0 +1,59 @@
+"""Seller accounts."""
+from shared.dao.base import Repository
+
+
+LOGIN = "SELECT SellerID, EmailID, Password FROM Sellers WHERE EmailID = ? AND Password = ?"
+
+STORE_OR_EMAIL_TAKEN = "SELECT StoreName, EmailID FROM Sellers WHERE StoreName = ? OR EmailID = ?"
+
+REGISTER = """
+INSERT INTO Sellers (StoreName, EmailID, CNIC, BankName, BankAccount, City, BusinessAddress, ContactNumber, Password, AccountStatus)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELLER_ROW = " StoreName, CNIC, EmailID, BusinessAddress, AccountStatus, SellerID"
+
+ALL_SELLERS = "SELECT" + SELLER_ROW + " FROM Sellers"
+
+SET_ACCOUNT_STATUS = """
+UPDATE Sellers
+SET AccountStatus = ?
+OUTPUT INSERTED.StoreName, INSERTED.CNIC, INSERTED.EmailID,
+       INSERTED.BusinessAddress, INSERTED.AccountStatus, INSERTED.SellerID
+WHERE SellerID = ?
+"""
+
+# Maintained by the triggers of migration 003; one row per seller.
+DASHBOARD = """
+SELECT PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts
+FROM SellerDashboard
+WHERE SellerID = ?
+"""
+
+
+class SellerRepository(Repository):
+    def authenticate(self, email, password):
+        """Return the SellerID for valid credentials, otherwise None."""
+        return self._scalar(LOGIN, (email, password))
+
+    def store_or_email_taken(self, store_name, email):
+        return self._fetchone(STORE_OR_EMAIL_TAKEN, (store_name, email)) is not None
+
+    def register(self, store_name, email, cnic, bank_name, bank_account, city, address, contact_number, password):
+        self._execute(REGISTER, (store_name, email, cnic, bank_name, bank_account, city, address,
+                                 contact_number, password, "PendingApproval"))
+
+    def all_sellers(self):
+        return self._fetchall(ALL_SELLERS)
+
+    def set_account_status(self, seller_id, status):
+        """Change a seller's account status and return the updated seller rows."""
+        return [tuple(row) for row in self._fetchall(SET_ACCOUNT_STATUS, (status, seller_id))]
+
+    def dashboard(self, seller_id):
+        """Return (PendingOrders, ShippedOrders, DeliveredOrders, Revenue, LowStockProducts).
+
+        Order counts are order lines, as the dashboard has always shown them;
+        a seller without any yet gets zeros.
+        """
+        return tuple(self._fetchone(DASHBOARD, (seller_id,)) or (0, 0, 0, 0, 0))
@@ -0,0 +1,172 @@
+"""Stock reservation that cannot oversell under concurrent checkouts.
+
+Stock is only taken with conditional decrements (``StockQuantity >= requested``)
+and rows are always locked in ascending ProductSKU order, so two checkouts
+that share products queue behind each other instead of deadlocking. If the
+server still picks a deadlock victim the whole transaction is retried with
+jittered exponential backoff.
+"""
+import json
+import random
+import threading
+import time
+
+from shared.backends import variant
+from shared.dao.base import Repository
+
+
+# OrderItems is walked in primary key order (OrderID, ProductSKU), so for one
+# order the Products rows are seeked, and locked, in ascending SKU order.
+# SQLite has no UPDATE alias ... FROM join and locks the whole database
+# for the transaction anyway, so it gets a plain correlated version.
+RESERVE_ORDER = variant("""
+UPDATE p
+SET p.StockQuantity = p.StockQuantity - oi.Quantity
+FROM OrderItems oi
+INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+WHERE oi.OrderID = ? AND p.StockQuantity >= oi.Quantity
+OPTION (FORCE ORDER, LOOP JOIN)
+""", sqlite="""
+UPDATE Products
+SET StockQuantity = StockQuantity - (
+    SELECT oi.Quantity FROM OrderItems oi WHERE oi.OrderID = ?1 AND oi.ProductSKU = Products.ProductSKU)
+WHERE ProductSKU IN (
+    SELECT oi.ProductSKU FROM OrderItems oi WHERE oi.OrderID = ?1 AND oi.Quantity <= Products.StockQuantity)
+""")
+
+SHORT_FOR_ORDER = """
+SELECT p.ProductSKU, p.ProductName, p.StockQuantity, oi.Quantity
+FROM OrderItems oi
+INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+WHERE oi.OrderID = ? AND (p.StockQuantity IS NULL OR p.StockQuantity < oi.Quantity)
+"""
+
+RESERVE_ONE = """
+UPDATE Products
+SET StockQuantity = StockQuantity - ?
+WHERE ProductSKU = ? AND StockQuantity >= ?
+"""
+
+# Cancelled orders give their stock back: one UPDATE per batch of orders,
+# with the quantities summed per product first.
+RELEASE_ORDERS = variant("""
+UPDATE p
+SET p.StockQuantity = p.StockQuantity + r.Quantity
+FROM Products p
+INNER JOIN (
+    SELECT ProductSKU, SUM(Quantity) AS Quantity
+    FROM OrderItems
+    WHERE OrderID IN (SELECT CAST([value] AS BIGINT) FROM OPENJSON(?))
+    GROUP BY ProductSKU
+) r ON r.ProductSKU = p.ProductSKU
+""", sqlite="""
+UPDATE Products
+SET StockQuantity = StockQuantity + (
+    SELECT SUM(oi.Quantity) FROM OrderItems oi
+    WHERE oi.ProductSKU = Products.ProductSKU AND oi.OrderID IN (SELECT value FROM json_each(?1)))
+WHERE ProductSKU IN (
+    SELECT oi.ProductSKU FROM OrderItems oi WHERE oi.OrderID IN (SELECT value FROM json_each(?1)))
+""")
+
+STOCK_OF = "SELECT ProductName, StockQuantity FROM Products WHERE ProductSKU = ?"
+
+# SQLSTATE 40001 is what SQL Server reports for a deadlock victim (error 1205).
+RETRYABLE_SQLSTATES = {"40001"}
+
+# SQLite reports lock conflicts that outlast its busy timeout by message only.
+RETRYABLE_MESSAGES = ("deadlock", "database is locked")
+
+
+class OutOfStockError(Exception):
+    """Raised when at least one product cannot cover the requested quantity.
+
+    ``shortages`` holds (ProductSKU, ProductName, available, requested) tuples.
+    """
+
+    def __init__(self, shortages):
+        self.shortages = list(shortages)
+        details = ", ".join(f"{name} ({available or 0} left, {requested} requested)"
+                            for _, name, available, requested in self.shortages)
+        super().__init__(f"Not enough stock for: {details}")
+
+
+class ReservationStats:
+    """Process-wide counters for the reservation engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.attempts = 0
+            self.reserved = 0
+            self.conflicts = 0
+            self.deadlocks = 0
+            self.retries = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "reserved": self.reserved,
+                "conflicts": self.conflicts,
+                "deadlocks": self.deadlocks,
+                "retries": self.retries,
+            }
+
+
+reservation_stats = ReservationStats()
+
+
+def is_retryable(error):
+    """True for deadlock-victim and lock-timeout errors that are safe to retry from the start."""
+    state = error.args[0] if getattr(error, "args", None) else None
+    message = str(error).lower()
+    return state in RETRYABLE_SQLSTATES or any(text in message for text in RETRYABLE_MESSAGES)
+
+
+class StockRepository(Repository):
+    def __init__(self, pool=None, max_retries=5, backoff=0.02):
+        super().__init__(pool)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def run(self, work):
+        """Run ``work(conn)`` in a transaction, retrying it when chosen as deadlock victim."""
+        for attempt in range(self.max_retries + 1):
+            reservation_stats.add(attempts=1)
+            try:
+                with self.transaction() as conn:
+                    return work(conn)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                reservation_stats.add(deadlocks=1, retries=1)
+                time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def reserve_order(self, order_id, line_count, conn):
+        """Take stock for every line of an order, or raise OutOfStockError."""
+        if self._execute(RESERVE_ORDER, (order_id,), conn) != line_count:
+            reservation_stats.add(conflicts=1)
+            raise OutOfStockError(self._fetchall(SHORT_FOR_ORDER, (order_id,), conn))
+        reservation_stats.add(reserved=line_count)
+
+    def reserve(self, lines, conn):
+        """Take stock for (ProductSKU, Quantity) lines, locking SKUs in ascending order."""
+        for sku, quantity in sorted(lines):
+            if self._execute(RESERVE_ONE, (quantity, sku, quantity), conn) != 1:
+                reservation_stats.add(conflicts=1)
+                row = self._fetchone(STOCK_OF, (sku,), conn)
+                name, available = (row[0], row[1]) if row else (str(sku), 0)
+                raise OutOfStockError([(sku, name, available, quantity)])
+        reservation_stats.add(reserved=len(lines))
+
+    def release_orders(self, order_ids, conn):
+        """Return the stock of every line of ``order_ids``; return how many products changed."""
+        return self._execute(RELEASE_ORDERS, (json.dumps(list(order_ids)),), conn)
@@ -0,0 +1,85 @@
+"""Export the query metrics of a center and read them back for the admin.
+
+Every center calls :func:`start_metrics_export` from main(), which writes
+shared.instrumentation's counters to metrics/<center>.prom every
+``TRICOMMERCE_METRICS_INTERVAL_MS`` (15 s by default) and once more on
+exit. The admin Diagnostics window lists its own process live and the
+other centers from those files.
+"""
+import glob
+import os
+
+from PyQt6.QtCore import QTimer
+
+from shared.instrumentation import METRICS_DIR, parse_prometheus, query_stats, write_prometheus
+from shared.pool import get_pool
+
+EXPORT_INTERVAL_MS = int(os.environ.get("TRICOMMERCE_METRICS_INTERVAL_MS", "15000"))
+
+STATEMENT_COLUMNS = ["Statement", "Calls", "p50 ms", "p95 ms", "Max ms", "Rows", "Errors", "SQL"]
+ACTION_COLUMNS = ["Action", "Runs", "Avg ms", "Round-trips/run", "Statements/run", "Rows/run"]
+
+
+def metrics_path(process):
+    return os.path.join(METRICS_DIR, f"{process}.prom")
+
+
+def start_metrics_export(app, process, interval_ms=EXPORT_INTERVAL_MS):
+    """Write this process's metrics to metrics/<process>.prom periodically and on exit."""
+    path = metrics_path(process)
+
+    def export():
+        try:
+            write_prometheus(path, pool=get_pool(), process=process)
+        except OSError as e:
+            print(f"Could not write {path}: {e}")
+
+    timer = QTimer(app)
+    timer.timeout.connect(export)
+    timer.start(interval_ms)
+    app.aboutToQuit.connect(export)
+    return timer
+
+
+def exported_processes(exclude=None):
+    """Names of the centers that wrote a metrics file, except ``exclude``."""
+    names = (os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(METRICS_DIR, "*.prom")))
+    return sorted(name for name in names if name != exclude)
+
+
+def load_report(process=None):
+    """This process's report (``process`` None) or the one another center last exported."""
+    if process is None:
+        return query_stats.report()
+    with open(metrics_path(process), encoding="utf-8") as f:
+        return parse_prometheus(f.read())
+
+
+def statement_rows(report):
+    """Rows for STATEMENT_COLUMNS, slowest total time first."""
+    statements = sorted(report["statements"], key=lambda s: s["latency"].sum, reverse=True)
+    return [
+        (s["fingerprint"], s["latency"].count,
+         f"{s['latency'].quantile(0.5) * 1000:.1f}", f"{s['latency'].quantile(0.95) * 1000:.1f}",
+         f"{s['latency'].max * 1000:.1f}", s["rows"], s["errors"], s["sql"])
+        for s in statements
+    ]
+
+
+def action_rows(report):
+    """Rows for ACTION_COLUMNS, most round-trips per run first."""
+    rows = []
+    for a in report["actions"]:
+        runs = a["count"] or 1
+        rows.append((a["name"], a["count"], f"{a['seconds'] / runs * 1000:.1f}",
+                     f"{a['round_trips'] / runs:.1f}", f"{a['statements'] / runs:.1f}", f"{a['rows'] / runs:.0f}"))
+    rows.sort(key=lambda row: float(row[3]), reverse=True)
+    return rows
+
+
+def summary(report):
+    acquire = report["acquire"]
+    totals = report["totals"]
+    return (f"{totals['statements']} statements, {totals['rows']} rows, "
+            f"{totals['slow_queries']} slow; connection acquire p95 "
+            f"{acquire.quantile(0.95) * 1000:.1f} ms over {acquire.count}")
@@ -0,0 +1,84 @@
+"""Run a shared.exports export from a window, with a progress dialog and a Stop button.
+
+The export runs on the window's QueryRunner; progress reaches the dialog
+through a queued signal, and Stop sets the event the export checks
+between batches.
+"""
+import os
+import threading
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from shared.exports import BATCH_SIZE, export
+
+FILTERS = {
+    "CSV (*.csv)": ".csv",
+    "Parquet (*.parquet)": ".parquet",
+    "Arrow (*.arrow)": ".arrow",
+}
+
+
+class ExportRunner(QObject):
+    """One export at a time for ``parent``, started with :meth:`start`."""
+
+    progress = pyqtSignal(float, str)
+
+    def __init__(self, parent, queries):
+        super().__init__(parent)
+        self._parent = parent
+        self._queries = queries
+        self._dialog = None
+        self._button = None
+        self.progress.connect(self._show_progress)
+
+    def start(self, dataset, default_name, seller_id=None, status=None, button=None):
+        """Ask for a file, then export ``dataset`` to it in the background."""
+        path, chosen = QFileDialog.getSaveFileName(
+            self._parent, "Export", default_name + ".csv", ";;".join(FILTERS)
+        )
+        if not path:
+            return
+        if os.path.splitext(path)[1].lower() not in FILTERS.values():
+            path += FILTERS.get(chosen, ".csv")
+
+        stop = threading.Event()
+        self._dialog = QProgressDialog(f"Exporting {dataset}...", "Stop", 0, 100, self._parent)
+        self._dialog.setWindowTitle("Export")
+        self._dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.setMinimumDuration(0)
+        self._dialog.canceled.connect(stop.set)
+        self._button = button
+        if button is not None:
+            button.setEnabled(False)
+
+        signal = self.progress
+        self._queries.submit(
+            export, dataset, path, seller_id, status, BATCH_SIZE,
+            lambda p: signal.emit(p.fraction(), f"{p.written:,} of {p.total:,} rows"), stop,
+            on_result=self._finished,
+            on_error=self._failed,
+        )
+
+    def _show_progress(self, fraction, text):
+        if self._dialog is not None:
+            self._dialog.setValue(int(fraction * 100))
+            self._dialog.setLabelText(text)
+
+    def _close(self):
+        if self._dialog is not None:
+            self._dialog.close()
+            self._dialog = None
+        if self._button is not None:
+            self._button.setEnabled(True)
+            self._button = None
+
+    def _finished(self, result):
+        self._close()
+        QMessageBox.information(self._parent, "Export", f"{result.summary()}.")
+
+    def _failed(self, error):
+        self._close()
+        QMessageBox.critical(self._parent, "Export Failed", f"The export failed: {error}")
@@ -0,0 +1,226 @@
+"""Stream orders, products and finances to CSV, Parquet or Arrow files.
+
+Rows come from shared.dao.exports with fetchmany, ``batch_size`` at a
+time, and each batch is written before the next one is read, so an export
+of millions of rows holds one batch (plus one Parquet row group) in
+memory. The file is written under a ``.part`` name and renamed when it is
+complete, so a stopped or failed export never leaves a truncated file
+behind. The format follows the file extension: .csv, .parquet, or .arrow
+(.feather) for the Arrow IPC file format.
+
+Parquet and Arrow need the optional ``pyarrow`` package; CSV does not.
+"""
+import csv
+import os
+from datetime import date
+from decimal import Decimal
+
+from shared.dao.exports import ExportRepository
+from shared.refdata import get_reference_data
+
+BATCH_SIZE = 5000
+
+# Parquet row groups much smaller than this compress and scan poorly.
+ROW_GROUP_ROWS = 100_000
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+# dataset -> [(column, type)]; the types are what the Parquet/Arrow schema uses.
+DATASETS = {
+    "orders": [("OrderID", "int64"), ("OrderDate", "date"), ("Status", "string"), ("CustomerID", "int64"),
+               ("ProductSKU", "int64"), ("SellerID", "int64"), ("Quantity", "int32"),
+               ("UnitPrice", "decimal"), ("LineTotal", "decimal")],
+    "products": [("ProductSKU", "int64"), ("SellerID", "int64"), ("ProductName", "string"),
+                 ("Category", "string"), ("Description", "string"), ("Price", "decimal"),
+                 ("StockQuantity", "int32"), ("Status", "string"), ("PublishDate", "date")],
+    "finances": [("TransactionID", "int64"), ("MonthOfPayment", "string"), ("SellerID", "int64"),
+                 ("PaymentDate", "date"), ("Status", "string"), ("Amount", "decimal")],
+}
+
+CENTS = Decimal("0.01")
+
+
+class ExportProgress:
+    """Counters of one export, handed to the progress callback after every batch."""
+
+    def __init__(self, path, total):
+        self.path = path
+        self.total = total
+        self.written = 0
+        self.cancelled = False
+
+    def fraction(self):
+        return min(self.written / self.total, 1.0) if self.total else 1.0
+
+    def summary(self):
+        if self.cancelled:
+            return f"Export stopped after {self.written:,} of {self.total:,} rows"
+        return f"{self.written:,} of {self.total:,} rows written to {os.path.basename(self.path)}"
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"{path}: expected one of {', '.join(FORMATS)}")
+    return FORMATS[extension]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registers pyarrow.parquet)
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow exports need the pyarrow package (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _cents(value):
+    # SQLite hands back decimals as floats; write them as the two-place values they are.
+    return None if value is None else Decimal(str(value)).quantize(CENTS)
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow([name for name, _ in columns])
+        self._decimals = [i for i, (_, kind) in enumerate(columns) if kind == "decimal"]
+
+    def write(self, rows):
+        if self._decimals:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for i in self._decimals:
+                    row[i] = _cents(row[i])
+        self._csv.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+    """Arrow IPC file (``parquet=False``) or Parquet file, one record batch per call."""
+
+    def __init__(self, path, columns, parquet):
+        pa = self._pa = _pyarrow()
+        types = {"int64": pa.int64(), "int32": pa.int32(), "string": pa.string(),
+                 "date": pa.date32(), "decimal": pa.decimal128(18, 2)}
+        self._kinds = [kind for _, kind in columns]
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._parquet = parquet
+        self._pending = []
+        self._pending_rows = 0
+        if parquet:
+            self._writer = pa.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    @staticmethod
+    def _convert(kind, value):
+        if kind == "decimal":
+            return _cents(value)
+        if kind == "date" and value is not None and not isinstance(value, date):
+            # SQLite hands back dates as text.
+            return date.fromisoformat(str(value)[:10])
+        return value
+
+    def write(self, rows):
+        arrays = [self._pa.array([self._convert(kind, row[i]) for row in rows], type=field.type)
+                  for i, (kind, field) in enumerate(zip(self._kinds, self._schema))]
+        batch = self._pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        if not self._parquet:
+            self._writer.write_batch(batch)
+            return
+        self._pending.append(batch)
+        self._pending_rows += len(rows)
+        if self._pending_rows >= ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.write_table(self._pa.Table.from_batches(self._pending, schema=self._schema))
+            self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        if self._parquet:
+            self._flush()
+            self._writer.close()
+        else:
+            self._writer.close()
+            self._sink.close()
+
+
+def _writer(path, fmt, columns):
+    if fmt == "csv":
+        return _CsvWriter(path, columns)
+    return _ArrowWriter(path, columns, parquet=fmt == "parquet")
+
+
+def _source(repository, dataset, seller_id, status, batch_size):
+    """Return (total rows, batch generator, row transform) for a dataset."""
+    if dataset == "orders":
+        statuses = get_reference_data()
+        status_id = None if status is None else statuses.status_id(status)
+        if status is not None and status_id is None:
+            raise ValueError(f"unknown order status {status!r}")
+        titles = {}
+
+        def titled(row):
+            # StatusID -> title, as in the order screens
+            status_title = titles.get(row[2])
+            if status_title is None:
+                status_title = titles[row[2]] = statuses.status_title(row[2])
+            return (row[0], row[1], status_title, *row[3:])
+
+        return (repository.count_order_lines(seller_id, status_id),
+                repository.order_lines(seller_id, status_id, batch_size), titled)
+    if status is not None:
+        raise ValueError(f"{dataset} exports cannot be filtered by order status")
+    if dataset == "products":
+        return repository.count_products(seller_id), repository.products(seller_id, batch_size), tuple
+    if dataset == "finances":
+        return repository.count_finances(seller_id), repository.finances(seller_id, batch_size), tuple
+    raise ValueError(f"unknown export {dataset!r}; use one of {', '.join(DATASETS)}")
+
+
+def export(dataset, path, seller_id=None, status=None, batch_size=BATCH_SIZE, progress=None, stop=None,
+           repository=None):
+    """Write ``dataset`` ("orders", "products" or "finances") to ``path`` and return the ExportProgress.
+
+    ``seller_id`` limits the export to one seller, ``status`` limits orders to
+    one status. ``progress(ExportProgress)`` is called after every batch and
+    ``stop`` (a threading.Event) is checked between batches; a stopped export
+    deletes its partial file.
+    """
+    fmt = file_format(path)
+    total, batches, transform = _source(repository or ExportRepository(), dataset, seller_id, status, batch_size)
+    result = ExportProgress(path, total)
+    partial = path + ".part"
+    writer = None
+    try:
+        writer = _writer(partial, fmt, DATASETS[dataset])
+        for batch in batches:
+            writer.write([transform(row) for row in batch])
+            result.written += len(batch)
+            if progress is not None:
+                progress(result)
+            if stop is not None and stop.is_set():
+                result.cancelled = True
+                break
+        writer.close()
+        writer = None
+        if result.cancelled:
+            os.remove(partial)
+        else:
+            os.replace(partial, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        # Returns the connection to the pool when the export stopped early.
+        batches.close()
+    return result
@@ -0,0 +1,84 @@
+"""Load the Qt Designer forms of the centers.
+
+``tools/build_ui.py`` compiles every .ui file into a Python module under
+compiled_ui/. Building a window from the compiled module is plain Python,
+so it skips the XML parsing and reflection that ``uic.loadUi`` repeats on
+every construction. A form that was never compiled, or whose .ui file
+changed after the last build, falls back to ``loadUi``.
+
+``TRICOMMERCE_COMPILED_UI=0`` always uses ``loadUi``, to compare the two
+(see tools/ui_timing.py).
+
+Form names are matched case-insensitively, as on Windows where the
+centers were written ("cart.ui" opens Cart.ui).
+"""
+import importlib.util
+import os
+import re
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILED_DIR = os.path.join(ROOT, "compiled_ui")
+USE_COMPILED = os.environ.get("TRICOMMERCE_COMPILED_UI", "1") != "0"
+
+_forms = {}  # .ui path -> Ui_* class, or None to use loadUi
+_forms_lock = threading.Lock()
+
+
+def _slug(name):
+    return re.sub(r"\W+", "_", name).strip("_").lower()
+
+
+def module_name(ui_path):
+    """Name of the compiled module for ``ui_path``, e.g. admin_handle__manage_orders."""
+    center = os.path.basename(os.path.dirname(os.path.abspath(ui_path)))
+    return f"{_slug(center)}__{_slug(os.path.splitext(os.path.basename(ui_path))[0])}"
+
+
+def compiled_path(ui_path):
+    return os.path.join(COMPILED_DIR, module_name(ui_path) + ".py")
+
+
+def resolve(directory, name):
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return path
+    for candidate in os.listdir(directory):
+        if candidate.lower() == name.lower():
+            return os.path.join(directory, candidate)
+    raise FileNotFoundError(path)
+
+
+def _compiled_form(ui_path):
+    if not USE_COMPILED:
+        return None
+    compiled = compiled_path(ui_path)
+    try:
+        if os.path.getmtime(compiled) < os.path.getmtime(ui_path):
+            return None  # stale: the form was edited after the last build
+    except OSError:
+        return None
+    spec = importlib.util.spec_from_file_location(module_name(ui_path), compiled)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return next(value for name, value in vars(module).items() if name.startswith("Ui_"))
+
+
+def load_form(widget, directory, name):
+    """Build form ``name`` from ``directory`` onto ``widget``, like ``loadUi(name, widget)``."""
+    ui_path = resolve(directory, name)
+    with _forms_lock:
+        if ui_path not in _forms:
+            _forms[ui_path] = _compiled_form(ui_path)
+        form = _forms[ui_path]
+
+    if form is None:
+        from PyQt6.uic import loadUi
+        loadUi(ui_path, widget)
+        return
+
+    ui = form()
+    ui.setupUi(widget)
+    # loadUi exposes the child widgets as attributes of the window; do the same.
+    for attribute, value in vars(ui).items():
+        setattr(widget, attribute, value)
@@ -0,0 +1,434 @@
+"""Timings and counters for every statement the repositories run.
+
+Each call through shared.dao.base.Repository is recorded in ``query_stats``:
+
+* per statement (keyed by a short fingerprint of its T-SQL text): a latency
+  histogram, the rows it returned, its executions and errors;
+* per UI action: how many statements, round-trips and rows one action
+  cost. QueryRunner jobs run as an action named after their channel or
+  function; ``with query_stats.action("name"):`` labels anything else;
+* the time spent borrowing a connection from the pool.
+
+Statements slower than ``TRICOMMERCE_SLOW_QUERY_MS`` (250 by default) are
+written to the "tricommerce.slow_queries" logger, with their parameters
+reduced to type and length so no customer data ends up in the log. Unless
+the application configured that logger itself, it goes to
+logs/slow_queries.log.
+
+``prometheus_text()`` renders everything in the Prometheus text format;
+the centers write it to metrics/<center>.prom every few seconds (see
+shared.diagnostics), where node_exporter's textfile collector can pick it
+up and the admin Diagnostics window can read it.
+"""
+import bisect
+import hashlib
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS_DIR = os.environ.get("TRICOMMERCE_METRICS_DIR", os.path.join(ROOT, "metrics"))
+SLOW_QUERY_LOG = os.environ.get("TRICOMMERCE_SLOW_QUERY_LOG", os.path.join(ROOT, "logs", "slow_queries.log"))
+SLOW_QUERY_SECONDS = float(os.environ.get("TRICOMMERCE_SLOW_QUERY_MS", "250")) / 1000
+
+# Upper bounds in seconds; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_query_log = logging.getLogger("tricommerce.slow_queries")
+
+
+class Histogram:
+    """Counts of observations per latency bucket, plus their sum and maximum."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (the maximum for the last one)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def copy(self):
+        other = Histogram()
+        other.counts = list(self.counts)
+        other.count, other.sum, other.max = self.count, self.sum, self.max
+        return other
+
+
+class StatementStats:
+    __slots__ = ("fingerprint", "sql", "latency", "rows", "errors", "round_trips")
+
+    def __init__(self, fingerprint, sql):
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors = 0
+        self.round_trips = 0
+
+
+class ActionStats:
+    __slots__ = ("name", "count", "statements", "round_trips", "rows", "seconds")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.statements = 0
+        self.round_trips = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+
+def normalize(sql):
+    """``sql`` on one line with runs of whitespace collapsed."""
+    return " ".join(sql.split())
+
+
+def fingerprint(sql):
+    """Short stable id of a statement, the same on every backend and process."""
+    return hashlib.sha1(normalize(sql).encode("utf-8")).hexdigest()[:10]
+
+
+def redact(params):
+    """Describe parameters by type (and length for text) without their values."""
+    if isinstance(params, dict):
+        return {key: _redact_value(value) for key, value in params.items()}
+    return tuple(_redact_value(value) for value in params)
+
+
+def _redact_value(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class QueryStats:
+    """Process-wide record of what the repositories sent to the database.
+
+    ``statements`` counts executed statements (each row of an executemany
+    batch is one), ``round_trips`` counts requests to the server (a batch
+    sent with fast_executemany is one) and ``rows`` counts rows fetched.
+    """
+
+    def __init__(self, slow_threshold=SLOW_QUERY_SECONDS):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # the action running on this thread
+        self.slow_threshold = slow_threshold
+        self.statements = 0
+        self.round_trips = 0
+        self.rows = 0
+        self.slow_queries = 0
+        self._statements = {}  # fingerprint -> StatementStats
+        self._fingerprints = {}  # sql text -> fingerprint
+        self._actions = {}  # name -> ActionStats
+        self.acquire = Histogram()
+
+    def record(self, statements=1, round_trips=1, rows=0, sql=None, seconds=None, params=(), error=False):
+        """Count one call; with ``sql`` and ``seconds`` also time it against its statement."""
+        stats = None
+        with self._lock:
+            self.statements += statements
+            self.round_trips += round_trips
+            self.rows += rows
+            if sql is not None:
+                key = self._fingerprints.get(sql)
+                if key is None:
+                    key = self._fingerprints[sql] = fingerprint(sql)
+                stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = StatementStats(key, normalize(sql))
+                stats.rows += rows
+                stats.round_trips += round_trips
+                stats.errors += error
+                if seconds is not None:
+                    stats.latency.observe(seconds)
+
+        action = getattr(self._local, "action", None)
+        if action is not None:
+            action[1] += statements
+            action[2] += round_trips
+            action[3] += rows
+
+        if seconds is not None and seconds >= self.slow_threshold:
+            with self._lock:
+                self.slow_queries += 1
+            _log_slow_query(stats, sql, seconds, rows, params, action[0] if action else None)
+
+    @contextmanager
+    def timed(self, sql, params=(), statements=1, round_trips=1):
+        """Time the block as one execution of ``sql``; set ``probe["rows"]`` inside it."""
+        probe = {"rows": 0}
+        started = time.perf_counter()
+        try:
+            yield probe
+        except BaseException:
+            self.record(statements, round_trips, probe["rows"], sql, time.perf_counter() - started,
+                        params, error=True)
+            raise
+        self.record(statements, round_trips, probe["rows"], sql, time.perf_counter() - started, params)
+
+    @contextmanager
+    def action(self, name):
+        """Attribute the statements run on this thread inside the block to action ``name``."""
+        outer = getattr(self._local, "action", None)
+        current = self._local.action = [name, 0, 0, 0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self._local.action = outer
+            if outer is not None:
+                for i in (1, 2, 3):
+                    outer[i] += current[i]
+            with self._lock:
+                stats = self._actions.get(name)
+                if stats is None:
+                    stats = self._actions[name] = ActionStats(name)
+                stats.count += 1
+                stats.statements += current[1]
+                stats.round_trips += current[2]
+                stats.rows += current[3]
+                stats.seconds += seconds
+
+    def record_acquire(self, seconds):
+        with self._lock:
+            self.acquire.observe(seconds)
+
+    def snapshot(self):
+        """Return the counters as a dict, e.g. to diff before and after an action."""
+        with self._lock:
+            return {"statements": self.statements, "round_trips": self.round_trips, "rows": self.rows}
+
+    def report(self):
+        """Copy of everything recorded, in the shape parse_prometheus() returns."""
+        with self._lock:
+            return {
+                "statements": [
+                    {"fingerprint": s.fingerprint, "sql": s.sql, "latency": s.latency.copy(),
+                     "rows": s.rows, "errors": s.errors, "round_trips": s.round_trips}
+                    for s in self._statements.values()
+                ],
+                "actions": [
+                    {"name": a.name, "count": a.count, "statements": a.statements,
+                     "round_trips": a.round_trips, "rows": a.rows, "seconds": a.seconds}
+                    for a in self._actions.values()
+                ],
+                "acquire": self.acquire.copy(),
+                "totals": {"statements": self.statements, "round_trips": self.round_trips,
+                           "rows": self.rows, "slow_queries": self.slow_queries},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.statements = self.round_trips = self.rows = self.slow_queries = 0
+            self._statements.clear()
+            self._actions.clear()
+            self.acquire = Histogram()
+
+
+query_stats = QueryStats()
+
+
+def _log_slow_query(stats, sql, seconds, rows, params, action):
+    if not slow_query_log.handlers and not logging.getLogger().handlers:
+        _add_file_handler()
+    slow_query_log.warning(
+        "%.1f ms, %d rows, statement %s%s: %s params=%s",
+        seconds * 1000, rows, stats.fingerprint if stats else "?",
+        f" in {action}" if action else "", stats.sql if stats else normalize(sql or ""), redact(params))
+
+
+_handler_lock = threading.Lock()
+
+
+def _add_file_handler():
+    with _handler_lock:
+        if slow_query_log.handlers:
+            return
+        os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=5 * 1024 * 1024,
+                                                       backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(message)s"))
+        slow_query_log.addHandler(handler)
+        slow_query_log.setLevel(logging.WARNING)
+
+
+# Prometheus text format
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _histogram_lines(name, labels, histogram):
+    prefix = f"{labels}," if labels else ""
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        seen += count
+        yield f'{name}_bucket{{{prefix}le="{bound}"}} {seen}'
+    yield f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}'
+    braces = f"{{{labels}}}" if labels else ""
+    yield f"{name}_sum{braces} {histogram.sum:.6f}"
+    yield f"{name}_count{braces} {histogram.count}"
+
+
+def prometheus_text(stats=None, pool=None, process=None):
+    """Render ``stats`` (and the pool's counters) in the Prometheus text exposition format."""
+    report = (stats or query_stats).report()
+    lines = []
+
+    def header(name, kind, text):
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    header("tricommerce_statement_info", "gauge", "T-SQL text of each statement fingerprint.")
+    for s in report["statements"]:
+        lines.append(f'tricommerce_statement_info{{statement="{s["fingerprint"]}",sql="{_label(s["sql"])}"}} 1')
+    header("tricommerce_query_duration_seconds", "histogram", "Time to execute a statement and fetch its rows.")
+    for s in report["statements"]:
+        lines.extend(_histogram_lines("tricommerce_query_duration_seconds",
+                                      f'statement="{s["fingerprint"]}"', s["latency"]))
+    for name, field, kind, text in (
+            ("tricommerce_query_duration_max_seconds", "max", "gauge", "Slowest execution of a statement."),
+            ("tricommerce_query_rows_total", "rows", "counter", "Rows returned by a statement."),
+            ("tricommerce_query_round_trips_total", "round_trips", "counter", "Requests sent for a statement."),
+            ("tricommerce_query_errors_total", "errors", "counter", "Executions of a statement that raised.")):
+        header(name, kind, text)
+        for s in report["statements"]:
+            value = s["latency"].max if field == "max" else s[field]
+            lines.append(f'{name}{{statement="{s["fingerprint"]}"}} {value}')
+
+    for name, field, text in (
+            ("tricommerce_actions_total", "count", "UI actions run."),
+            ("tricommerce_action_statements_total", "statements", "Statements run by a UI action."),
+            ("tricommerce_action_round_trips_total", "round_trips", "Round-trips made by a UI action."),
+            ("tricommerce_action_rows_total", "rows", "Rows fetched by a UI action."),
+            ("tricommerce_action_seconds_total", "seconds", "Time spent in a UI action.")):
+        header(name, "counter", text)
+        for a in report["actions"]:
+            lines.append(f'{name}{{action="{_label(a["name"])}"}} {a[field]}')
+
+    header("tricommerce_connection_acquire_seconds", "histogram", "Time to borrow a pooled connection.")
+    lines.extend(_histogram_lines("tricommerce_connection_acquire_seconds", "", report["acquire"]))
+    header("tricommerce_connection_acquire_max_seconds", "gauge", "Longest wait for a pooled connection.")
+    lines.append(f'tricommerce_connection_acquire_max_seconds {report["acquire"].max}')
+    header("tricommerce_slow_queries_total", "counter", "Statements slower than the slow query threshold.")
+    lines.append(f'tricommerce_slow_queries_total {report["totals"]["slow_queries"]}')
+    if pool is not None:
+        header("tricommerce_pool", "gauge", "Connection pool counters (see ConnectionPool.stats).")
+        for key, value in pool.stats().items():
+            lines.append(f'tricommerce_pool{{counter="{key}"}} {value}')
+    if process is not None:
+        header("tricommerce_exported_timestamp_seconds", "gauge", "When this file was written.")
+        lines.append(f'tricommerce_exported_timestamp_seconds{{process="{_label(process)}"}} {time.time():.0f}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, stats=None, pool=None, process=None):
+    """Write prometheus_text() to ``path`` atomically, as the textfile collector expects."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(stats, pool, process))
+    os.replace(temporary, path)
+
+
+_SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+def parse_prometheus(text):
+    """Read a file written by write_prometheus() back into the shape of QueryStats.report()."""
+    statements, actions, acquire = {}, {}, Histogram()
+    totals = {"statements": 0, "round_trips": 0, "rows": 0, "slow_queries": 0}
+    buckets = {}  # statement fingerprint (or None for acquire) -> cumulative counts
+
+    def statement(key):
+        if key not in statements:
+            statements[key] = {"fingerprint": key, "sql": "", "latency": Histogram(),
+                               "rows": 0, "errors": 0, "round_trips": 0}
+        return statements[key]
+
+    def action(name):
+        if name not in actions:
+            actions[name] = {"name": name, "count": 0, "statements": 0, "round_trips": 0, "rows": 0, "seconds": 0.0}
+        return actions[name]
+
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.group(1), dict(_LABEL.findall(match.group(2) or "")), float(match.group(3))
+        labels = {key: _unescape(label) for key, label in labels.items()}
+        key = labels.get("statement")
+        if name == "tricommerce_statement_info":
+            statement(key)["sql"] = labels.get("sql", "")
+        elif name.endswith("_bucket"):
+            if labels.get("le") != "+Inf":
+                buckets.setdefault(key, []).append(int(value))
+        elif name in ("tricommerce_query_duration_seconds_sum", "tricommerce_query_duration_seconds_count"):
+            histogram = statement(key)["latency"]
+            if name.endswith("_sum"):
+                histogram.sum = value
+            else:
+                histogram.count = int(value)
+        elif name == "tricommerce_query_duration_max_seconds":
+            statement(key)["latency"].max = value
+        elif name.startswith("tricommerce_query_") and name.endswith("_total"):
+            field = name[len("tricommerce_query_"):-len("_total")]
+            statement(key)[field] = int(value)
+        elif name.startswith("tricommerce_action"):
+            field = {"tricommerce_actions_total": "count"}.get(
+                name, name[len("tricommerce_action_"):-len("_total")])
+            action(labels.get("action"))[field] = value if field == "seconds" else int(value)
+        elif name == "tricommerce_connection_acquire_seconds_sum":
+            acquire.sum = value
+        elif name == "tricommerce_connection_acquire_seconds_count":
+            acquire.count = int(value)
+        elif name == "tricommerce_connection_acquire_max_seconds":
+            acquire.max = value
+        elif name == "tricommerce_slow_queries_total":
+            totals["slow_queries"] = int(value)
+
+    for key, cumulative in buckets.items():
+        histogram = acquire if key is None else statement(key)["latency"]
+        previous = 0
+        for i, count in enumerate(cumulative[:len(LATENCY_BUCKETS)]):
+            histogram.counts[i] = count - previous
+            previous = count
+        histogram.counts[-1] = histogram.count - previous
+    for s in statements.values():
+        totals["statements"] += s["latency"].count
+        totals["round_trips"] += s["round_trips"]
+        totals["rows"] += s["rows"]
+    return {"statements": list(statements.values()), "actions": list(actions.values()),
+            "acquire": acquire, "totals": totals}
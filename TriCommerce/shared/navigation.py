@@ -0,0 +1,74 @@
+"""One window at a time, with every window built once and then reused.
+
+The centers used to build a fresh window on each navigation (a new
+dashboard for every "Home" click) and keep the old one alive through an
+attribute of the window they left. The navigator keeps one window per
+class and constructor arguments instead; going back to a window shows the
+existing one and calls its ``reopen()`` method, if it has one, so it can
+reload data that may have changed meanwhile.
+
+With ``TRICOMMERCE_UI_TIMING=1`` every navigation is printed with its
+duration, and the first one also with the time since this module was
+imported, which the centers do right after importing PyQt.
+"""
+import os
+import threading
+import time
+
+_imported_at = time.perf_counter()
+
+
+class Navigator:
+    def __init__(self, report=None):
+        self._windows = {}  # (window class, args) -> window
+        self._current = None
+        self.report = os.environ.get("TRICOMMERCE_UI_TIMING") == "1" if report is None else report
+        self.timings = []  # (window class name, seconds, built)
+
+    def show(self, window_class, *args):
+        """Hide the current window and show ``window_class(*args)``, building it only once."""
+        started = time.perf_counter()
+        key = (window_class, args)
+        window = self._windows.get(key)
+        built = window is None
+        if built:
+            window = self._windows[key] = window_class(*args)
+        elif hasattr(window, "reopen"):
+            window.reopen()
+
+        if self._current is not None and self._current is not window:
+            self._current.hide()
+        self._current = window
+        window.show()
+        self._record(window_class.__name__, time.perf_counter() - started, built)
+        return window
+
+    def forget(self, window_class=None):
+        """Drop cached windows (of one class, or all), e.g. after logging out."""
+        for key in list(self._windows):
+            if window_class is None or key[0] is window_class:
+                window = self._windows.pop(key)
+                if window is not self._current:
+                    window.deleteLater()
+
+    def _record(self, name, seconds, built):
+        first = not self.timings
+        self.timings.append((name, seconds, built))
+        if self.report:
+            line = f"navigation {name}: {seconds * 1000:.1f} ms ({'built' if built else 'reused'})"
+            if first:
+                line += f", first window {(time.perf_counter() - _imported_at) * 1000:.1f} ms after startup"
+            print(line)
+
+
+_navigator = None
+_navigator_lock = threading.Lock()
+
+
+def get_navigator():
+    """Return the process-wide navigator."""
+    global _navigator
+    with _navigator_lock:
+        if _navigator is None:
+            _navigator = Navigator()
+        return _navigator
@@ -0,0 +1,69 @@
+"""Monthly seller payouts into the Finances table.
+
+A seller's payout for a month is the value of the delivered lines of the
+month's orders (by OrderDate), less the PlatformCommission percentage of
+each line's category. The database computes and writes every seller's
+payout with one INSERT ... SELECT (shared.dao.finances.SETTLE), so the
+month's order lines are read once and none of them crosses the wire.
+
+Each seller is paid once per month: sellers that already have a Finances
+row for the month are skipped, so an interrupted or repeated run can simply
+be started again. Lines delivered after their month was settled are not
+paid later, so settle a month once its orders have been delivered; the
+result reports how many of them were still open.
+"""
+from datetime import date, datetime
+
+from shared.dao.finances import FinanceRepository
+from shared.refdata import get_reference_data
+
+
+class PayoutResult:
+    """What one settlement of a month wrote."""
+
+    def __init__(self, month):
+        self.month = month
+        self.paid = 0
+        self.amount = 0
+        self.already_paid = 0
+        self.open_orders = 0
+
+    def add(self, amounts):
+        self.paid += len(amounts)
+        self.amount += sum(amounts)
+
+    def summary(self):
+        text = f"{self.month}: paid {self.paid:,} sellers {self.amount:,.2f}"
+        if self.already_paid:
+            text += f", {self.already_paid:,} already paid"
+        return text
+
+
+def month_bounds(month):
+    """('YYYY-MM-01', first day of the next month) for a 'YYYY-MM' month."""
+    start = datetime.strptime(month, "%Y-%m").date()
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def settle_month(month, payment_date=None, repository=None, reference=None):
+    """Write the Finances payouts of ``month`` ('YYYY-MM') and return a PayoutResult.
+
+    ``payment_date`` defaults to today. Months that are not over yet are
+    refused, because their late orders could never be paid.
+    """
+    start, end = month_bounds(month)
+    if end > date.today():
+        raise ValueError(f"{month} is not over yet")
+    payment_date = (payment_date or date.today()).isoformat()
+    repository = repository or FinanceRepository()
+    reference = reference or get_reference_data()
+    delivered_id = reference.status_id("Delivered")
+    window = (start.isoformat(), end.isoformat())
+
+    result = PayoutResult(month)
+    result.already_paid = repository.settled(month)[0]
+    result.open_orders = repository.open_orders(
+        (reference.status_id("Pending"), reference.status_id("Shipped")), *window)
+    result.add(repository.settle(month, *window, payment_date, delivered_id))
+    return result
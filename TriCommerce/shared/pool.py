@@ -0,0 +1,247 @@
+"""Thread-safe database connection pool shared by the three centers.
+
+Opening a pyodbc connection costs a TCP handshake plus a full TDS login, so
+instead of connecting on every button click the centers borrow an already
+logged-in connection from here and hand it back when they call close().
+Connections come from the configured backend (see shared.backends).
+"""
+import threading
+import time
+from collections import deque
+
+from shared.backends import get_backend
+from shared.instrumentation import query_stats
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the acquire timeout."""
+
+
+class PooledConnection:
+    """A borrowed connection. close() returns it to the pool instead of logging out."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"connection already returned to the pool ({name})")
+        return getattr(raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    @property
+    def state(self):
+        """Per-connection scratch space that lives as long as the physical connection."""
+        return self._pool.state(self._raw)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def discard(self):
+        """Drop the underlying connection instead of reusing it (e.g. after a network error)."""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._raw is not None:
+            if exc_type is None:
+                self._raw.commit()
+            else:
+                self._raw.rollback()
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """Bounded pool of connections created by ``connect()``.
+
+    Idle connections are reused newest-first, checked with a cheap query when
+    they have been idle longer than ``check_after`` seconds, and closed once
+    idle longer than ``idle_timeout`` seconds. ``backend`` is the
+    shared.backends object the connections belong to; the repositories use
+    it to translate statements and open transactions.
+    """
+
+    def __init__(self, connect, max_size=8, idle_timeout=300.0, acquire_timeout=10.0,
+                 check_after=30.0, health_query="SELECT 1", backend=None):
+        self._connect = connect
+        self.backend = backend
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.check_after = check_after
+        self.health_query = health_query
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw connection, time it was returned)
+        self._in_use = 0
+        self._closed = False
+        self._state = {}  # id(raw connection) -> dict
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.evictions = 0
+        self.failed_checks = 0
+
+    def connection(self, timeout=None):
+        """Borrow a connection wrapped so that close() releases it."""
+        started = time.perf_counter()
+        raw = self.acquire(timeout)
+        # Includes waiting for a free slot, the health check and connecting.
+        query_stats.record_acquire(time.perf_counter() - started)
+        return PooledConnection(self, raw)
+
+    def acquire(self, timeout=None):
+        """Borrow a raw connection; pair every call with release()."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        wait_started = None
+        raw = None
+        returned_at = None
+        stale = []
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("connection pool is closed")
+                stale.extend(self._evict_idle_locked())
+                if self._idle:
+                    raw, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.wait_time += time.monotonic() - wait_started
+                    raise PoolTimeout(f"no database connection free after {timeout:.1f}s")
+                self._cond.wait(remaining)
+            if wait_started is not None:
+                self.wait_time += time.monotonic() - wait_started
+        self._close_quietly(stale)
+
+        if raw is not None:
+            if time.monotonic() - returned_at < self.check_after or self._is_healthy(raw):
+                with self._cond:
+                    self.hits += 1
+                return raw
+            with self._cond:
+                self.failed_checks += 1
+            self._close_quietly([raw])
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.misses += 1
+        return raw
+
+    def release(self, raw, discard=False):
+        """Return a connection borrowed with acquire()."""
+        if not discard:
+            try:
+                # Never hand the next borrower someone else's open transaction.
+                raw.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                stale = [raw]
+            else:
+                self._idle.append((raw, time.monotonic()))
+                stale = self._evict_idle_locked()
+            self._cond.notify()
+        self._close_quietly(stale)
+
+    def state(self, raw):
+        with self._cond:
+            return self._state.setdefault(id(raw), {})
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._in_use + len(self._idle),
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "evictions": self.evictions,
+                "failed_checks": self.failed_checks,
+            }
+
+    def close(self):
+        """Close every idle connection; borrowed ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            stale = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_quietly(stale)
+
+    def _evict_idle_locked(self):
+        stale = []
+        cutoff = time.monotonic() - self.idle_timeout
+        # Oldest connections sit on the left because reuse pops from the right.
+        while self._idle and self._idle[0][1] < cutoff:
+            stale.append(self._idle.popleft()[0])
+            self.evictions += 1
+        return stale
+
+    def _is_healthy(self, raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute(self.health_query)
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, connections):
+        for raw in connections:
+            with self._cond:
+                self._state.pop(id(raw), None)
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            backend = get_backend()
+            _pool = ConnectionPool(backend.connect, health_query=backend.health_query, backend=backend)
+        return _pool
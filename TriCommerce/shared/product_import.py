@@ -0,0 +1,264 @@
+"""Bulk product import from CSV or JSON files.
+
+The file is read as a stream: CSV row by row, JSON Lines line by line and a
+JSON array object by object, so memory use does not grow with the file.
+Each record is checked on its own against the cached reference data (see
+shared.refdata), so an unknown category or a bad price rejects that row
+only. Valid rows are inserted ``batch_size`` at a time with one
+executemany per batch (fast_executemany on SQL Server), each batch in its
+own transaction; rows of committed batches stay if a later batch fails or
+the import is stopped.
+
+Columns are ProductName, Category, Description, Price, StockQuantity and
+ProductImage; ProductName, Category, Price and StockQuantity are required.
+Header names are matched ignoring case, spaces and underscores. Imported
+products start as Pending, like products added through the form.
+"""
+import codecs
+import csv
+import json
+import os
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from shared.dao.products import ProductRepository
+from shared.refdata import get_reference_data
+
+BATCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+# Only the first errors are kept on the result; pass on_error to see them all.
+MAX_KEPT_ERRORS = 1000
+
+COLUMNS = ("ProductName", "Category", "Description", "Price", "StockQuantity", "ProductImage")
+REQUIRED = ("ProductName", "Category", "Price", "StockQuantity")
+
+ALIASES = {"name": "ProductName", "categoryname": "Category", "stock": "StockQuantity", "image": "ProductImage"}
+
+# Column sizes from ProjDatabase.sql.
+MAX_NAME = 100
+MAX_IMAGE = 100
+MAX_PRICE = Decimal("99999999.99")
+MAX_STOCK = 2 ** 31 - 1
+
+
+class ImportProgress:
+    """Counters of one import, handed to the progress callback after every batch.
+
+    ``errors`` holds (row, message) pairs, ``row`` being the line number for
+    CSV and JSON Lines and the position in the array for JSON.
+    """
+
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.read = 0
+        self.loaded = 0
+        self.rejected = 0
+        self.errors = []
+        self.cancelled = False
+
+    def fraction(self):
+        return min(self.bytes_read / self.total_bytes, 1.0) if self.total_bytes else 1.0
+
+    def summary(self):
+        text = f"{self.loaded:,} of {self.read:,} products imported, {self.rejected:,} rejected"
+        return text + (" (stopped)" if self.cancelled else "")
+
+    def _reject(self, row, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_KEPT_ERRORS:
+            self.errors.append((row, message))
+
+
+def _canonical(name):
+    key = (name or "").replace(" ", "").replace("_", "").lower()
+    for column in COLUMNS:
+        if column.lower() == key:
+            return column
+    return ALIASES.get(key, name)
+
+
+def _chunks(f, progress):
+    """Decoded text chunks of a binary file, counting the bytes read."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        data = f.read(CHUNK_BYTES)
+        progress.bytes_read += len(data)
+        if not data:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(data)
+
+
+def _lines(f, progress):
+    """Decoded lines of a binary file, counting the bytes read."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line in f:
+        progress.bytes_read += len(line)
+        yield decoder.decode(line)
+
+
+def _csv_records(f, progress):
+    reader = csv.reader(_lines(f, progress))
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [_canonical(name) for name in header]
+    for values in reader:
+        if any(value.strip() for value in values):
+            yield reader.line_num, dict(zip(header, values))
+
+
+def _json_lines(f, progress):
+    for number, line in enumerate(_lines(f, progress), 1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+
+def _json_array(chunks):
+    """Objects of a top-level JSON array, decoded one at a time."""
+    decoder = json.JSONDecoder()
+    buffer, position, number = "", 0, 0
+    started = False
+    exhausted = False
+    while True:
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","
+                                          or (not started and buffer[position] == "[")):
+            started = started or buffer[position] == "["
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        if position < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if exhausted:
+                    raise ValueError(f"record {number + 1}: invalid JSON") from None
+            else:
+                # A number at the very end of the buffer may continue in the next chunk.
+                if end < len(buffer) or exhausted:
+                    number += 1
+                    yield number, value
+                    buffer, position = buffer[end:], 0
+                    continue
+        elif exhausted:
+            raise ValueError("the JSON array is not closed")
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def _json_records(f, progress):
+    head = f.read(CHUNK_BYTES).lstrip(codecs.BOM_UTF8).lstrip()
+    f.seek(0)
+    if head.startswith(b"["):
+        return _json_array(_chunks(f, progress))
+    return _json_lines(f, progress)
+
+
+def records(f, kind, progress):
+    """Yield (row, record) from an open binary file; ``kind`` is "csv" or "json"."""
+    if kind == "csv":
+        return _csv_records(f, progress)
+    return _json_records(f, progress)
+
+
+def file_kind(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".json", ".jsonl", ".ndjson"):
+        return "json"
+    raise ValueError(f"{path}: expected a .csv, .json or .jsonl file")
+
+
+def validate(record, seller_id, today, reference=None):
+    """Return the Products insert parameters for ``record``, or raise ValueError."""
+    if isinstance(record, Exception):
+        raise ValueError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with product fields")
+    record = {_canonical(key): value for key, value in record.items()}
+    values = {column: ("" if record.get(column) is None else str(record.get(column)).strip()) for column in COLUMNS}
+
+    missing = [column for column in REQUIRED if not values[column]]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    name = values["ProductName"]
+    if len(name) > MAX_NAME:
+        raise ValueError(f"ProductName is longer than {MAX_NAME} characters")
+    category_id = (reference or get_reference_data()).category_id(values["Category"])
+    if category_id is None:
+        raise ValueError(f"unknown category {values['Category']!r}")
+    try:
+        price = Decimal(values["Price"]).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Price {values['Price']!r} is not a number") from None
+    if not price.is_finite():
+        # NaN survives quantize() but cannot be compared with the range below.
+        raise ValueError(f"Price {values['Price']!r} is not a number")
+    if not Decimal(0) <= price <= MAX_PRICE:
+        raise ValueError(f"Price {values['Price']} is out of range")
+    try:
+        stock = int(values["StockQuantity"])
+    except ValueError:
+        raise ValueError(f"StockQuantity {values['StockQuantity']!r} is not a whole number") from None
+    if not 0 <= stock <= MAX_STOCK:
+        raise ValueError(f"StockQuantity {stock} is out of range")
+    image = values["ProductImage"] or None
+    if image and len(image) > MAX_IMAGE:
+        raise ValueError(f"ProductImage is longer than {MAX_IMAGE} characters")
+    return (seller_id, name, category_id, values["Description"] or None, price, stock, image, "Pending", today)
+
+
+def import_products(path, seller_id, batch_size=BATCH_SIZE, progress=None, on_error=None, stop=None,
+                    repository=None, reference=None):
+    """Import the products in ``path`` for ``seller_id`` and return the final ImportProgress.
+
+    ``progress(ImportProgress)`` is called after every batch, ``on_error(row,
+    message)`` for every rejected row, and ``stop`` (a threading.Event) is
+    checked between batches.
+    """
+    repository = repository or ProductRepository()
+    reference = reference or get_reference_data()
+    kind = file_kind(path)
+    today = date.today()
+    result = ImportProgress(os.path.getsize(path))
+    batch = []
+
+    def flush():
+        repository.add_many(batch)
+        result.loaded += len(batch)
+        batch.clear()
+
+    with open(path, "rb") as f:
+        for row, record in records(f, kind, result):
+            result.read += 1
+            try:
+                batch.append(validate(record, seller_id, today, reference))
+            except ValueError as e:
+                result._reject(row, str(e))
+                if on_error is not None:
+                    on_error(row, str(e))
+            if len(batch) >= batch_size:
+                flush()
+            if result.read % batch_size == 0:
+                if progress is not None:
+                    progress(result)
+                if stop is not None and stop.is_set():
+                    result.cancelled = True
+                    break
+        if batch:
+            flush()
+    if progress is not None:
+        progress(result)
+    return result
@@ -0,0 +1,101 @@
+"""In-memory copy of the reference tables (Cities, Banks, Categories, Status).
+
+The tables are read once, normally at startup, and then served from memory
+so combo boxes and status lookups cost no database round-trips. The copy is
+reloaded when it is older than ``ttl`` seconds or when refresh() is called.
+"""
+import threading
+import time
+
+from shared.dao.reference import ReferenceRepository
+
+
+class ReferenceData:
+    def __init__(self, repository=None, ttl=3600.0):
+        self._repository = repository
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._listeners = []
+
+        self._cities = []
+        self._banks = []
+        self._categories = []
+        self._category_ids = {}
+        self._commissions = {}
+        self._status_ids = {}
+        self._status_titles = {}
+
+    def refresh(self):
+        """Reload every table now and notify on_refresh listeners."""
+        repository = self._repository or ReferenceRepository()
+        tables = repository.load_all()
+        with self._lock:
+            self._cities = [name for _, name in tables["cities"]]
+            self._banks = [name for _, name in tables["banks"]]
+            self._categories = [name for _, name, _ in tables["categories"]]
+            self._category_ids = {name: category_id for category_id, name, _ in tables["categories"]}
+            self._commissions = {category_id: commission for category_id, _, commission in tables["categories"]}
+            self._status_ids = {title: status_id for status_id, title in tables["statuses"]}
+            self._status_titles = {status_id: title for status_id, title in tables["statuses"]}
+            self._loaded_at = time.monotonic()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def invalidate(self):
+        """Force a reload on next access."""
+        with self._lock:
+            self._loaded_at = None
+
+    def on_refresh(self, listener):
+        """Call ``listener()`` after every reload, e.g. to repopulate an open combo box."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _ensure_loaded(self):
+        with self._lock:
+            fresh = self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+        if not fresh:
+            self.refresh()
+
+    def city_names(self):
+        self._ensure_loaded()
+        return list(self._cities)
+
+    def bank_names(self):
+        self._ensure_loaded()
+        return list(self._banks)
+
+    def category_names(self):
+        self._ensure_loaded()
+        return list(self._categories)
+
+    def category_id(self, category_name):
+        self._ensure_loaded()
+        return self._category_ids.get(category_name)
+
+    def platform_commission(self, category_id):
+        self._ensure_loaded()
+        return self._commissions.get(category_id)
+
+    def status_id(self, status_title):
+        self._ensure_loaded()
+        return self._status_ids.get(status_title)
+
+    def status_title(self, status_id):
+        self._ensure_loaded()
+        return self._status_titles.get(status_id)
+
+
+_reference_data = None
+_reference_lock = threading.Lock()
+
+
+def get_reference_data():
+    """Return the process-wide reference data, creating it on first use."""
+    global _reference_data
+    with _reference_lock:
+        if _reference_data is None:
+            _reference_data = ReferenceData()
+        return _reference_data
@@ -0,0 +1,258 @@
+"""Product search for the customer center.
+
+Two engines answer the same ``search``/``suggest`` calls:
+
+* ProductSearchIndex, an in-process inverted index over the names and
+  descriptions of active products. It loads the catalogue once and then
+  pulls only products changed since its last sync (Products.RowVer,
+  migration 002), so products sellers add show up once they are approved
+  without a reload. Lookups never touch the database.
+* FullTextSearch, which sends the query to SQL Server Full-Text Search
+  (CONTAINSTABLE) where migration 002 could create a full-text index.
+
+get_product_search() picks the full-text engine when the server has the
+index and falls back to the in-process one otherwise.
+
+Every query token matches as a prefix, so "blu sh" finds "Blue Shirt";
+results must match all tokens and are ranked by tf-idf with hits in the
+product name weighted above hits in the description.
+"""
+import bisect
+import math
+import re
+import threading
+import time
+
+from shared.dao.products import ProductRepository
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN.findall((text or "").lower())
+
+
+def contains_condition(query):
+    """Turn a search box query into a CONTAINS prefix condition, or None if it has no words."""
+    tokens = tokenize(query)
+    return " AND ".join(f'"{token}*"' for token in tokens) or None
+
+
+def _passes(price, stock, min_price, max_price, in_stock):
+    if min_price is not None and (price is None or price < min_price):
+        return False
+    if max_price is not None and (price is None or price > max_price):
+        return False
+    return not in_stock or (stock or 0) > 0
+
+
+class ProductSearchIndex:
+    """Inverted index of active products, kept current with incremental syncs."""
+
+    NAME_WEIGHT = 3.0
+    PREFIX_WEIGHT = 0.7  # a prefix hit counts less than the whole word
+    MAX_EXPANSIONS = 64  # words a short prefix may expand to
+    SYNC_BATCH = 5000
+
+    def __init__(self, repository=None, max_age=30.0):
+        self._repository = repository
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._synced_at = None
+        self._version = 0
+
+        self._docs = {}  # sku -> (name, category_id, price, stock, terms)
+        self._postings = {}  # term -> {sku: (hits in name, hits in description)}
+        self._terms = []  # sorted keys of _postings, for prefix lookups
+        self._by_category = {}  # category_id -> {sku, ...}
+
+    def sync(self):
+        """Apply every product change since the last sync; return how many were applied."""
+        repository = self._repository or ProductRepository()
+        applied = 0
+        while True:
+            with self._lock:
+                version = self._version
+            rows = repository.changed_since(version, self.SYNC_BATCH)
+            with self._lock:
+                for sku, name, description, category_id, price, stock, status, row_version in rows:
+                    if status == "Active":
+                        self._put(sku, name, description, category_id, price, stock)
+                    else:
+                        self._drop(sku)
+                    self._version = max(self._version, row_version)
+                applied += len(rows)
+                if len(rows) < self.SYNC_BATCH:
+                    self._synced_at = time.monotonic()
+                    return applied
+
+    def invalidate(self):
+        """Sync again before the next lookup (e.g. right after a product was added)."""
+        with self._lock:
+            self._synced_at = None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            fresh = self._synced_at is not None and time.monotonic() - self._synced_at < self.max_age
+        if not fresh:
+            self.sync()
+
+    def _put(self, sku, name, description, category_id, price, stock):
+        self._drop(sku)
+        counts = {}
+        for term in tokenize(name):
+            in_name, in_description = counts.get(term, (0, 0))
+            counts[term] = (in_name + 1, in_description)
+        for term in tokenize(description):
+            in_name, in_description = counts.get(term, (0, 0))
+            counts[term] = (in_name, in_description + 1)
+        for term, hits in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[sku] = hits
+        self._docs[sku] = (name, category_id, price, stock, tuple(counts))
+        self._by_category.setdefault(category_id, set()).add(sku)
+
+    def _drop(self, sku):
+        doc = self._docs.pop(sku, None)
+        if doc is None:
+            return
+        for term in doc[4]:
+            postings = self._postings[term]
+            del postings[sku]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._by_category[doc[1]].discard(sku)
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self._terms, token)
+        found = []
+        for term in self._terms[start:start + self.MAX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            found.append(term)
+        return found
+
+    def _token_scores(self, token, names_only):
+        """Return {sku: score} for one query token over all its prefix expansions."""
+        total = len(self._docs)
+        scores = {}
+        for term in self._expand(token):
+            postings = self._postings[term]
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            weight = 1.0 if term == token else self.PREFIX_WEIGHT
+            for sku, (in_name, in_description) in postings.items():
+                hits = self.NAME_WEIGHT * in_name + (0 if names_only else in_description)
+                if hits:
+                    score = weight * idf * hits / (hits + 1.2)
+                    if score > scores.get(sku, 0):
+                        scores[sku] = score
+        return scores
+
+    def search(self, query, category_id=None, min_price=None, max_price=None, in_stock=False, limit=50,
+               names_only=False):
+        """Return (ProductSKU, ProductName, Price, StockQuantity, score) rows, best match first.
+
+        An empty query lists every product passing the filters by name.
+        """
+        self._ensure_fresh()
+        tokens = tokenize(query)
+        with self._lock:
+            if tokens:
+                per_token = sorted((self._token_scores(token, names_only) for token in set(tokens)), key=len)
+                scores = dict(per_token[0])
+                for other in per_token[1:]:
+                    scores = {sku: score + other[sku] for sku, score in scores.items() if sku in other}
+            else:
+                skus = self._by_category.get(category_id, ()) if category_id is not None else self._docs
+                scores = dict.fromkeys(skus, 0.0)
+
+            results = []
+            for sku, score in scores.items():
+                name, doc_category, price, stock, _ = self._docs[sku]
+                if category_id is not None and doc_category != category_id:
+                    continue
+                if _passes(price, stock, min_price, max_price, in_stock):
+                    results.append((sku, name, price, stock, score))
+        results.sort(key=lambda row: (-row[4], row[1] or ""))
+        return results[:limit]
+
+    def suggest(self, text, limit=8):
+        """Typeahead: product names whose words start with what was typed so far."""
+        if not tokenize(text):
+            return []
+        names = []
+        for _, name, _, _, _ in self.search(text, limit=limit * 2, names_only=True):
+            if name not in names:
+                names.append(name)
+        return names[:limit]
+
+    def __len__(self):
+        return len(self._docs)
+
+
+class FullTextSearch:
+    """The same interface answered by SQL Server Full-Text Search."""
+
+    def __init__(self, repository=None):
+        self._repository = repository
+
+    def search(self, query, category_id=None, min_price=None, max_price=None, in_stock=False, limit=50):
+        repository = self._repository or ProductRepository()
+        condition = contains_condition(query)
+        if condition is None:
+            rows = repository.active_in_category(category_id) if category_id is not None else []
+            return [(sku, name, price, stock, 0.0) for sku, name, price, stock in rows
+                    if _passes(price, stock, min_price, max_price, in_stock)][:limit]
+        rows = repository.fulltext_search(condition, category_id, min_price, max_price, in_stock, limit)
+        return [tuple(row) for row in rows]
+
+    def suggest(self, text, limit=8):
+        if contains_condition(text) is None:
+            return []
+        names = []
+        for _, name, _, _, _ in self.search(text, limit=limit * 2):
+            if name not in names:
+                names.append(name)
+        return names[:limit]
+
+    def invalidate(self):
+        """Nothing to do: the full-text index tracks changes on the server."""
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def get_product_search():
+    """Return the process-wide search engine, choosing it on first use."""
+    global _search
+    with _search_lock:
+        if _search is None:
+            repository = ProductRepository()
+            try:
+                fulltext = repository._backend.name == "sqlserver" and repository.has_fulltext_index()
+            except Exception:
+                fulltext = False
+            _search = FullTextSearch(repository) if fulltext else ProductSearchIndex(repository)
+        return _search
+
+
+def notify_products_changed():
+    """Tell an already created search engine that products changed in this process."""
+    with _search_lock:
+        search = _search
+    if search is not None:
+        search.invalidate()
+
+
+def search_products(query, category_id=None, min_price=None, max_price=None, in_stock=False, limit=50):
+    """Module-level entry point, so QueryRunner can coalesce identical searches."""
+    return get_product_search().search(query, category_id, min_price, max_price, in_stock, limit)
+
+
+def suggest_products(text, limit=8):
+    return get_product_search().suggest(text, limit)
@@ -0,0 +1,73 @@
+"""The signed-in customer of the Customer Center.
+
+Signing in returns the customer's CustomerID together with the profile
+fields the windows show, in one query. The session is handed to every
+window after login, so cart and checkout statements key on the integer
+CustomerID instead of joining Customers on the email address. Saving the
+account form calls invalidate(); the profile is then read again the next
+time a window asks for it.
+
+The session also owns the customer's in-memory cart (see shared.cart).
+"""
+import threading
+
+from shared.cart import CartBuffer
+from shared.dao.customers import CustomerRepository
+
+
+class CustomerSession:
+    def __init__(self, customer_id, email, first_name, last_name, city, delivery_address, repository=None):
+        self.customer_id = customer_id
+        self._repository = repository
+        self._lock = threading.Lock()
+        self._profile = (email, first_name, last_name, city, delivery_address)
+        self.cart = CartBuffer(customer_id)
+
+    @classmethod
+    def sign_in(cls, email, password, repository=None):
+        """Return the session of the customer with these credentials, or None."""
+        row = (repository or CustomerRepository()).sign_in(email, password)
+        return cls(*row, repository=repository) if row else None
+
+    def refresh(self):
+        """Read the profile again now and return it as (email, first name, last name, city, address)."""
+        row = (self._repository or CustomerRepository()).session_profile(self.customer_id)
+        if row is None:
+            raise LookupError(f"customer {self.customer_id} no longer exists")
+        profile = tuple(row)
+        with self._lock:
+            self._profile = profile
+        return profile
+
+    def invalidate(self):
+        """Force a reload on next access, e.g. after the customer edited the account."""
+        with self._lock:
+            self._profile = None
+
+    def profile(self):
+        """Return (email, first name, last name, city, address), reading it only if invalidated."""
+        with self._lock:
+            profile = self._profile
+        if profile is None:
+            profile = self.refresh()
+        return profile
+
+    @property
+    def email(self):
+        return self.profile()[0]
+
+    @property
+    def first_name(self):
+        return self.profile()[1]
+
+    @property
+    def last_name(self):
+        return self.profile()[2]
+
+    @property
+    def city(self):
+        return self.profile()[3]
+
+    @property
+    def delivery_address(self):
+        return self.profile()[4]
@@ -0,0 +1,233 @@
+"""Read-only table model for the admin and seller grids.
+
+Rows are kept as plain tuples and only formatted when the view paints a
+cell, so a grid costs one tuple per row instead of one QTableWidgetItem per
+cell. Rows reach the view in batches through canFetchMore/fetchMore as the
+user scrolls, so opening a screen only lays out the first batch. With
+:meth:`RowTableModel.set_pages` each batch is a keyset page requested from
+the database only when the view scrolls near the end of what it has.
+
+When a model has a ``key_column`` it keeps an index from key to row
+positions, so a mutation can hand back the rows it changed and the grid
+patches just those rows instead of reloading.
+"""
+from itertools import islice
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtWidgets import QAbstractItemView
+
+
+def _batches(rows):
+    """Return a ``fetch(limit)`` callable that walks an already loaded result."""
+    remaining = iter(rows)
+    return lambda limit: [tuple(row) for row in islice(remaining, limit)]
+
+
+class RowTableModel(QAbstractTableModel):
+    """``columns`` picks which row positions are shown under ``headers``
+    (default: the first ``len(headers)``), so rows may carry extra values
+    such as a status or a hidden key.
+    """
+
+    def __init__(self, headers, parent=None, batch_size=256, key_column=None, columns=None):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self._headers = list(headers)
+        self._columns = list(columns) if columns is not None else list(range(len(self._headers)))
+        self._key_column = key_column
+        self._index = {}  # key -> [row position, ...]
+        self._rows = []
+        self._source = None  # fetch(limit) -> rows; None once exhausted
+        self._pages = None  # request(cursor, limit, deliver, fail) for paged loading
+        self._cursor = None
+        self._loading = False
+        self._generation = 0
+
+    def set_rows(self, rows):
+        """Show a query result, handing it to the view one batch at a time."""
+        self.set_source(_batches(rows))
+
+    def set_source(self, fetch):
+        """Replace the contents with rows pulled from ``fetch(limit)`` on demand.
+
+        A batch shorter than ``limit`` marks the source as exhausted.
+        """
+        self._reset(source=fetch)
+
+    def set_pages(self, request):
+        """Load rows page by page as the view needs them.
+
+        ``request(cursor, limit, deliver, fail)`` must start fetching the page
+        after ``cursor`` (None for the first page) and later call ``deliver``
+        with a Page, or ``fail`` with the error if the query failed, typically
+        from QueryRunner callbacks. After a failure the next fetchMore (e.g. the
+        next scroll) asks for the same page again.
+        """
+        self._reset(pages=request)
+        self.fetchMore()
+
+    def clear(self):
+        self._reset()
+
+    def _reset(self, source=None, pages=None):
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = []
+        self._index = {}
+        self._source = source
+        self._pages = pages
+        self._cursor = None
+        self._loading = False
+        self.endResetModel()
+
+    def _deliver_page(self, generation, page):
+        if generation != self._generation:
+            return  # the model was reset while this page was loading
+        self._loading = False
+        self._cursor = page.next_cursor
+        if page.next_cursor is None:
+            self._pages = None
+        self._append(page.rows)
+
+    def _fail_page(self, generation, error):
+        if generation == self._generation:
+            self._loading = False
+
+    def row(self, position):
+        """Return the raw values of a row as a tuple."""
+        return self._rows[position]
+
+    def remove_row(self, position):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self.endRemoveRows()
+        self._reindex()
+
+    def positions(self, key):
+        """Return the positions of the rows with ``key`` (needs a key_column)."""
+        return self._index.get(key, [])
+
+    def update_rows(self, rows):
+        """Replace the loaded rows that share a key with one of ``rows``."""
+        last_column = len(self._headers) - 1
+        for row in rows:
+            row = tuple(row)
+            for position in self.positions(row[self._key_column]):
+                self._rows[position] = row
+                self.dataChanged.emit(self.index(position, 0), self.index(position, last_column))
+
+    def remove_key(self, key):
+        """Drop every loaded row with ``key``."""
+        self.remove_keys([key])
+
+    def remove_keys(self, keys):
+        """Drop every loaded row with one of ``keys``, reindexing once.
+
+        Adjacent rows are removed as one range, so removing the lines of
+        many orders does not notify the view row by row.
+        """
+        positions = sorted({position for key in keys for position in self.positions(key)}, reverse=True)
+        if not positions:
+            return
+        runs = []
+        for position in positions:
+            if runs and runs[-1][0] == position + 1:
+                runs[-1][0] = position
+            else:
+                runs.append([position, position])
+        for first, last in runs:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+        self._reindex()
+
+    def apply(self, rows, keep):
+        """Patch the grid with rows a mutation changed.
+
+        Rows for which ``keep(row)`` is false no longer belong in this
+        listing (e.g. their status changed) and are removed; the rest are
+        updated in place.
+        """
+        for row in rows:
+            if keep(row):
+                self.update_rows([row])
+            else:
+                self.remove_key(row[self._key_column])
+
+    def _reindex(self):
+        self._index = {}
+        if self._key_column is not None:
+            for position, row in enumerate(self._rows):
+                self._index.setdefault(row[self._key_column], []).append(position)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][self._columns[index.column()]]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(value)
+        if role == Qt.ItemDataRole.UserRole:
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._source is not None or (self._pages is not None and not self._loading)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        if self._pages is not None:
+            self._loading = True
+            generation = self._generation
+            self._pages(self._cursor, self.batch_size, lambda page: self._deliver_page(generation, page),
+                        lambda error: self._fail_page(generation, error))
+            return
+        batch = self._source(self.batch_size)
+        if len(batch) < self.batch_size:
+            self._source = None
+        self._append(batch)
+
+    def _append(self, batch):
+        if batch:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+            self._rows.extend(batch)
+            if self._key_column is not None:
+                for position, row in enumerate(batch, first):
+                    self._index.setdefault(row[self._key_column], []).append(position)
+            self.endInsertRows()
+
+
+def attach_model(view, headers, key_column=None, columns=None):
+    """Give ``view`` a RowTableModel with ``headers`` and whole-row selection."""
+    model = RowTableModel(headers, view, key_column=key_column, columns=columns)
+    view.setModel(model)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+    return model
+
+
+def selected_row(view):
+    """Return the position of the selected row in ``view``, or -1."""
+    rows = view.selectionModel().selectedRows()
+    return rows[0].row() if rows else -1
+
+
+def selected_rows(view):
+    """Return the positions of every selected row in ``view``, in order."""
+    return sorted(index.row() for index in view.selectionModel().selectedRows())
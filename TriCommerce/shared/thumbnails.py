@@ -0,0 +1,164 @@
+"""Product image thumbnails.
+
+Thumbnails are generated once, when a seller adds a product, and kept in
+an on-disk cache addressed by the SHA-256 of the source image, so the same
+picture uploaded twice is stored once and an edited file gets new
+thumbnails. Decoding uses QImageReader with a scaled size, which lets the
+JPEG decoder skip most of the full-size work.
+
+Everything here works on QImage and may run on a worker thread
+(QueryRunner). QPixmap belongs to the GUI thread: turn the result into a
+pixmap with :func:`cached_pixmap` / :func:`cache_pixmap`, which keep
+recently shown thumbnails in QPixmapCache, bounded by PIXMAP_CACHE_KB.
+
+The cache directory is ``TRICOMMERCE_THUMBNAIL_DIR`` (default
+``TriCommerce/thumbnails``).
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THUMBNAIL_DIR = os.environ.get("TRICOMMERCE_THUMBNAIL_DIR", os.path.join(ROOT, "thumbnails"))
+
+# Bounding boxes per use; "@2x" versions are for high-DPI screens.
+SIZES = {
+    "page": QSize(171, 151),  # ProductPage.imageLabel
+    "page@2x": QSize(342, 302),
+}
+
+PIXMAP_CACHE_KB = 32 * 1024
+
+# (path, mtime, size) -> digest, so an unchanged file is hashed once per process.
+_digests = OrderedDict()
+_digests_lock = threading.Lock()
+_DIGEST_ENTRIES = 4096
+
+
+def _digest_key(image_path):
+    stat = os.stat(image_path)
+    return os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size
+
+
+def known_digest(image_path):
+    """The digest of ``image_path`` if it was hashed since it last changed, else None.
+
+    Only stats the file, so it is cheap enough for the GUI thread.
+    """
+    try:
+        key = _digest_key(image_path)
+    except OSError:
+        return None
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+        return digest
+
+
+def source_digest(image_path):
+    digest = known_digest(image_path)
+    if digest is not None:
+        return digest
+    key = _digest_key(image_path)
+
+    sha = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _digests_lock:
+        _digests[key] = digest
+        if len(_digests) > _DIGEST_ENTRIES:
+            _digests.popitem(last=False)
+    return digest
+
+
+def thumbnail_path(digest, size_name):
+    size = SIZES[size_name]
+    return os.path.join(THUMBNAIL_DIR, digest[:2], f"{digest}-{size.width()}x{size.height()}.png")
+
+
+def _decode(image_path, box):
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    full = reader.size()
+    if full.isValid() and (full.width() > box.width() or full.height() > box.height()):
+        reader.setScaledSize(full.scaled(box, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"cannot read image {image_path}: {reader.errorString()}")
+    if image.width() > box.width() or image.height() > box.height():
+        # Formats without scaled decoding still come back full size.
+        image = image.scaled(box, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+def _store(image, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write under a temporary name so a reader never sees half a file.
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if not image.save(partial, "PNG"):
+        raise OSError(f"cannot write thumbnail {path}")
+    os.replace(partial, path)
+
+
+def generate_thumbnails(image_path):
+    """Create every missing thumbnail size for ``image_path`` and return its digest."""
+    digest = source_digest(image_path)
+    for size_name, box in SIZES.items():
+        path = thumbnail_path(digest, size_name)
+        if not os.path.exists(path):
+            _store(_decode(image_path, box), path)
+    return digest
+
+
+def load_thumbnail(image_path, size_name="page"):
+    """Return the ``size_name`` thumbnail of ``image_path`` as a QImage.
+
+    Images added before the cache existed get their thumbnails generated
+    on first use.
+    """
+    path = thumbnail_path(source_digest(image_path), size_name)
+    image = QImage(path)
+    if image.isNull():
+        generate_thumbnails(image_path)
+        image = QImage(path)
+    return image
+
+
+def pixmap_key(digest, size_name):
+    # Same addressing as the disk cache: one entry per picture, however many
+    # products share it, and an edited file never finds its old pixmap.
+    return f"thumbnail:{os.path.basename(thumbnail_path(digest, size_name))}"
+
+
+def cached_pixmap(image_path, size_name):
+    """Return the QPixmap shown last time for this image, or None (GUI thread)."""
+    digest = known_digest(image_path)
+    if digest is None:
+        return None
+    return QPixmapCache.find(pixmap_key(digest, size_name))
+
+
+def cache_pixmap(image_path, size_name, image):
+    """Turn a loaded thumbnail into a QPixmap and remember it (GUI thread).
+
+    Call it with the result of :func:`load_thumbnail`, which has already
+    hashed the file.
+    """
+    pixmap = QPixmap.fromImage(image)
+    digest = known_digest(image_path)
+    if digest is not None:
+        QPixmapCache.insert(pixmap_key(digest, size_name), pixmap)
+    return pixmap
+
+
+def configure_pixmap_cache(limit_kb=PIXMAP_CACHE_KB):
+    """Bound the in-memory pixmap cache; QPixmapCache evicts least recently used first."""
+    QPixmapCache.setCacheLimit(limit_kb)
@@ -0,0 +1,112 @@
+"""Run database calls on QThreadPool so windows never block the Qt event loop.
+
+Results come back on the GUI thread through a queued signal. Requests can be
+tagged with a channel (e.g. "products"): submitting again on the same channel
+makes earlier requests stale, so their results are dropped and, if they have
+not started yet, they are taken off the thread pool. Identical requests that
+are already running are coalesced into one database call.
+
+Each call runs as a shared.instrumentation action named after the function
+(e.g. "OrderRepository.page_by_status"), so the Diagnostics window shows
+what one screen load costs in statements and round-trips.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from shared.instrumentation import query_stats
+
+
+class _Job(QRunnable):
+    def __init__(self, runner, key, fn, args):
+        super().__init__()
+        # The runner keeps the Python reference until the result is delivered.
+        self.setAutoDelete(False)
+        self._runner = runner
+        self._key = key
+        self._fn = fn
+        self._args = args
+
+    def run(self):
+        try:
+            with query_stats.action(getattr(self._fn, "__qualname__", type(self._fn).__name__)):
+                result, error = self._fn(*self._args), None
+        except Exception as e:
+            result, error = None, e
+        self._runner._done.emit(self._key, result, error)
+
+
+class QueryRunner(QObject):
+    """Submits calls to a thread pool and delivers their results to callbacks.
+
+    Calls are coalesced by function and arguments, so bound methods of two
+    repository instances count as the same request; pass everything the call
+    depends on as arguments.
+    """
+
+    _done = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None, thread_pool=None):
+        super().__init__(parent)
+        self._thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._in_flight = {}  # key -> (job, [waiter, ...])
+        self._generations = {}  # channel -> generation of its newest request
+        self._done.connect(self._deliver)
+
+    def submit(self, fn, *args, on_result, on_error=None, channel=None):
+        """Run ``fn(*args)`` off the GUI thread and pass its result to ``on_result``."""
+        generation = None
+        if channel is not None:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+            self._drop_stale(channel)
+        waiter = (channel, generation, on_result, on_error)
+
+        key = self._key(fn, args)
+        if key is not None and key in self._in_flight:
+            self._in_flight[key][1].append(waiter)
+            return
+
+        if key is None:
+            key = object()
+        job = _Job(self, key, fn, args)
+        self._in_flight[key] = (job, [waiter])
+        self._thread_pool.start(job)
+
+    def cancel(self, channel):
+        """Drop every pending request on ``channel``."""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+        self._drop_stale(channel)
+
+    def pending(self):
+        return len(self._in_flight)
+
+    @staticmethod
+    def _key(fn, args):
+        key = (getattr(fn, "__func__", fn), args)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _is_current(self, channel, generation):
+        return channel is None or self._generations.get(channel) == generation
+
+    def _drop_stale(self, channel):
+        for key, (job, waiters) in list(self._in_flight.items()):
+            waiters[:] = [w for w in waiters if w[0] != channel or self._is_current(w[0], w[1])]
+            # Jobs that already started cannot be interrupted; their result is simply ignored.
+            if not waiters and self._thread_pool.tryTake(job):
+                del self._in_flight[key]
+
+    @pyqtSlot(object, object, object)
+    def _deliver(self, key, result, error):
+        _, waiters = self._in_flight.pop(key, (None, []))
+        for channel, generation, on_result, on_error in waiters:
+            if not self._is_current(channel, generation):
+                continue
+            if error is None:
+                on_result(result)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"Background query failed: {error}")
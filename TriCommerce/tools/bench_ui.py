@@ -0,0 +1,333 @@
+"""Time the centers' screens headlessly and flag regressions between commits.
+
+Each interaction drives a real window on Qt's offscreen platform (building
+it, clicking through a search, loading a grid) and waits until every
+background query has been delivered. For every interaction it records the
+wall-clock time and, per run, the statements, round-trips, rows and new
+connections it cost (shared.dao.query_stats and the pool's counters).
+
+Run from the TriCommerce folder against the configured database, or let
+``--sqlite`` build a throw-away SQLite file seeded by tools/generate_data.py:
+
+    python tools/bench_ui.py --sqlite bench.db --label before
+    python tools/bench_ui.py --sqlite bench.db --label after --baseline before
+    python tools/bench_ui.py --compare before after
+
+Results go to ``<out>/<label>.json``. ``--baseline`` (or ``--compare``)
+exits with status 1 when an interaction got slower by more than
+``--threshold`` (relative, on the median) or sends more statements or
+round-trips than before.
+
+The benchmark signs in as the customer with the most cart lines and the
+seller with the most order lines, so the database needs both.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from shared.backends import SqliteBackend, set_backend
+from shared.dao import query_stats
+from shared.pool import get_pool
+
+# Ignore timing changes smaller than this, whatever the relative change.
+NOISE_MS = 1.0
+
+
+def load_center(folder, filename):
+    spec = importlib.util.spec_from_file_location(os.path.splitext(filename)[0], os.path.join(ROOT, folder, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def prepare_sqlite(path, seed, scale):
+    """Use the SQLite file at ``path``, creating, migrating and seeding it if it does not exist."""
+    backend = SqliteBackend(os.path.abspath(path))
+    set_backend(backend)
+    if os.path.exists(path):
+        return
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from generate_data import SCALES, generate
+    from migrate import applied_versions, migrations
+
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        backend.create_schema(cursor)
+        applied = applied_versions(backend, cursor)
+        for version, script in migrations(backend.migrations_dir):
+            if version not in applied:
+                with open(script, encoding="utf-8") as f:
+                    backend.run_script(cursor, f.read())
+        generate(conn, backend, seed=seed, **SCALES[scale])
+
+
+def actors():
+    """Return (customer email, customer password, seller id, category name) to run as."""
+    backend = get_pool().backend
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+
+        def one(sql):
+            cursor.execute(backend.translate(sql))
+            row = cursor.fetchone()
+            cursor.fetchall()
+            if row is None:
+                raise SystemExit("the database has no data to benchmark; seed it first (see --sqlite)")
+            return row
+
+        email, password = one("""
+            SELECT TOP 1 c.EmailID, c.Password FROM Customers c
+            INNER JOIN ShoppingCart sc ON sc.CustomerID = c.CustomerID
+            WHERE c.EmailID IS NOT NULL AND c.Password IS NOT NULL
+            GROUP BY c.CustomerID, c.EmailID, c.Password ORDER BY COUNT(*) DESC, c.CustomerID""")
+        seller_id, = one("""
+            SELECT TOP 1 p.SellerID FROM OrderItems oi INNER JOIN Products p ON p.ProductSKU = oi.ProductSKU
+            GROUP BY p.SellerID ORDER BY COUNT(*) DESC, p.SellerID""")
+        category, = one("""
+            SELECT TOP 1 c.CategoryName FROM Products p INNER JOIN Categories c ON c.CategoryID = p.CategoryID
+            WHERE p.Status = 'Active' GROUP BY c.CategoryID, c.CategoryName ORDER BY COUNT(*) DESC, c.CategoryID""")
+    return email, password, seller_id, category
+
+
+class Bench:
+    def __init__(self, iterations, timeout=30.0):
+        from PyQt6.QtCore import QThreadPool
+        from PyQt6.QtWidgets import QApplication, QMessageBox
+
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        self.thread_pool = QThreadPool.globalInstance()
+        self.iterations = iterations
+        self.timeout = timeout
+        self.results = {}
+        self.errors = []
+        # Modal message boxes would block a headless run; note them instead.
+        for kind in ("information", "warning", "critical"):
+            setattr(QMessageBox, kind, self._message_box(kind))
+
+    def _message_box(self, kind):
+        from PyQt6.QtWidgets import QMessageBox
+
+        def show(parent, title, text, *args, **kwargs):
+            if kind == "critical":
+                self.errors.append(f"{title}: {text}")
+            return QMessageBox.StandardButton.Ok
+        return staticmethod(show)
+
+    def settle(self, *windows):
+        """Process events until the thread pool and the windows' QueryRunners are idle."""
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            self.thread_pool.waitForDone(10)
+            self.app.processEvents()
+            busy = [w for w in windows if getattr(w, "queries", None) is not None and w.queries.pending()]
+            if not busy and self.thread_pool.activeThreadCount() == 0:
+                self.app.processEvents()
+                return
+        raise TimeoutError("background queries did not finish")
+
+    def measure(self, name, action):
+        """Run ``action`` ``iterations`` times (after one warm-up) and record what each run cost."""
+        pool = get_pool()
+        first = None
+        samples = []
+        before_stats, before_connects = query_stats.snapshot(), pool.misses
+        for i in range(self.iterations + 1):
+            if i == 1:
+                before_stats, before_connects = query_stats.snapshot(), pool.misses
+            started = time.perf_counter()
+            action()
+            elapsed = (time.perf_counter() - started) * 1000
+            if i == 0:
+                first = elapsed
+            else:
+                samples.append(elapsed)
+        after = query_stats.snapshot()
+        samples.sort()
+        self.results[name] = {
+            "first_ms": round(first, 3),
+            "median_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "min_ms": round(samples[0], 3),
+            **{key: round((after[key] - before_stats[key]) / self.iterations, 2) for key in after},
+            "connects": round((pool.misses - before_connects) / self.iterations, 2),
+        }
+        print(f"  {name:<28} median {self.results[name]['median_ms']:>8.2f} ms"
+              f"  {self.results[name]['statements']:>5} statements  {self.results[name]['round_trips']:>5} round-trips")
+
+
+def run(args):
+    from shared.refdata import get_reference_data
+
+    email, password, seller_id, category = actors()
+    get_reference_data().refresh()
+    bench = Bench(args.iterations)
+    customer = load_center("Customer Handle", "CustomerCenter.py")
+    seller = load_center("Seller Center", "SellerCenter.py")
+    admin = load_center("Admin Handle", "AdminCenter.py")
+
+    def login_window():
+        window = customer.LoginWindow()
+        window.show()
+        bench.settle(window)
+        window.deleteLater()
+    bench.measure("customer.login_window", login_window)
+
+    login = customer.LoginWindow()
+
+    def sign_in():
+        login.emailInput.setText(email)
+        login.passwordInput.setText(password)
+        login.handle_login()
+        bench.settle(login)
+    bench.measure("customer.login", sign_in)
+
+    session = login.session
+    search = customer.SearchProduct(session)
+    search.comboBox.blockSignals(True)
+    search.comboBox.setCurrentText(category)
+    search.comboBox.blockSignals(False)
+
+    def browse_category():
+        search.searchEdit.clear()
+        search.show_details()
+        bench.settle(search)
+    bench.measure("customer.search_category", browse_category)
+
+    def search_text():
+        search.searchEdit.setText("blue sh")
+        search.show_details()
+        bench.settle(search)
+    bench.measure("customer.search_text", search_text)
+
+    cart = customer.CartWindow(session)
+    bench.settle(cart)
+
+    def load_cart():
+        cart.load_cart_data()
+        bench.settle(cart)
+    bench.measure("customer.cart", load_cart)
+
+    admin_orders = admin.ManageOrdersWindow()
+    admin_orders.show()
+    bench.settle(admin_orders)
+
+    def admin_pending():
+        admin_orders.fetchOrders("Pending")
+        bench.settle(admin_orders)
+    bench.measure("admin.orders_pending", admin_pending)
+
+    admin_products = admin.ManageProductsWindow()
+    admin_products.show()
+    bench.settle(admin_products)
+
+    def admin_active():
+        admin_products.loadProducts("Active")
+        bench.settle(admin_products)
+    bench.measure("admin.products_active", admin_active)
+
+    seller_orders = seller.ManageOrdersWindow(seller_id)
+    seller_orders.show()
+    bench.settle(seller_orders)
+
+    def seller_pending():
+        seller_orders.fetchOrders("Pending")
+        bench.settle(seller_orders)
+    bench.measure("seller.orders_pending", seller_pending)
+
+    def seller_dashboard():
+        window = seller.DashboardWindow(seller_id)
+        bench.settle(window)
+        window.deleteLater()
+    bench.measure("seller.dashboard", seller_dashboard)
+
+    for error in bench.errors:
+        print(f"  error dialog: {error}")
+    return {"meta": metadata(args), "results": bench.results, "errors": bench.errors}
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "backend": get_pool().backend.name,
+        "iterations": args.iterations,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare(before, after, threshold):
+    """Print the change per interaction and return the names that regressed."""
+    regressed = []
+    print(f"  {'interaction':<28} {'before':>10} {'after':>10}  change   statements  round-trips")
+    for name, old in before["results"].items():
+        new = after["results"].get(name)
+        if new is None:
+            continue
+        change = (new["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+        slower = change > threshold and new["median_ms"] - old["median_ms"] > NOISE_MS
+        chattier = new["statements"] > old["statements"] or new["round_trips"] > old["round_trips"]
+        flag = "  REGRESSION" if slower or chattier else ""
+        print(f"  {name:<28} {old['median_ms']:>8.2f}ms {new['median_ms']:>8.2f}ms  {change:+6.0%}"
+              f"  {old['statements']:>4} -> {new['statements']:<4} {old['round_trips']:>4} -> {new['round_trips']:<4}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def read(out_dir, label):
+    with open(os.path.join(out_dir, f"{label}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", help="name of this run, e.g. the commit being measured")
+    parser.add_argument("--baseline", help="label of an earlier run to compare this run against")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--sqlite", metavar="PATH", help="benchmark a SQLite file, seeding it if it does not exist")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the --sqlite data")
+    parser.add_argument("--scale", default="tiny", help="tools/generate_data.py preset for the --sqlite data")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown of the median that counts as a regression")
+    parser.add_argument("--out", default="benchmarks", help="directory the results are written to")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressed = compare(read(args.out, args.compare[0]), read(args.out, args.compare[1]), args.threshold)
+        sys.exit(1 if regressed else 0)
+    if not args.label:
+        parser.error("give --label to run or --compare BEFORE AFTER")
+
+    if args.sqlite:
+        prepare_sqlite(args.sqlite, args.seed, args.scale)
+    results = run(args)
+    get_pool().close()
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, f"{args.label}.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {os.path.join(args.out, args.label + '.json')}")
+
+    if args.baseline and compare(read(args.out, args.baseline), results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compile the Qt Designer forms of the three centers into Python modules.
+
+The modules go to compiled_ui/ and are picked up by shared.forms.load_form;
+a form edited after the last build is loaded from its .ui file until this
+runs again. Run from the TriCommerce folder:
+
+    python tools/build_ui.py          # compile forms that changed
+    python tools/build_ui.py --force  # compile every form
+    python tools/build_ui.py --clean  # remove the compiled modules
+"""
+import argparse
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.forms import COMPILED_DIR, ROOT, compiled_path
+
+CENTERS = ("Admin Handle", "Seller Center", "Customer Handle")
+
+
+def forms():
+    """Return every .ui path of the centers, in a stable order."""
+    return [path for center in CENTERS for path in sorted(glob.glob(os.path.join(ROOT, center, "*.ui")))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="compile forms even if they are up to date")
+    parser.add_argument("--clean", action="store_true", help="remove the compiled modules")
+    args = parser.parse_args()
+
+    if args.clean:
+        for path in glob.glob(os.path.join(COMPILED_DIR, "*.py")):
+            os.remove(path)
+        print(f"removed compiled forms from {COMPILED_DIR}")
+        return
+
+    from PyQt6.uic import compileUi
+
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    for ui_path in forms():
+        target = compiled_path(ui_path)
+        name = os.path.relpath(ui_path, ROOT)
+        if not args.force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(ui_path):
+            print(f"  current   {name}")
+            continue
+        with open(ui_path, encoding="utf-8") as source, open(target, "w", encoding="utf-8") as out:
+            compileUi(source, out)
+        print(f"  compiled  {name} -> {os.path.relpath(target, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
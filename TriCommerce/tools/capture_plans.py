@@ -0,0 +1,209 @@
+"""Capture execution plans and logical reads for every read query the centers run.
+
+Typical use around a migration, from the TriCommerce folder:
+
+    python tools/capture_plans.py --label before
+    python tools/migrate.py
+    python tools/capture_plans.py --label after
+    python tools/capture_plans.py --compare before after
+
+Each run writes ``<out>/<label>/<query>.sqlplan`` (open in SSMS) and a
+``summary.json`` with logical reads per table and the plan's scan/seek
+operators. Queries that fail, e.g. because they need a migration the
+database does not have yet, are recorded as unavailable.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.pool import get_pool
+from shared.dao import cart, customers, orders, products, reference, sellers, stock
+
+SHOWPLAN_COLUMN = "Microsoft SQL Server 2005 XML Showplan"
+SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+
+SAMPLES = {
+    "customer_email": "SELECT TOP 1 EmailID FROM Customers WHERE EmailID IS NOT NULL ORDER BY CustomerID",
+    "customer_password": "SELECT TOP 1 Password FROM Customers WHERE EmailID IS NOT NULL ORDER BY CustomerID",
+    "customer_id": "SELECT TOP 1 CustomerID FROM Customers ORDER BY CustomerID",
+    "seller_id": "SELECT TOP 1 SellerID FROM Sellers ORDER BY SellerID",
+    "seller_email": "SELECT TOP 1 EmailID FROM Sellers WHERE EmailID IS NOT NULL ORDER BY SellerID",
+    "seller_password": "SELECT TOP 1 Password FROM Sellers WHERE EmailID IS NOT NULL ORDER BY SellerID",
+    "store_name": "SELECT TOP 1 StoreName FROM Sellers WHERE StoreName IS NOT NULL ORDER BY SellerID",
+    "category_id": "SELECT TOP 1 CategoryID FROM Categories ORDER BY CategoryID",
+    "pending_status_id": "SELECT StatusID FROM Status WHERE StatusTitle = 'Pending'",
+    "product_sku": "SELECT TOP 1 ProductSKU FROM Products ORDER BY ProductSKU",
+    "order_id": "SELECT TOP 1 OrderID FROM Orders ORDER BY OrderID DESC",
+}
+
+# (name, sql, parameter names from SAMPLES or literal values)
+QUERIES = [
+    ("customer_login", customers.LOGIN, ["customer_email", "customer_password"]),
+    ("customer_profile", customers.PROFILE, ["customer_id"]),
+    ("customer_session", customers.SESSION_PROFILE, ["customer_id"]),
+    ("seller_login", sellers.LOGIN, ["seller_email", "seller_password"]),
+    ("seller_taken", sellers.STORE_OR_EMAIL_TAKEN, ["store_name", "seller_email"]),
+    ("all_sellers", sellers.ALL_SELLERS, []),
+    ("browse_category", products.ACTIVE_IN_CATEGORY, ["category_id"]),
+    ("product_details", products.DETAILS, ["product_sku"]),
+    ("product_changes", products.CHANGED_SINCE, [(5000,), (0,)]),
+    ("admin_products", products.BY_STATUS, [("Active",)]),
+    ("seller_products", products.SELLER_BY_STATUS, [("Active",), "seller_id"]),
+    ("admin_products_page", products.BY_STATUS_PAGES.after_sql, [(101,), ("Active",), "product_sku", "product_sku"]),
+    ("seller_products_page", products.SELLER_BY_STATUS_PAGES.first_sql, [(101,), ("Active",), "seller_id"]),
+    ("product_status", products.STATUS, ["product_sku"]),
+    ("cart_items", cart.ITEMS, ["customer_id"]),
+    ("admin_orders", orders.BY_STATUS, ["pending_status_id"]),
+    ("seller_orders", orders.SELLER_BY_STATUS, ["seller_id", "pending_status_id"]),
+    ("admin_orders_page", orders.BY_STATUS_PAGES.first_sql, [(101,), "pending_status_id"]),
+    ("seller_orders_page", orders.SELLER_BY_STATUS_PAGES.first_sql, [(101,), "seller_id", "pending_status_id"]),
+    ("admin_order_summaries_page", orders.SUMMARIES_PAGES.first_sql, [(101,), "pending_status_id"]),
+    ("seller_order_summaries_page", orders.SELLER_SUMMARIES_PAGES.first_sql,
+     [(101,), "seller_id", "pending_status_id"]),
+    ("order_items", orders.ITEMS, ["order_id"]),
+    ("seller_order_items", orders.SELLER_ITEMS, ["order_id", "seller_id"]),
+    ("seller_dashboard", sellers.DASHBOARD, ["seller_id"]),
+    ("order_status", orders.STATUS_ID, ["order_id"]),
+    ("stock_shortages", stock.SHORT_FOR_ORDER, ["order_id"]),
+    ("cities", reference.CITIES, []),
+    ("banks", reference.BANKS, []),
+    ("categories", reference.CATEGORIES, []),
+    ("statuses", reference.STATUSES, []),
+]
+
+READS = re.compile(r"Table '([^']+)'\. Scan count (\d+), logical reads (\d+)")
+
+
+def load_samples(cursor):
+    samples = {}
+    for name, sql in SAMPLES.items():
+        cursor.execute(sql)
+        row = cursor.fetchone()
+        samples[name] = row[0] if row else None
+    return samples
+
+
+def capture(cursor, sql, params):
+    """Run one query with STATISTICS IO/XML on; return (plan xml, reads per table, ms).
+
+    The statistics are switched off again even when the query fails, since
+    the connection goes back to the pool.
+    """
+    cursor.execute("SET STATISTICS IO ON")
+    try:
+        cursor.execute("SET STATISTICS XML ON")
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        plan, messages = None, []
+        while True:
+            messages.extend(text for _, text in cursor.messages or [])
+            if cursor.description:
+                rows = cursor.fetchall()
+                if cursor.description[0][0] == SHOWPLAN_COLUMN and rows:
+                    plan = rows[0][0]
+            if not cursor.nextset():
+                break
+        elapsed = (time.perf_counter() - started) * 1000
+    finally:
+        cursor.execute("SET STATISTICS XML OFF")
+        cursor.execute("SET STATISTICS IO OFF")
+
+    reads = {}
+    for table, _, logical in READS.findall("\n".join(messages)):
+        reads[table] = reads.get(table, 0) + int(logical)
+    return plan, reads, elapsed
+
+
+def operators(plan):
+    """Return 'PhysicalOp on Table.Index' strings for every table access in a plan."""
+    if not plan:
+        return []
+    found = []
+    for relop in ET.fromstring(plan).iter(SHOWPLAN_NS + "RelOp"):
+        for child in relop:
+            obj = child.find(SHOWPLAN_NS + "Object")
+            if obj is not None:
+                target = obj.get("Table", "").strip("[]")
+                if obj.get("Index"):
+                    target += "." + obj.get("Index").strip("[]")
+                found.append(f"{relop.get('PhysicalOp')} on {target}")
+    return found
+
+
+def run(label, out_dir):
+    target = os.path.join(out_dir, label)
+    os.makedirs(target, exist_ok=True)
+    summary = {}
+    with get_pool().connection() as connection:
+        cursor = connection.cursor()
+        samples = load_samples(cursor)
+        for name, sql, param_names in QUERIES:
+            params = [p[0] if isinstance(p, tuple) else samples[p] for p in param_names]
+            try:
+                plan, reads, elapsed = capture(cursor, sql, params)
+            except Exception as e:
+                # e.g. a query that needs a migration this database does not have yet
+                summary[name] = {"unavailable": str(e)}
+                print(f"  {name:<22} unavailable: {e}")
+                continue
+            if plan:
+                with open(os.path.join(target, f"{name}.sqlplan"), "w", encoding="utf-8") as f:
+                    f.write(plan)
+            summary[name] = {
+                "logical_reads": reads,
+                "total_reads": sum(reads.values()),
+                "operators": operators(plan),
+                "elapsed_ms": round(elapsed, 3),
+            }
+            print(f"  {name:<22} {summary[name]['total_reads']:>8} logical reads")
+    with open(os.path.join(target, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    get_pool().close()
+
+
+def compare(before_label, after_label, out_dir):
+    with open(os.path.join(out_dir, before_label, "summary.json"), encoding="utf-8") as f:
+        before = json.load(f)
+    with open(os.path.join(out_dir, after_label, "summary.json"), encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"  {'query':<22} {before_label:>10} {after_label:>10}  change")
+    for name in before:
+        if name not in after:
+            continue
+        if "unavailable" in before[name] or "unavailable" in after[name]:
+            old = "-" if "unavailable" in before[name] else before[name]["total_reads"]
+            new = "-" if "unavailable" in after[name] else after[name]["total_reads"]
+            print(f"  {name:<22} {old:>10} {new:>10}  unavailable")
+            continue
+        old = before[name]["total_reads"]
+        new = after[name]["total_reads"]
+        change = f"{(new - old) / old:+.0%}" if old else "n/a"
+        print(f"  {name:<22} {old:>10} {new:>10}  {change}")
+        scans = [op for op in after[name]["operators"] if "Scan" in op]
+        if scans:
+            print(f"  {'':<22} still scanning: {', '.join(scans)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", help="name of this capture, e.g. before or after")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--out", default="plans", help="directory the captures are written to")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare[0], args.compare[1], args.out)
+    elif args.label:
+        run(args.label, args.out)
+    else:
+        parser.error("give --label to capture or --compare BEFORE AFTER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Export orders, products or finances to a CSV, Parquet or Arrow file.
+
+Rows are streamed with fetchmany and written batch by batch through
+shared.exports, so exports of any size run in bounded memory. The format
+follows the extension of the output file (.csv, .parquet, .arrow). Run from
+the TriCommerce folder:
+
+    python tools/export_data.py orders orders.parquet
+    python tools/export_data.py orders pending.csv --status Pending
+    python tools/export_data.py products catalog.csv --seller 12
+
+Ctrl+C stops the export and removes the partial file.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.exports import BATCH_SIZE, DATASETS, export
+from shared.pool import get_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", choices=DATASETS)
+    parser.add_argument("path", help="output file; .csv, .parquet or .arrow")
+    parser.add_argument("--seller", type=int, help="only this SellerID's rows")
+    parser.add_argument("--status", help="only orders with this status (orders only)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    def progress(p):
+        elapsed = time.perf_counter() - started
+        print(f"\r  {p.fraction():.0%}  {p.written:,} of {p.total:,} rows  "
+              f"({p.written / max(elapsed, 1e-9):,.0f} rows/s)   ", end="", flush=True)
+
+    try:
+        result = export(args.dataset, args.path, seller_id=args.seller, status=args.status,
+                        batch_size=args.batch_size, progress=progress)
+    except ValueError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        print("\nstopped; the partial file was removed")
+        sys.exit(130)
+    finally:
+        get_pool().close()
+    print()
+    print(f"{result.summary()} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
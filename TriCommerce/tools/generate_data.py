@@ -0,0 +1,331 @@
+"""Bulk-load deterministic synthetic data for scale testing.
+
+Fills Sellers, Products, Customers, SaleCampaigns, CampaignProducts,
+Orders, OrderItems, Reviews, ShoppingCart and Finances with data skewed
+the way a marketplace is:
+
+* a few sellers own most products and a few SKUs get most order lines
+  (Zipf-distributed popularity),
+* order sizes follow a power law (most orders have one or two lines, a
+  few have many),
+* older orders are delivered, recent ones still pending or shipped.
+
+The same ``--seed`` and sizes give the same rows. Rows are generated as
+streams and sent in batches of ``--batch-size`` with ``executemany``
+(``fast_executemany`` on SQL Server, one round-trip per batch), one
+transaction per batch, so memory stays flat however much is loaded.
+Identifiers are assigned here, continuing after the largest existing one,
+so rows can reference each other without reading anything back.
+
+Run from the TriCommerce folder against the configured database:
+
+    python tools/generate_data.py --scale small
+    python tools/generate_data.py --scale large --seed 7      # ~10M order lines
+    python tools/generate_data.py --orders 50000 --products 20000
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.pool import get_pool
+
+SCALES = {
+    "tiny": dict(sellers=20, products=2_000, customers=200, orders=3_000, campaigns=5),
+    "small": dict(sellers=200, products=20_000, customers=20_000, orders=100_000, campaigns=20),
+    "medium": dict(sellers=2_000, products=200_000, customers=200_000, orders=1_000_000, campaigns=100),
+    "large": dict(sellers=10_000, products=1_000_000, customers=2_000_000, orders=4_000_000, campaigns=500),
+}
+
+END_DATE = date(2024, 12, 31)
+DAYS = 730
+
+WORDS = ["blue", "red", "black", "cotton", "leather", "smart", "classic", "mini", "pro", "wireless",
+         "steel", "organic", "vintage", "slim", "deluxe", "portable", "silk", "bamboo", "ceramic", "digital"]
+NOUNS = ["shirt", "shoe", "phone", "lamp", "book", "watch", "bag", "chair", "kettle", "cream",
+         "jacket", "speaker", "mug", "blender", "novel", "scarf", "charger", "desk", "perfume", "helmet"]
+
+
+class Zipf:
+    """Draws ranks 0..n-1, rank r with weight 1 / (r + 1) ** exponent, mapped onto shuffled ids."""
+
+    def __init__(self, ids, exponent, rng):
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self._cumulative = list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(len(self.ids))))
+
+    def draw(self, rng, k=1):
+        return [self.ids[rank] for rank in rng.choices(range(len(self.ids)), cum_weights=self._cumulative, k=k)]
+
+
+def batched(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Loader:
+    """Streams rows into tables in batches, one transaction per batch."""
+
+    def __init__(self, conn, backend, batch_size):
+        self.conn = conn
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cursor = conn.cursor()
+        if hasattr(self.cursor, "fast_executemany"):
+            self.cursor.fast_executemany = True
+
+    def next_id(self, table, column):
+        self.cursor.execute(f"SELECT MAX({column}) FROM {table}")
+        return (self.cursor.fetchone()[0] or 0) + 1
+
+    def _insert(self, table, columns):
+        return self.backend.translate(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})")
+
+    def _write(self, statements):
+        """Run (sql, rows) pairs as one transaction."""
+        self.backend.begin(self.conn.raw)
+        try:
+            for sql, rows in statements:
+                if rows:
+                    self.cursor.executemany(sql, rows)
+            self.conn.raw.commit()
+        except BaseException:
+            self.conn.raw.rollback()
+            raise
+        finally:
+            self.backend.end(self.conn.raw)
+
+    @contextmanager
+    def _identity_insert(self, table):
+        # Explicit ids into an IDENTITY column need IDENTITY_INSERT on SQL Server.
+        explicit = table is not None and self.backend.name == "sqlserver"
+        if explicit:
+            self.cursor.execute(f"SET IDENTITY_INSERT {table} ON")
+        try:
+            yield
+        finally:
+            if explicit:
+                self.cursor.execute(f"SET IDENTITY_INSERT {table} OFF")
+
+    def load(self, table, columns, rows, identity=False):
+        """Insert ``rows`` into ``table`` in batches and return how many there were."""
+        batches = ({table: batch} for batch in batched(rows, self.batch_size))
+        return self.load_together({table: columns}, batches, identity=table if identity else None)[table]
+
+    def load_together(self, tables, batches, identity=None):
+        """Insert batches of rows for several tables, each batch in one transaction.
+
+        ``batches`` yields {table: rows}; tables are written in the order of
+        ``tables`` ({table: columns}), so parents go before their children.
+        """
+        statements = {table: self._insert(table, columns) for table, columns in tables.items()}
+        loaded = dict.fromkeys(tables, 0)
+        started = time.perf_counter()
+        with self._identity_insert(identity):
+            for batch in batches:
+                self._write([(statements[table], batch.get(table)) for table in tables])
+                for table in tables:
+                    loaded[table] += len(batch.get(table, ()))
+                self._progress(loaded, time.perf_counter() - started, end="")
+        self._progress(loaded, time.perf_counter() - started, end="\n")
+        return loaded
+
+    @staticmethod
+    def _progress(loaded, elapsed, end):
+        rows = sum(loaded.values())
+        counts = ", ".join(f"{table} {count:,}" for table, count in loaded.items())
+        print(f"\r  {counts}  ({rows / max(elapsed, 1e-9):,.0f} rows/s, {elapsed:.1f} s)   ", end=end, flush=True)
+
+
+def generate(conn, backend, seed=1, batch_size=10_000, sellers=200, products=20_000, customers=20_000,
+             orders=100_000, campaigns=20, cart_share=0.1, review_share=0.2):
+    """Load one dataset over ``conn`` and return {table: rows loaded}."""
+    loader = Loader(conn, backend, batch_size)
+    loaded = {}
+
+    def rng(stream):
+        # One generator per table, so changing one size leaves the other tables' values alone.
+        return random.Random(f"{seed}:{stream}")
+
+    cursor = loader.cursor
+    cursor.execute("SELECT CategoryID FROM Categories ORDER BY CategoryID")
+    category_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT StatusID, StatusTitle FROM Status")
+    status_ids = {title: status_id for status_id, title in cursor.fetchall()}
+    cursor.execute("SELECT CityName FROM Cities ORDER BY CityID")
+    cities = [row[0] for row in cursor.fetchall()] or ["Lahore"]
+    cursor.execute("SELECT BankName FROM Banks ORDER BY BankID")
+    banks = [row[0] for row in cursor.fetchall()] or ["Bank"]
+
+    first_seller = loader.next_id("Sellers", "SellerID")
+    first_product = loader.next_id("Products", "ProductSKU")
+    first_customer = loader.next_id("Customers", "CustomerID")
+    first_order = loader.next_id("Orders", "OrderID")
+    first_campaign = loader.next_id("SaleCampaigns", "CampaignID")
+    seller_ids = range(first_seller, first_seller + sellers)
+    product_ids = range(first_product, first_product + products)
+    customer_ids = range(first_customer, first_customer + customers)
+
+    def seller_rows(r=rng("sellers")):
+        for seller_id in seller_ids:
+            yield (seller_id, f"Store {seller_id}", f"seller{seller_id}@generated.test",
+                   r.randrange(10 ** 12, 10 ** 13), r.choice(banks), r.randrange(10 ** 9, 10 ** 10),
+                   r.choice(cities), f"{r.randint(1, 999)} Market Road", r.randrange(10 ** 10, 10 ** 11),
+                   "password", r.choices(["Active", "Pending", "Inactive"], [90, 5, 5])[0])
+
+    loaded["Sellers"] = loader.load(
+        "Sellers", ["SellerID", "StoreName", "EmailID", "CNIC", "BankName", "BankAccount", "City",
+                    "BusinessAddress", "ContactNumber", "Password", "AccountStatus"], seller_rows(), identity=True)
+
+    # A few sellers own most of the catalogue; product prices are kept for order lines.
+    owners = Zipf(seller_ids, 1.1, rng("owners"))
+    categories = Zipf(category_ids, 0.8, rng("categories"))
+    prices = {}
+
+    def product_rows(r=rng("products")):
+        for batch in batched(product_ids, batch_size):
+            for product_id, seller_id, category_id in zip(batch, owners.draw(r, len(batch)),
+                                                         categories.draw(r, len(batch))):
+                price = round(r.lognormvariate(3.5, 1.0), 2) + 0.99
+                prices[product_id] = price
+                name = f"{r.choice(WORDS).title()} {r.choice(WORDS).title()} {r.choice(NOUNS).title()}"
+                yield (product_id, seller_id, name, " ".join(r.choices(WORDS + NOUNS, k=r.randint(8, 30))),
+                       price, max(0, int(r.expovariate(1 / 60)) - 5), category_id,
+                       r.choices(["Active", "Pending", "Inactive"], [85, 8, 7])[0],
+                       (END_DATE - timedelta(days=r.randrange(DAYS))).isoformat(), int(r.paretovariate(1.2)))
+
+    loaded["Products"] = loader.load(
+        "Products", ["ProductSKU", "SellerID", "ProductName", "Description", "Price", "StockQuantity",
+                     "CategoryID", "Status", "PublishDate", "NumberOfClicks"], product_rows(), identity=True)
+
+    def customer_rows(r=rng("customers")):
+        for customer_id in customer_ids:
+            yield (customer_id, r.choice(["Ali", "Sara", "Omar", "Ayesha", "Bilal", "Hina", "Usman", "Zara"]),
+                   f"Customer{customer_id}", f"customer{customer_id}@generated.test", r.choice(cities),
+                   f"House {r.randint(1, 999)}, Street {r.randint(1, 99)}", r.randrange(10 ** 10, 10 ** 11),
+                   "password")
+
+    loaded["Customers"] = loader.load(
+        "Customers", ["CustomerID", "FirstName", "LastName", "EmailID", "City", "DeliveryAddress",
+                      "ContactNumber", "Password"], customer_rows(), identity=True)
+
+    hot_products = Zipf(product_ids, 1.05, rng("popularity"))
+
+    def campaign_rows(r=rng("campaigns")):
+        for campaign_id in range(first_campaign, first_campaign + campaigns):
+            start = END_DATE - timedelta(days=r.randrange(DAYS))
+            yield (campaign_id, f"Campaign {campaign_id}", f"{start.isoformat()} 00:00:00",
+                   f"{(start + timedelta(days=r.randint(1, 14))).isoformat()} 23:59:59", r.choice([5, 10, 15, 20]))
+
+    loaded["SaleCampaigns"] = loader.load(
+        "SaleCampaigns", ["CampaignID", "CampaignName", "StartDate", "EndDate", "MinimumDiscount"],
+        campaign_rows(), identity=True)
+
+    def campaign_product_rows(r=rng("campaign products")):
+        for campaign_id in range(first_campaign, first_campaign + campaigns):
+            # Campaigns feature popular products; the set removes repeats within one campaign.
+            for product_id in sorted(set(hot_products.draw(r, min(products, r.randint(10, 200))))):
+                yield campaign_id, product_id, r.choice([5, 10, 15, 20, 25, 30])
+
+    loaded["CampaignProducts"] = loader.load(
+        "CampaignProducts", ["CampaignID", "ProductSKU", "DiscountPercentage"], campaign_product_rows())
+
+    # Orders: power-law sizes, popular SKUs, status by age. Each batch of orders
+    # goes in one transaction together with its lines and reviews.
+    buyers = Zipf(customer_ids, 0.7, rng("buyers"))
+    pending, shipped, delivered = status_ids["Pending"], status_ids["Shipped"], status_ids["Delivered"]
+
+    def order_batches(r=rng("orders")):
+        for batch in batched(range(first_order, first_order + orders), batch_size):
+            order_rows, line_rows, review_rows = [], [], []
+            for order_id, customer_id in zip(batch, buyers.draw(r, len(batch))):
+                age = int(r.expovariate(1 / 120)) % DAYS
+                if age < 3:
+                    status = pending
+                elif age < 10:
+                    status = r.choice([pending, shipped, delivered])
+                else:
+                    status = delivered
+                ordered = END_DATE - timedelta(days=age)
+                order_rows.append((order_id, customer_id, status, f"Generated address {customer_id}",
+                                   ordered.isoformat()))
+                for sku in sorted(set(hot_products.draw(r, min(int(r.paretovariate(1.6)), 50)))):
+                    line_rows.append((order_id, sku, min(int(r.paretovariate(2.5)), 20), prices[sku]))
+                    if status == delivered and r.random() < review_share:
+                        rating = r.choices([1, 2, 3, 4, 5], [5, 5, 10, 30, 50])[0]
+                        review_rows.append((order_id, sku, rating,
+                                            (ordered + timedelta(days=r.randint(3, 30))).isoformat()))
+            yield {"Orders": order_rows, "OrderItems": line_rows, "Reviews": review_rows}
+
+    loaded.update(loader.load_together({
+        "Orders": ["OrderID", "CustomerID", "StatusID", "ShippingAddress", "OrderDate"],
+        "OrderItems": ["OrderID", "ProductSKU", "Quantity", "UnitPrice"],
+        "Reviews": ["OrderID", "ProductSKU", "Rating", "ReviewDate"],
+    }, order_batches(), identity="Orders"))
+
+    def cart_rows(r=rng("carts")):
+        for customer_id in customer_ids:
+            if r.random() < cart_share:
+                for sku in sorted(set(hot_products.draw(r, r.randint(1, 6)))):
+                    yield customer_id, sku, r.randint(1, 3)
+
+    loaded["ShoppingCart"] = loader.load("ShoppingCart", ["CustomerID", "ProductID", "Quantity"], cart_rows())
+
+    def finance_rows(r=rng("finances")):
+        months = sorted({(END_DATE - timedelta(days=day)).replace(day=1) for day in range(0, DAYS, 28)})
+        for seller_id in seller_ids:
+            # Larger sellers (more products) get larger payouts.
+            scale = r.paretovariate(1.2) * 1000
+            for month in months[:-1]:
+                paid = (month + timedelta(days=40)).replace(day=5)
+                yield (month.strftime("%Y-%m"), seller_id, paid.isoformat(), "Paid",
+                       round(scale * r.uniform(0.5, 1.5), 2))
+
+    loaded["Finances"] = loader.load(
+        "Finances", ["MonthOfPayment", "SellerID", "PaymentDate", "Status", "Amount"], finance_rows())
+
+    if backend.name == "sqlite":
+        # SQL Server keeps statistics up to date itself; without them SQLite
+        # walks every order of a status for a seller's order listing instead
+        # of starting from the seller's products.
+        loader.cursor.execute("ANALYZE")
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small", help="preset sizes (default: small)")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"override the preset number of {name}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for name in sizes:
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+
+    pool = get_pool()
+    print(f"backend: {pool.backend.name}, seed {args.seed}, " + ", ".join(f"{k} {v:,}" for k, v in sizes.items()))
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        loaded = generate(conn, pool.backend, seed=args.seed, batch_size=args.batch_size, **sizes)
+    elapsed = time.perf_counter() - started
+    total = sum(loaded.values())
+    print(f"loaded {total:,} rows in {elapsed:.1f} s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
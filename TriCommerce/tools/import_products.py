@@ -0,0 +1,66 @@
+"""Import a seller's products from a CSV or JSON file.
+
+Streams the file through shared.product_import: rows are validated against
+the categories in the database and inserted in batches, so catalogs of any
+size load in constant memory. Rejected rows are reported with their line
+(or array position) and, with ``--errors``, written to a CSV file. Run from
+the TriCommerce folder:
+
+    python tools/import_products.py catalog.csv --seller 12
+    python tools/import_products.py catalog.json --seller 12 --errors rejected.csv
+
+The exit status is 1 when any row was rejected.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.pool import get_pool
+from shared.product_import import BATCH_SIZE, import_products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="a .csv, .json (array) or .jsonl file")
+    parser.add_argument("--seller", type=int, required=True, help="SellerID that will own the products")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--errors", help="write rejected rows as (row, error) to this CSV file")
+    args = parser.parse_args()
+
+    errors_file = open(args.errors, "w", newline="", encoding="utf-8") if args.errors else None
+    errors = csv.writer(errors_file) if errors_file else None
+    if errors:
+        errors.writerow(["row", "error"])
+    started = time.perf_counter()
+
+    def progress(p):
+        elapsed = time.perf_counter() - started
+        print(f"\r  {p.fraction():.0%}  {p.summary()}  ({p.read / max(elapsed, 1e-9):,.0f} rows/s)   ",
+              end="", flush=True)
+
+    def rejected(row, message):
+        if errors:
+            errors.writerow([row, message])
+
+    try:
+        result = import_products(args.path, args.seller, batch_size=args.batch_size, progress=progress,
+                                 on_error=rejected)
+    finally:
+        print()
+        if errors_file:
+            errors_file.close()
+        get_pool().close()
+
+    for row, message in result.errors[:20]:
+        print(f"  row {row}: {message}")
+    if result.rejected > 20:
+        print(f"  ... and {result.rejected - 20:,} more" + (f", see {args.errors}" if args.errors else ""))
+    print(f"{result.summary()} in {time.perf_counter() - started:.1f} s")
+    sys.exit(1 if result.rejected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Apply the numbered scripts in migrations/ that the database has not seen yet.
+
+Each script records its own version in SchemaVersions, so running this again
+is a no-op. Scripts are taken from the configured backend's migrations folder
+(migrations/ for SQL Server, migrations/sqlite/ for SQLite). Run from the
+TriCommerce folder:
+
+    python tools/migrate.py          # apply pending migrations
+    python tools/migrate.py --list   # show what is applied / pending
+
+With ``TRICOMMERCE_BACKEND=sqlite``, ``--create`` first builds the
+ProjDatabase.sql schema and reference rows in an empty SQLite file.
+"""
+import argparse
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.pool import get_pool
+
+
+def migrations(directory):
+    """Return (version, path) for every migration script in ``directory``, in order."""
+    found = []
+    for name in os.listdir(directory):
+        match = re.match(r"^(\d+)_.*\.sql$", name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def applied_versions(backend, cursor):
+    if not backend.has_table(cursor, "SchemaVersions"):
+        return set()
+    cursor.execute("SELECT Version FROM SchemaVersions")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--list", action="store_true", help="only show migration status")
+    parser.add_argument("--create", action="store_true", help="create the base schema first (SQLite only)")
+    args = parser.parse_args()
+
+    backend = get_pool().backend
+    print(f"backend: {backend.name}")
+    with get_pool().connection() as connection:
+        cursor = connection.cursor()
+        if args.create:
+            if not hasattr(backend, "create_schema"):
+                parser.error("--create is only for the SQLite backend; run ProjDatabase.sql in SSMS")
+            if backend.has_table(cursor, "Products"):
+                print("  schema already exists")
+            else:
+                backend.create_schema(cursor)
+                print("  created schema from ProjDatabase.sql")
+        applied = applied_versions(backend, cursor)
+        for version, path in migrations(backend.migrations_dir):
+            name = os.path.basename(path)
+            if version in applied:
+                print(f"  applied  {name}")
+                continue
+            if args.list:
+                print(f"  pending  {name}")
+                continue
+            with open(path, encoding="utf-8") as f:
+                backend.run_script(cursor, f.read())
+            print(f"  applied  {name} (now)")
+    get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
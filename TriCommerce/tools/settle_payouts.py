@@ -0,0 +1,43 @@
+"""Pay sellers for a month: write their Finances rows from the delivered orders.
+
+Payouts are computed in the database by shared.payouts, one INSERT ... SELECT
+for all sellers. Sellers already paid for the month are skipped, so running
+the same month again only pays whoever is missing. Run from the TriCommerce
+folder after applying migration 005:
+
+    python tools/settle_payouts.py 2024-11
+    python tools/settle_payouts.py 2024-11 --payment-date 2024-12-05
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.payouts import settle_month
+from shared.pool import get_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("month", help="the month to settle, as YYYY-MM")
+    parser.add_argument("--payment-date", type=date.fromisoformat, help="PaymentDate of the rows (default: today)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        result = settle_month(args.month, args.payment_date)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        get_pool().close()
+
+    if result.open_orders:
+        print(f"  warning: {result.open_orders:,} orders of {args.month} are not delivered yet "
+              f"and will not be paid")
+    print(f"{result.summary()} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Hammer checkout on a few hot SKUs from many threads and check nothing oversells.
+
+Creates a throw-away seller, hot products and one customer per thread, lets
+every thread fill its cart with a random mix of the hot SKUs and check out
+through OrderRepository.place_order, then verifies that for each SKU
+
+    initial stock - final stock == units sold,  and  final stock >= 0
+
+Run from the TriCommerce folder (also works with TRICOMMERCE_BACKEND=sqlite):
+
+    python tools/stock_stress.py --threads 32 --orders 200 --skus 3 --stock 500
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.backends import variant
+from shared.pool import get_pool
+from shared.dao import CartRepository, OrderRepository, OutOfStockError, reservation_stats
+
+
+# Products has the migration 003 triggers, so SQL Server needs OUTPUT ... INTO
+# there (error 334 otherwise); see shared.dao.orders.TRANSITION.
+ADD_PRODUCT = variant("""
+    SET NOCOUNT ON;
+    DECLARE @added TABLE (ProductSKU BIGINT);
+    INSERT INTO Products (SellerID, ProductName, Description, Price, StockQuantity, CategoryID, Status)
+    OUTPUT INSERTED.ProductSKU INTO @added
+    VALUES (?, ?, 'stress test product', 10.00, ?, ?, 'Active');
+    SELECT ProductSKU FROM @added;
+""", sqlite="""
+    INSERT INTO Products (SellerID, ProductName, Description, Price, StockQuantity, CategoryID, Status)
+    VALUES (?1, ?2, 'stress test product', 10.00, ?3, ?4, 'Active')
+    RETURNING ProductSKU
+""")
+
+
+def scalar(cursor, sql, params=()):
+    cursor.execute(get_pool().backend.translate(sql), params)
+    row = cursor.fetchone()
+    cursor.fetchall()
+    return row[0]
+
+
+def setup(tag, sku_count, stock, customer_count):
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        seller_id = scalar(cursor, """
+            INSERT INTO Sellers (StoreName, EmailID, AccountStatus)
+            OUTPUT INSERTED.SellerID
+            VALUES (?, ?, 'Active')
+        """, (tag, f"{tag}@stress.test"))
+        category_id = scalar(cursor, "SELECT MIN(CategoryID) FROM Categories")
+
+        skus = [scalar(cursor, ADD_PRODUCT, (seller_id, f"{tag} hot {i}", stock, category_id))
+                for i in range(sku_count)]
+
+        customers = [scalar(cursor, """
+            INSERT INTO Customers (FirstName, LastName, EmailID, DeliveryAddress)
+            OUTPUT INSERTED.CustomerID
+            VALUES ('Stress', ?, ?, 'nowhere')
+        """, (str(i), f"{tag}.{i}@stress.test")) for i in range(customer_count)]
+    return seller_id, skus, customers
+
+
+def teardown(seller_id, customers):
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        marks = ", ".join("?" * len(customers))
+        cursor.execute(f"DELETE FROM ShoppingCart WHERE CustomerID IN ({marks})", customers)
+        cursor.execute(f"DELETE FROM OrderItems WHERE OrderID IN (SELECT OrderID FROM Orders WHERE CustomerID IN ({marks}))", customers)
+        cursor.execute(f"DELETE FROM Orders WHERE CustomerID IN ({marks})", customers)
+        cursor.execute(f"DELETE FROM Customers WHERE CustomerID IN ({marks})", customers)
+        cursor.execute("DELETE FROM Products WHERE SellerID = ?", (seller_id,))
+        # The dashboard triggers keep a row for the seller; drop it last, after their final update.
+        cursor.execute("DELETE FROM SellerDashboard WHERE SellerID = ?", (seller_id,))
+        cursor.execute("DELETE FROM Sellers WHERE SellerID = ?", (seller_id,))
+
+
+def worker(customer_id, skus, orders, max_quantity, seed, results, lock):
+    rng = random.Random(seed)
+    cart = CartRepository()
+    checkout = OrderRepository()
+    placed = rejected = failed = 0
+
+    def clear_cart():
+        try:
+            cart.clear(customer_id)
+        except Exception as e:
+            print(f"  could not clear the cart of customer {customer_id}: {e}")
+
+    try:
+        for _ in range(orders):
+            # Every step of an iteration counts: a cart write that fails is a
+            # failed checkout, not a thread that silently stops.
+            try:
+                # Insert in random SKU order; reservation must still lock in SKU order.
+                picked = rng.sample(skus, rng.randint(1, len(skus)))
+                for sku in picked:
+                    cart.add(customer_id, sku, rng.randint(1, max_quantity))
+                checkout.place_order(customer_id, "nowhere", time.strftime("%Y-%m-%d %H:%M:%S"))
+                placed += 1
+            except OutOfStockError:
+                rejected += 1
+                clear_cart()
+            except Exception as e:
+                failed += 1
+                print(f"  checkout failed for customer {customer_id}: {e}")
+                clear_cart()
+    finally:
+        with lock:
+            results["placed"] += placed
+            results["rejected"] += rejected
+            results["failed"] += failed
+
+
+def verify(skus, customers, stock):
+    ok = True
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        marks = ", ".join("?" * len(customers))
+        for sku in skus:
+            remaining = scalar(cursor, "SELECT StockQuantity FROM Products WHERE ProductSKU = ?", (sku,))
+            sold = scalar(cursor, f"""
+                SELECT COALESCE(SUM(oi.Quantity), 0)
+                FROM OrderItems oi
+                INNER JOIN Orders o ON o.OrderID = oi.OrderID
+                WHERE oi.ProductSKU = ? AND o.CustomerID IN ({marks})
+            """, (sku, *customers))
+            consistent = remaining >= 0 and stock - remaining == sold
+            ok = ok and consistent
+            print(f"  SKU {sku}: sold {sold}, remaining {remaining} -> {'ok' if consistent else 'OVERSOLD/LOST'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=100, help="checkouts attempted per thread")
+    parser.add_argument("--skus", type=int, default=3, help="number of hot SKUs")
+    parser.add_argument("--stock", type=int, default=500, help="initial stock of each hot SKU")
+    parser.add_argument("--max-quantity", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="leave the generated rows in the database")
+    args = parser.parse_args()
+
+    get_pool().max_size = max(get_pool().max_size, args.threads)
+    tag = f"stress-{int(time.time())}"
+    seller_id, skus, customers = setup(tag, args.skus, args.stock, args.threads)
+
+    results = {"placed": 0, "rejected": 0, "failed": 0}
+    lock = threading.Lock()
+    reservation_stats.reset()
+    threads = [threading.Thread(target=worker, args=(customer_id, skus, args.orders, args.max_quantity,
+                                                     args.seed + i, results, lock))
+               for i, customer_id in enumerate(customers)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    attempted = results["placed"] + results["rejected"] + results["failed"]
+    print(f"{attempted} checkouts in {elapsed:.2f}s ({attempted / elapsed:.1f}/s) on {args.threads} threads")
+    print(f"  placed {results['placed']}, rejected for stock {results['rejected']}, failed {results['failed']}")
+    print(f"  reservation {reservation_stats.snapshot()}")
+    print(f"  pool {get_pool().stats()}")
+    expected = args.threads * args.orders
+    if attempted != expected:
+        print(f"  only {attempted} of {expected} checkouts were attempted")
+    ok = verify(skus, customers, args.stock) and results["failed"] == 0 and attempted == expected
+
+    if not args.keep:
+        teardown(seller_id, customers)
+    get_pool().close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
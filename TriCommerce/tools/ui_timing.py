@@ -0,0 +1,85 @@
+"""Time building the center forms with uic.loadUi against the compiled modules.
+
+Each mode runs in a fresh process on Qt's offscreen platform, so the first
+form includes the one-off import and setup cost a center pays at startup
+("cold") and the repeats show what every window construction costs
+("warm", best of ``--repeat``). Run from the TriCommerce folder, after
+``python tools/build_ui.py``:
+
+    python tools/ui_timing.py
+    python tools/ui_timing.py --json ui_timing.json
+
+Navigation inside a running center is timed with ``TRICOMMERCE_UI_TIMING=1``
+(see shared.navigation).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(repeat):
+    """Build every form ``repeat`` times in this process; return {form: (cold, warm)}."""
+    started = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication, QMainWindow
+    from shared.forms import load_form
+    from build_ui import forms
+
+    app = QApplication.instance() or QApplication([])
+    results = {"startup": time.perf_counter() - started}
+    for ui_path in forms():
+        samples = []
+        for _ in range(repeat):
+            window = QMainWindow()
+            began = time.perf_counter()
+            load_form(window, os.path.dirname(ui_path), os.path.basename(ui_path))
+            samples.append(time.perf_counter() - began)
+            window.deleteLater()
+            app.processEvents()
+        name = os.path.relpath(ui_path, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        results[name] = (samples[0], min(samples[1:] or samples))
+    return results
+
+
+def run_mode(compiled, repeat):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", TRICOMMERCE_COMPILED_UI="1" if compiled else "0")
+    output = subprocess.run([sys.executable, __file__, "--child", "--repeat", str(repeat)],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="constructions per form")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.repeat)))
+        return
+
+    loadui = run_mode(False, args.repeat)
+    compiled = run_mode(True, args.repeat)
+    print(f"{'form':<40} {'loadUi cold/warm ms':>22} {'compiled cold/warm ms':>24}")
+    print(f"{'(PyQt import + QApplication)':<40} {loadui['startup'] * 1000:>22.1f} {compiled['startup'] * 1000:>24.1f}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for name in loadui:
+        if name == "startup":
+            continue
+        row = [*loadui[name], *compiled[name]]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{name:<40} {row[0] * 1000:>10.1f} / {row[1] * 1000:<9.1f} {row[2] * 1000:>12.1f} / {row[3] * 1000:<9.1f}")
+    print(f"{'total':<40} {totals[0] * 1000:>10.1f} / {totals[1] * 1000:<9.1f} {totals[2] * 1000:>12.1f} / {totals[3] * 1000:<9.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"loadUi": loadui, "compiled": compiled}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()